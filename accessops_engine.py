@@ -6,21 +6,45 @@ Fixes the Tool import error by using standard ADK function declarations
 import os
 import json
 import asyncio
-from typing import Dict, Any, List
-from dataclasses import dataclass
+import concurrent.futures
+import copy
+import threading
+import time
+import uuid
+from typing import TYPE_CHECKING, Dict, Any, AsyncIterator, Awaitable, Callable, Iterable, List, Optional, Tuple, Type
+from dataclasses import asdict, dataclass, replace
 
-from google.adk.agents import LlmAgent
-from google.adk.models.google_llm import Gemini
-from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
-from google.genai import types
+from audit_store import AuditStore, open_store_from_env
+from decision_cache import DecisionCache, content_version
+from identity_store import IdentityBackend, IdentityStore, load_snapshot, thaw
+import metrics
+from model_providers import create_model, current_request_id
+from policy_engine import NON_HUMAN_IDENTITY_TYPES, PolicyEngine, infer_identity_type
+from prompt_builder import build_prompt, compact_json
+from risk_engine import (
+    decide_authorization,
+    fast_path_decision,
+    render_board_report,
+    score_request,
+    triage_request,
+)
+
+# google.adk / google.genai (~1s to import) and the pydantic schemas are
+# imported where they are used, so triage fast paths, cache hits and
+# library users that never call a model do not pay for them at startup.
+if TYPE_CHECKING:
+    from google.adk.agents import LlmAgent
+    from google.adk.models.base_llm import BaseLlm
+    from google.adk.runners import Runner
+    from google.adk.sessions import InMemorySessionService
+    from pydantic import BaseModel, ValidationError
 
 # ============================================================================
 # SECTION 1: MOCK DATA
 # ============================================================================
 
 def load_mock_data():
-    """Simulates database lookups"""
+    """Simulates database lookups (seed data for the default IdentityStore)"""
     return {
         "users": {
             "svc_finops_auto_bot": {
@@ -45,7 +69,11 @@ def load_mock_data():
                 "description": "Segregation of Duties: No automated bot shall have Write access to Production Ledger",
                 "resource_pattern": "*general_ledger*",
                 "allowed_roles": ["CFO", "Controller"],
-                "severity": "CRITICAL"
+                "access_types": ["write", "read_write", "admin"],
+                "identity_types": ["ai_agent", "service_account", "bot"],
+                "severity": "CRITICAL",
+                "nist_control": "AC-6 (Least Privilege)",
+                "finding": "AI Agent '{user_id}' requesting {access_type} access to financial system"
             }
         },
         "activity_logs": {
@@ -57,10 +85,194 @@ def load_mock_data():
     }
 
 
+_identity_backend: Optional[IdentityBackend] = None
+_identity_backend_lock = threading.Lock()
+
+
+def _build_default_backend() -> IdentityBackend:
+    db_path = os.environ.get("ACCESSOPS_IDENTITY_DB")
+    if db_path:
+        from sqlite_backend import SQLiteIdentityBackend
+        return SQLiteIdentityBackend(db_path)
+    snapshot_path = os.environ.get("ACCESSOPS_IDENTITY_SNAPSHOT")
+    if snapshot_path:
+        return load_snapshot(snapshot_path)
+    return IdentityStore.from_dict(load_mock_data())
+
+
+def get_identity_backend() -> IdentityBackend:
+    """
+    Return the process-wide identity backend, building it on first use.
+
+    Selection order: ACCESSOPS_IDENTITY_DB (SQLite database), then
+    ACCESSOPS_IDENTITY_SNAPSHOT (.json/.jsonl IdentityStore snapshot), then
+    the bundled mock data.
+    """
+    global _identity_backend
+    if _identity_backend is None:
+        with _identity_backend_lock:
+            if _identity_backend is None:
+                _identity_backend = _build_default_backend()
+    return _identity_backend
+
+
+def set_identity_backend(backend: Optional[IdentityBackend]) -> None:
+    """
+    Swap the process-wide backend (None rebuilds it lazily on next use).
+
+    Cached decisions were made against the old backend's data, so the
+    decision cache is emptied too.
+    """
+    global _identity_backend
+    with _identity_backend_lock:
+        _identity_backend = backend
+    if _decision_cache is not None:
+        _decision_cache.clear()
+
+
+# Backwards-compatible names from when the in-memory store was the only backend
+get_identity_store = get_identity_backend
+set_identity_store = set_identity_backend
+
+_policy_engine_cache: Optional[tuple] = None
+
+
+def get_policy_engine() -> PolicyEngine:
+    """
+    Return the PolicyEngine compiled from the current backend's policies.
+
+    Recompiles only when the backend hands back a different policies
+    mapping (new backend, or SQLite policies reloaded).
+    """
+    global _policy_engine_cache
+    policies = get_identity_backend().get_policies()
+    cached = _policy_engine_cache
+    if cached is None or cached[0] is not policies:
+        cached = (policies, PolicyEngine(policies))
+        _policy_engine_cache = cached
+    return cached[1]
+
+
+_policy_version_cache: Optional[tuple] = None
+
+
+def get_policy_version() -> str:
+    """Content hash of the current policies table, recomputed when it changes."""
+    global _policy_version_cache
+    policies = get_identity_backend().get_policies()
+    cached = _policy_version_cache
+    if cached is None or cached[0] is not policies:
+        cached = (policies, content_version(thaw(policies)))
+        _policy_version_cache = cached
+    return cached[1]
+
+
+def request_input_version(request_context: Dict[str, Any]) -> str:
+    """
+    Version hash of the identity data a decision on this request depends on:
+    HR profile, entitlements, peer baseline, activity and the policy table.
+    """
+    backend = get_identity_backend()
+    user_id = request_context["user_id"]
+    profile = backend.get_user(user_id) or {}
+    job_title = request_context.get("job_title") or profile.get("job_title", "Unknown")
+    department = request_context.get("department") or profile.get("department", "Unknown")
+    return content_version(
+        thaw(profile),
+        list(backend.get_entitlements(user_id)),
+        thaw(backend.get_peer_baseline(job_title, department)),
+        thaw(backend.get_activity(user_id)),
+        get_policy_version()
+    )
+
+
+_decision_cache: Optional[DecisionCache] = None
+_decision_cache_lock = threading.Lock()
+
+
+def get_decision_cache() -> DecisionCache:
+    """
+    Return the process-wide decision cache.
+
+    Sized by ACCESSOPS_DECISION_CACHE_SIZE and ACCESSOPS_DECISION_CACHE_TTL
+    (seconds) on first use.
+    """
+    global _decision_cache
+    if _decision_cache is None:
+        with _decision_cache_lock:
+            if _decision_cache is None:
+                _decision_cache = DecisionCache(
+                    max_entries=int(os.environ.get("ACCESSOPS_DECISION_CACHE_SIZE", 10_000)),
+                    ttl_seconds=float(os.environ.get("ACCESSOPS_DECISION_CACHE_TTL", 900))
+                )
+    return _decision_cache
+
+
+def set_decision_cache(cache: Optional[DecisionCache]) -> None:
+    """Swap the process-wide decision cache (None rebuilds it lazily)."""
+    global _decision_cache
+    with _decision_cache_lock:
+        _decision_cache = cache
+
+
+def reload_policies() -> int:
+    """
+    Re-read the policy table and drop every cached decision.
+
+    Call after changing policies in place, e.g. `sqlite_backend.py import
+    --kind policies` into the live database: the SQLite backend keeps its
+    policies in memory until told to reload them.
+
+    Returns:
+        Number of cached decisions dropped
+    """
+    backend = get_identity_backend()
+    if hasattr(backend, "reload_policies"):
+        backend.reload_policies()
+    return get_decision_cache().invalidate_policies()
+
+
+def invalidate_identities(user_ids: Iterable[str]) -> int:
+    """
+    Drop cached decisions for users whose HR profile, entitlements or
+    activity changed. Returns the number dropped.
+
+    The input version in each cache key already misses on such changes;
+    this frees the stale entries instead of leaving them to age out.
+    """
+    return get_decision_cache().invalidate_identities(user_ids)
+
+
+_audit_store: Optional[AuditStore] = None
+_audit_store_lock = threading.Lock()
+
+
+def get_audit_store() -> Optional[AuditStore]:
+    """
+    Return the process-wide audit store, or None when auditing is off.
+
+    Opened on first use in ACCESSOPS_AUDIT_DIR (see audit_store.py).
+    """
+    global _audit_store
+    if _audit_store is None and os.environ.get("ACCESSOPS_AUDIT_DIR"):
+        with _audit_store_lock:
+            if _audit_store is None:
+                _audit_store = open_store_from_env()
+    return _audit_store
+
+
+def set_audit_store(store: Optional[AuditStore]) -> None:
+    """Swap the process-wide audit store (None reopens it from the environment)."""
+    global _audit_store
+    with _audit_store_lock:
+        _audit_store = store
+
+
 # ============================================================================
 # SECTION 2: TOOL FUNCTIONS (Plain Python - ADK will auto-convert)
 # ============================================================================
 
+@metrics.timed_tool
 def get_user_profile(user_id: str) -> str:
     """
     Fetch user's HR profile from identity management system.
@@ -71,11 +283,13 @@ def get_user_profile(user_id: str) -> str:
     Returns:
         JSON string containing job_title, department, tenure_months
     """
-    data = load_mock_data()
-    profile = data["users"].get(user_id, {"error": f"User {user_id} not found"})
-    return json.dumps(profile, indent=2)
+    profile = get_identity_backend().get_user(user_id)
+    if profile is None:
+        return compact_json({"error": f"User {user_id} not found"})
+    return compact_json(thaw(profile))
 
 
+@metrics.timed_tool
 def get_current_entitlements(user_id: str) -> str:
     """
     Retrieve all resources currently granted to user.
@@ -86,11 +300,11 @@ def get_current_entitlements(user_id: str) -> str:
     Returns:
         JSON string with list of entitlements
     """
-    data = load_mock_data()
-    entitlements = data["entitlements"].get(user_id, [])
-    return json.dumps({"entitlements": entitlements}, indent=2)
+    entitlements = get_identity_backend().get_entitlements(user_id)
+    return compact_json({"entitlements": list(entitlements)})
 
 
+@metrics.timed_tool
 def get_peer_baseline(job_title: str, department: str) -> str:
     """
     Get statistical baseline of access for similar roles.
@@ -102,39 +316,37 @@ def get_peer_baseline(job_title: str, department: str) -> str:
     Returns:
         JSON string with typical_access and write_access_rate
     """
-    data = load_mock_data()
-    key = f"{job_title}|{department}"
-    baseline = data["peer_baseline"].get(key, {
-        "typical_access": ["read_only"],
-        "write_access_rate": 0.05
-    })
-    return json.dumps(baseline, indent=2)
+    baseline = get_identity_backend().get_peer_baseline(job_title, department)
+    return compact_json(thaw(baseline))
 
 
+@metrics.timed_tool
 def check_policy_violations(user_id: str, job_title: str, requested_resource_id: str, access_type: str) -> str:
     """
     Check if access request violates organizational policies.
     
+    Args:
+        user_id: Unique identifier
+        job_title: Job role (roles in a policy's allowed_roles are exempt)
+        requested_resource_id: Resource being requested
+        access_type: read / write / admin ...
+        
     Returns:
         JSON string with policy_violations list
     """
-    data = load_mock_data()
-    violations = []
-    
-    # Check if request violates SoD policy
-    if "general_ledger" in requested_resource_id and access_type == "write":
-        if "bot" in user_id.lower() or "svc_" in user_id:
-            violations.append({
-                "policy_id": "POL-SOD-001",
-                "description": "SoD: No automated bot shall have Write access to Production Ledger",
-                "severity": "CRITICAL",
-                "nist_control": "AC-6 (Least Privilege)",
-                "finding": f"AI Agent '{user_id}' requesting write access to financial system"
-            })
+    profile = get_identity_backend().get_user(user_id) or {}
+    violations = get_policy_engine().evaluate(
+        user_id=user_id,
+        job_title=job_title,
+        resource_id=requested_resource_id,
+        access_type=access_type,
+        identity_type=profile.get("identity_type")
+    )
     
-    return json.dumps({"policy_violations": violations}, indent=2)
+    return compact_json({"policy_violations": violations})
 
 
+@metrics.timed_tool
 def get_activity_logs(user_id: str) -> str:
     """
     Retrieve recent high-risk actions from SIEM.
@@ -142,22 +354,200 @@ def get_activity_logs(user_id: str) -> str:
     Returns:
         JSON string with recent_high_risk_actions
     """
-    data = load_mock_data()
-    logs = data["activity_logs"].get(user_id, {"recent_high_risk_actions": []})
-    return json.dumps(logs, indent=2)
+    logs = get_identity_backend().get_activity(user_id)
+    return compact_json(thaw(logs))
 
 
 # ============================================================================
-# SECTION 3: AGENT CREATION
+# SECTION 3: DIRECT INVESTIGATION (no LLM round trips)
 # ============================================================================
 
-def create_agents(llm_model: Gemini) -> Dict[str, LlmAgent]:
-    """Create all agents with proper tool bindings."""
+READ_ONLY_ACCESS_TYPES = {"read", "read_only", "view", "list"}
+
+# Peer groups whose write rate is below this are treated as read-only roles
+PEER_NORM_WRITE_RATE = 0.10
+
+
+def is_elevated_access(access_type: str) -> bool:
+    """True for anything beyond plain read access (write, admin, execute...)."""
+    return access_type.strip().lower() not in READ_ONLY_ACCESS_TYPES
+
+
+def compute_risk_signals(
+    request_context: Dict[str, Any],
+    investigation: Dict[str, Any]
+) -> Dict[str, bool]:
+    """
+    Derive the investigator's risk_signals block from gathered context.
+    
+    Args:
+        request_context: The access request
+        investigation: Dict with user_profile, current_access, peer_baseline,
+                       policy_violations
+                       
+    Returns:
+        Dict with privilege_escalation, outside_peer_norms,
+        policy_violation_found, ai_agent_scope_mismatch
+    """
+    resource_id = request_context.get("requested_resource_id", "")
+    elevated = is_elevated_access(request_context.get("access_type", ""))
+    current_access = investigation.get("current_access") or []
+    peer = investigation.get("peer_baseline") or {}
+    identity_type = (
+        request_context.get("identity_type")
+        or (investigation.get("user_profile") or {}).get("identity_type")
+        or infer_identity_type(request_context.get("user_id", ""))
+    )
+    
+    privilege_escalation = elevated and resource_id not in current_access
+    outside_peer_norms = (
+        elevated
+        and resource_id not in (peer.get("typical_access") or [])
+        and (peer.get("write_access_rate") or 0.0) < PEER_NORM_WRITE_RATE
+    )
+    policy_violation_found = bool(investigation.get("policy_violations"))
+    
+    return {
+        "privilege_escalation": privilege_escalation,
+        "outside_peer_norms": outside_peer_norms,
+        "policy_violation_found": policy_violation_found,
+        "ai_agent_scope_mismatch": (
+            identity_type in NON_HUMAN_IDENTITY_TYPES
+            and elevated
+            and (outside_peer_norms or policy_violation_found)
+        )
+    }
+
+
+async def _call_tool(fn, tool_calls: List[Dict[str, Any]], **kwargs) -> Any:
+    """Run one tool in the default thread pool and record the call."""
+    start = time.perf_counter()
+    output = await asyncio.to_thread(fn, **kwargs)
+    tool_calls.append({
+        "tool": fn.__name__,
+        "args": kwargs,
+        "latency_ms": round((time.perf_counter() - start) * 1000, 3)
+    })
+    return json.loads(output)
+
+
+async def gather_investigation(request_context: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Call the five investigator tools directly and concurrently.
+    
+    Produces the same investigation JSON the context_investigator agent is
+    instructed to return, without any model round trips.
+    
+    Returns:
+        Dict with response (investigation), tool_calls and raw_output, the
+        same shape as execute_agent_with_trace
+    """
+    user_id = request_context["user_id"]
+    tool_calls: List[Dict[str, Any]] = []
+    
+    job_title = request_context.get("job_title")
+    department = request_context.get("department")
+    profile_task = None
+    if job_title and department:
+        profile_task = _call_tool(get_user_profile, tool_calls, user_id=user_id)
+    else:
+        # Peer baseline is keyed on the HR profile, so fetch it first
+        profile = await _call_tool(get_user_profile, tool_calls, user_id=user_id)
+        job_title = job_title or profile.get("job_title", "Unknown")
+        department = department or profile.get("department", "Unknown")
+    
+    tasks = [
+        _call_tool(get_current_entitlements, tool_calls, user_id=user_id),
+        _call_tool(get_peer_baseline, tool_calls, job_title=job_title, department=department),
+        _call_tool(
+            check_policy_violations,
+            tool_calls,
+            user_id=user_id,
+            job_title=job_title,
+            requested_resource_id=request_context["requested_resource_id"],
+            access_type=request_context["access_type"]
+        ),
+        _call_tool(get_activity_logs, tool_calls, user_id=user_id),
+    ]
+    if profile_task is not None:
+        tasks.insert(0, profile_task)
+        profile, entitlements, peer, policies, activity = await asyncio.gather(*tasks)
+    else:
+        entitlements, peer, policies, activity = await asyncio.gather(*tasks)
+    
+    investigation = {
+        "user_profile": profile,
+        "current_access": entitlements.get("entitlements", []),
+        "peer_baseline": peer,
+        "policy_violations": policies.get("policy_violations", []),
+        "activity_summary": activity
+    }
+    investigation["risk_signals"] = compute_risk_signals(request_context, investigation)
+    
+    return {
+        "response": investigation,
+        "tool_calls": tool_calls,
+        "raw_output": compact_json(investigation)
+    }
+
+
+# ============================================================================
+# SECTION 4: AGENT CREATION
+# ============================================================================
+
+APP_NAME = "accessops-intel"
+SESSION_USER_ID = "demo-user"
+
+
+def create_llm_model(provider: Optional[str] = None) -> "BaseLlm":
+    """
+    Build the model shared by every agent.
+    
+    provider defaults to ACCESSOPS_MODEL_PROVIDER: "gemini" (Vertex AI) or
+    "replay" (offline replay of the UnitTest audit logs, see replay_model).
+    """
+    return create_model(provider)
+
+
+SESSION_STRATEGIES = ("isolated", "shared", "shared_trimmed")
+
+# Session state flag read by trim_shared_history
+TRIM_HISTORY_STATE_KEY = "accessops:trim_history"
+
+
+def trim_shared_history(callback_context, llm_request):
+    """
+    before_model_callback: in sessions flagged for trimming, drop earlier
+    phases' turns so the model sees only the current prompt and its own
+    tool calls. Every phase prompt already embeds the JSON it needs.
+    """
+    if not callback_context.state.get(TRIM_HISTORY_STATE_KEY):
+        return None
+    contents = llm_request.contents
+    for i in range(len(contents) - 1, -1, -1):
+        content = contents[i]
+        if content.role == "user" and any(getattr(p, "text", None) for p in content.parts or []):
+            llm_request.contents = contents[i:]
+            break
+    return None
+
+
+def create_agents(llm_model: "BaseLlm") -> Dict[str, "LlmAgent"]:
+    """
+    Create all agents with proper tool bindings.
+    
+    JSON-producing agents declare an output_schema so Gemini answers in
+    response-schema mode; the narrator writes free-form Markdown.
+    """
+    from google.adk.agents import LlmAgent
+    from schemas import AGENT_OUTPUT_SCHEMAS
     
     # Investigator - calls tools to gather context
     investigator = LlmAgent(
         model=llm_model,
+        before_model_callback=trim_shared_history,
         name="context_investigator",
+        output_schema=AGENT_OUTPUT_SCHEMAS["investigator"],
         description="Gathers all context signals by calling IAM/SIEM tools",
         instruction="""
         You are an enterprise access risk investigator. Your job:
@@ -197,7 +587,9 @@ def create_agents(llm_model: Gemini) -> Dict[str, LlmAgent]:
     # Severity Analyst - calculates NIST-based risk score
     severity_analyst = LlmAgent(
         model=llm_model,
+        before_model_callback=trim_shared_history,
         name="severity_analyst",
+        output_schema=AGENT_OUTPUT_SCHEMAS["analyst"],
         description="Calculates risk scores using NIST 800-53 framework",
         instruction="""
         You are a Senior Risk Analyst applying NIST 800-53 AC-6 (Least Privilege).
@@ -228,7 +620,9 @@ def create_agents(llm_model: Gemini) -> Dict[str, LlmAgent]:
     # Critic - challenges the analyst's score
     critic = LlmAgent(
         model=llm_model,
+        before_model_callback=trim_shared_history,
         name="risk_critic",
+        output_schema=AGENT_OUTPUT_SCHEMAS["critic"],
         description="Challenges risk assessments to prevent false positives",
         instruction="""
         You are the Internal Auditor. Review the Severity Analyst's score.
@@ -250,13 +644,16 @@ def create_agents(llm_model: Gemini) -> Dict[str, LlmAgent]:
         tools=[]
     )
     
-    # Gatekeeper - makes authorization decision
+    # Gatekeeper - explains the deterministic authorization decision
     gatekeeper = LlmAgent(
         model=llm_model,
+        before_model_callback=trim_shared_history,
         name="gatekeeper",
-        description="Makes final authorization decision",
+        output_schema=AGENT_OUTPUT_SCHEMAS["gatekeeper"],
+        description="Explains the final authorization decision",
         instruction="""
-        You are the Gatekeeper. Decide based on risk score:
+        You are the Gatekeeper. The decision has ALREADY been made by
+        deterministic rules and is final:
         
         RULES:
         - CRITICAL → DENY + Require CISO
@@ -265,12 +662,12 @@ def create_agents(llm_model: Gemini) -> Dict[str, LlmAgent]:
         - MEDIUM + Controls → AUTO_APPROVE
         - LOW → AUTO_APPROVE
         
+        Explain to the requester and approvers why this decision follows
+        from the risk score and context. Do not change the decision.
+        
         Output JSON:
         {
-          "decision": "AUTO_APPROVE | PENDING_HUMAN_REVIEW | DENY",
-          "reasoning": <string>,
-          "required_approvers": [<list or null>],
-          "expires_in_hours": <int or null>
+          "reasoning": <string>
         }
         """,
         tools=[]
@@ -279,6 +676,7 @@ def create_agents(llm_model: Gemini) -> Dict[str, LlmAgent]:
     # Narrator - generates board report
     narrator = LlmAgent(
         model=llm_model,
+        before_model_callback=trim_shared_history,
         name="board_reporter",
         description="Generates executive summary",
         instruction="""
@@ -315,22 +713,70 @@ def create_agents(llm_model: Gemini) -> Dict[str, LlmAgent]:
 
 
 # ============================================================================
-# SECTION 4: EXECUTION HELPER
+# SECTION 5: EXECUTION HELPER
 # ============================================================================
 
-async def execute_agent_with_trace(
-    agent: LlmAgent,
+REPAIR_PROMPT = """Your previous reply did not match the required output schema.
+
+Previous reply:
+{reply}
+
+Validation errors:
+{errors}
+
+Reply again with only the corrected JSON object."""
+
+
+def _parse_json_lenient(text: str) -> Dict[str, Any]:
+    """Legacy parsing for schema-less agents: JSON, else the outermost {...}."""
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        # Extract JSON from markdown blocks
+        start = text.find("{")
+        end = text.rfind("}") + 1
+        if start != -1 and end > start:
+            try:
+                return json.loads(text[start:end])
+            except json.JSONDecodeError:
+                pass
+    return {"raw_text": text}
+
+
+def _validate_output(
+    schema: Type["BaseModel"],
+    text: str
+) -> Tuple[Optional[Dict[str, Any]], Optional["ValidationError"]]:
+    from pydantic import ValidationError
+    
+    try:
+        return schema.model_validate_json(text).model_dump(), None
+    except ValidationError as e:
+        # Tolerate a fenced or prefixed reply before asking for a repair
+        start = text.find("{")
+        end = text.rfind("}") + 1
+        if start > 0 or 0 < end < len(text):
+            try:
+                return schema.model_validate_json(text[start:end]).model_dump(), None
+            except ValidationError:
+                pass
+        return None, e
+
+
+async def _run_turn(
+    runner: "Runner",
+    session_id: str,
     prompt: str,
-    session_service: InMemorySessionService,
-    session_id: str
+    on_text: Optional[Callable[[str], None]] = None
 ) -> Dict[str, Any]:
-    """Execute agent and return response with execution trace."""
+    """
+    Send one user message and collect final text, tool calls and usage.
     
-    runner = Runner(
-        agent=agent,
-        app_name="accessops-intel",
-        session_service=session_service
-    )
+    With on_text the model is called in SSE streaming mode and every partial
+    text chunk is passed to on_text as it arrives.
+    """
+    from google.adk.agents.run_config import RunConfig, StreamingMode
+    from google.genai import types
     
     content = types.Content(
         role="user",
@@ -338,69 +784,387 @@ async def execute_agent_with_trace(
     )
     
     events = runner.run_async(
-        user_id="demo-user",
+        user_id=SESSION_USER_ID,
         session_id=session_id,
-        new_message=content
+        new_message=content,
+        run_config=RunConfig(streaming_mode=StreamingMode.SSE) if on_text else None
     )
     
     tool_calls = []
     responses = []
+    usage = {"prompt_tokens": 0, "output_tokens": 0, "model_calls": 0, "first_event_ms": None}
+    error = None
+    start = time.perf_counter()
     
     try:
         async for event in events:
-            # Track tool calls
-            if hasattr(event, 'tool_calls') and event.tool_calls:
-                for tc in event.tool_calls:
-                    tool_calls.append({
-                        "tool": tc.name if hasattr(tc, 'name') else str(tc),
-                        "args": tc.args if hasattr(tc, 'args') else {}
-                    })
+            if usage["first_event_ms"] is None:
+                usage["first_event_ms"] = round((time.perf_counter() - start) * 1000, 3)
+            
+            # Token accounting (one usage_metadata per model response)
+            if getattr(event, "usage_metadata", None) and not event.partial:
+                usage["prompt_tokens"] += event.usage_metadata.prompt_token_count or 0
+                usage["output_tokens"] += event.usage_metadata.candidates_token_count or 0
+                usage["model_calls"] += 1
+            
+            # Stream partial text; the final event repeats it in full
+            if on_text is not None and event.partial and event.content and event.content.parts:
+                chunk = "".join(getattr(p, "text", None) or "" for p in event.content.parts)
+                if chunk:
+                    on_text(chunk)
+            
+            # Track tool calls (function_call parts of model events)
+            for call in event.get_function_calls():
+                tool_calls.append({
+                    "tool": call.name,
+                    "args": dict(call.args or {})
+                })
             
             # Collect final response
             if event.is_final_response():
                 if event.content and event.content.parts:
                     text = "".join(
-                        getattr(p, "text", "") 
-                        for p in event.content.parts 
-                        if hasattr(p, "text")
+                        getattr(p, "text", None) or ""
+                        for p in event.content.parts
                     )
                     responses.append(text)
     
     except Exception as e:
         print(f"⚠️ Error during agent execution: {e}")
+        error = str(e)
+    
+    return {
+        "text": "\n".join(responses),
+        "tool_calls": tool_calls,
+        "usage": usage,
+        "error": error
+    }
+
+
+async def execute_agent_with_trace(
+    agent: "LlmAgent",
+    prompt: str,
+    session_service: "InMemorySessionService",
+    session_id: str,
+    runner: Optional["Runner"] = None,
+    output_schema: Optional[Type["BaseModel"]] = None,
+    on_text: Optional[Callable[[str], None]] = None
+) -> Dict[str, Any]:
+    """
+    Execute agent and return response with execution trace.
+    
+    Pass the engine's long-lived runner to avoid building one per call.
+    Replies are validated against output_schema (default: the agent's own);
+    an invalid reply gets one repair turn quoting the validation errors
+    before the phase gives up with a schema_validation_failed error.
+    on_text streams the reply's text chunks (see _run_turn).
+    """
+    from schemas import describe_errors
+    
+    if runner is None:
+        from google.adk.runners import Runner
+        
+        runner = Runner(
+            agent=agent,
+            app_name=APP_NAME,
+            session_service=session_service
+        )
+    output_schema = output_schema or getattr(agent, "output_schema", None)
+    
+    turn = await _run_turn(runner, session_id, prompt, on_text=on_text)
+    tool_calls = turn["tool_calls"]
+    usage = turn["usage"]
+    if turn["error"] is not None:
         return {
-            "response": {"error": str(e)},
+            "response": {"error": turn["error"]},
             "tool_calls": tool_calls,
-            "raw_output": ""
+            "raw_output": "",
+            "usage": usage
         }
     
-    # Parse JSON from response
-    final_text = "\n".join(responses)
-    try:
-        result = json.loads(final_text)
-    except json.JSONDecodeError:
-        # Extract JSON from markdown blocks
-        start = final_text.find("{")
-        end = final_text.rfind("}") + 1
-        if start != -1 and end > start:
-            try:
-                result = json.loads(final_text[start:end])
-            except:
-                result = {"raw_text": final_text}
-        else:
-            result = {"raw_text": final_text}
+    final_text = turn["text"]
+    if output_schema is None:
+        return {
+            "response": _parse_json_lenient(final_text),
+            "tool_calls": tool_calls,
+            "raw_output": final_text,
+            "usage": usage
+        }
+    
+    result, error = _validate_output(output_schema, final_text)
+    repair_attempts = 0
+    if error is not None:
+        repair_attempts = 1
+        print(f"   ↻ {agent.name}: output failed {output_schema.__name__} validation, requesting repair")
+        repair = await _run_turn(
+            runner,
+            session_id,
+            REPAIR_PROMPT.format(reply=final_text, errors=describe_errors(error))
+        )
+        tool_calls.extend(repair["tool_calls"])
+        for key in ("prompt_tokens", "output_tokens", "model_calls"):
+            usage[key] += repair["usage"][key]
+        if repair["error"] is None:
+            final_text = repair["text"]
+            result, error = _validate_output(output_schema, final_text)
+        if error is not None:
+            result = {
+                "error": "schema_validation_failed",
+                "details": describe_errors(error),
+                "raw_text": final_text
+            }
     
     return {
         "response": result,
         "tool_calls": tool_calls,
-        "raw_output": final_text
+        "raw_output": final_text,
+        "usage": usage,
+        "validation": {
+            "schema": output_schema.__name__,
+            "valid": error is None,
+            "repair_attempts": repair_attempts
+        }
     }
 
 
+class AccessOpsEngine:
+    """
+    Long-lived model client, agents and runners shared by every pipeline.
+    
+    Building the Gemini client, the five LlmAgents and their Runners is
+    done once here instead of per request. Runners and the session service
+    hold no per-run state beyond the session, so concurrent pipelines share
+    them safely as long as each run uses its own session ids.
+    """
+    
+    def __init__(
+        self,
+        llm_model: Optional["BaseLlm"] = None,
+        session_service: Optional["InMemorySessionService"] = None
+    ):
+        from google.adk.runners import Runner
+        from google.adk.sessions import InMemorySessionService
+        
+        self.llm_model = llm_model or create_llm_model()
+        self.agents = create_agents(self.llm_model)
+        self.session_service = session_service or InMemorySessionService()
+        self.runners = {
+            name: Runner(agent=agent, app_name=APP_NAME, session_service=self.session_service)
+            for name, agent in self.agents.items()
+        }
+    
+    async def open_session(self, request_id: str, trim_history: bool = False) -> str:
+        """
+        Create a session unique to this run (request ids may repeat).
+        
+        trim_history flags the session for trim_shared_history.
+        """
+        session_id = f"session-{request_id}-{uuid.uuid4().hex[:12]}"
+        await self.session_service.create_session(
+            app_name=APP_NAME,
+            user_id=SESSION_USER_ID,
+            session_id=session_id,
+            state={TRIM_HISTORY_STATE_KEY: trim_history}
+        )
+        return session_id
+    
+    async def close_session(self, session_id: str) -> None:
+        """Drop a finished run's history so the shared service stays bounded."""
+        await self.session_service.delete_session(
+            app_name=APP_NAME,
+            user_id=SESSION_USER_ID,
+            session_id=session_id
+        )
+    
+    async def execute(
+        self,
+        agent_name: str,
+        prompt: str,
+        session_id: str,
+        on_text: Optional[Callable[[str], None]] = None
+    ) -> Dict[str, Any]:
+        """Run one agent on the shared runner (see execute_agent_with_trace)."""
+        return await execute_agent_with_trace(
+            agent=self.agents[agent_name],
+            prompt=prompt,
+            session_service=self.session_service,
+            session_id=session_id,
+            runner=self.runners[agent_name],
+            on_text=on_text
+        )
+    
+    async def run(
+        self,
+        request_context: Dict[str, Any],
+        config: Optional["PipelineConfig"] = None
+    ) -> "PipelineResult":
+        return await run_pipeline(request_context, config, engine=self)
+
+
+_engine: Optional[AccessOpsEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> AccessOpsEngine:
+    """Return the process-wide engine, building it on first use."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = AccessOpsEngine()
+    return _engine
+
+
+def set_engine(engine: Optional[AccessOpsEngine]) -> None:
+    """Swap the process-wide engine (None rebuilds it lazily on next use)."""
+    global _engine
+    with _engine_lock:
+        _engine = engine
+
+
 # ============================================================================
-# SECTION 5: MAIN PIPELINE
+# SECTION 6: PHASE SCHEDULER
+# ============================================================================
+
+PhaseRunner = Callable[[Dict[str, Any]], Awaitable[Tuple[Any, Dict[str, Any]]]]
+
+
+@dataclass(frozen=True)
+class Phase:
+    """
+    One node of the pipeline graph.
+    
+    run receives the outputs of completed phases keyed by phase name and
+    returns (output, trace_entry).
+    """
+    name: str
+    inputs: Tuple[str, ...]
+    run: PhaseRunner
+
+
+async def _timed_phase(phase: Phase, outputs: Dict[str, Any]) -> Tuple[Any, Optional[Dict[str, Any]]]:
+    start = time.perf_counter()
+    output, trace = await phase.run(outputs)
+    if trace is not None:
+        trace.setdefault("latency_ms", round((time.perf_counter() - start) * 1000, 3))
+    return output, trace
+
+
+async def run_phase_graph(
+    phases: List[Phase],
+    concurrent: bool = True,
+    on_phase: Optional[Callable[[str, Any, Optional[Dict[str, Any]]], None]] = None
+) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """
+    Execute phases as soon as their declared inputs are available.
+    
+    Args:
+        phases: Phases in canonical (trace) order; must form a DAG
+        concurrent: Run independent phases together; False runs them one at
+                    a time in declared order
+        on_phase: Called with (name, output, trace) as each phase completes
+                    
+    Returns:
+        (outputs by phase name, trace entries in declared phase order)
+    """
+    names = [p.name for p in phases]
+    for phase in phases:
+        unknown = set(phase.inputs) - set(names)
+        if unknown:
+            raise ValueError(f"Phase {phase.name!r} depends on unknown phases {sorted(unknown)}")
+    
+    outputs: Dict[str, Any] = {}
+    traces: Dict[str, Dict[str, Any]] = {}
+    pending = list(phases)
+    running: Dict[asyncio.Task, str] = {}
+    
+    try:
+        while pending or running:
+            ready = [p for p in pending if all(i in outputs for i in p.inputs)]
+            if not concurrent and running:
+                ready = []
+            elif not concurrent:
+                ready = ready[:1]
+            for phase in ready:
+                pending.remove(phase)
+                task = asyncio.create_task(_timed_phase(phase, dict(outputs)))
+                running[task] = phase.name
+            if not running:
+                raise ValueError(f"Phase graph has a cycle among {[p.name for p in pending]}")
+            
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                name = running.pop(task)
+                outputs[name], traces[name] = task.result()
+                if on_phase is not None:
+                    on_phase(name, outputs[name], traces[name])
+    finally:
+        for task in running:
+            task.cancel()
+    
+    return outputs, [traces[name] for name in names]
+
+
+# ============================================================================
+# SECTION 7: MAIN PIPELINE
 # ============================================================================
 
+@dataclass
+class PipelineConfig:
+    """
+    Knobs for run_pipeline.
+    
+    investigation_mode:
+        "direct" - call the five tools concurrently in-process (default)
+        "llm"    - let the context_investigator agent call them
+    concurrent_phases:
+        Run phases whose inputs are ready at the same time (e.g. critique
+        alongside authorization). False restores strictly sequential runs.
+    scoring_mode:
+        "native" - deterministic NIST 800-53 scorer only (default)
+        "review" - same authoritative score, reviewed by the LLM analyst
+    gatekeeper_mode:
+        "native"  - deterministic rules only, no model call (default)
+        "explain" - same authoritative decision, plus an LLM narrative
+    triage:
+        Settle clear-cut requests (low-risk reads, CRITICAL policy hits)
+        deterministically before any agent runs
+    use_cache:
+        Serve resubmitted requests from the decision cache when the
+        underlying identity data and policies are unchanged
+    session_strategy:
+        "isolated"       - every agent phase gets a fresh session (default)
+        "shared"         - phases share one session and its full history
+        "shared_trimmed" - one session, but each model call only sees the
+                           current phase's turn
+    audit_mode:
+        How results reach the audit store, when one is configured:
+        "async"   - queue the record and return (default)
+        "durable" - return only once the record's group commit is fsynced
+        "off"     - do not record
+    """
+    investigation_mode: str = "direct"
+    concurrent_phases: bool = True
+    scoring_mode: str = "native"
+    gatekeeper_mode: str = "native"
+    triage: bool = True
+    use_cache: bool = True
+    session_strategy: str = "isolated"
+    audit_mode: str = "async"
+    
+    def __post_init__(self):
+        if self.investigation_mode not in ("direct", "llm"):
+            raise ValueError(f"Unknown investigation_mode: {self.investigation_mode!r}")
+        if self.scoring_mode not in ("native", "review"):
+            raise ValueError(f"Unknown scoring_mode: {self.scoring_mode!r}")
+        if self.gatekeeper_mode not in ("native", "explain"):
+            raise ValueError(f"Unknown gatekeeper_mode: {self.gatekeeper_mode!r}")
+        if self.session_strategy not in SESSION_STRATEGIES:
+            raise ValueError(f"Unknown session_strategy: {self.session_strategy!r}")
+        if self.audit_mode not in ("async", "durable", "off"):
+            raise ValueError(f"Unknown audit_mode: {self.audit_mode!r}")
+
+
 @dataclass
 class PipelineResult:
     """Container for pipeline results."""
@@ -410,181 +1174,463 @@ class PipelineResult:
     investigation: Dict[str, Any]
     board_report: str
     execution_trace: List[Dict[str, Any]]
+    cache_hit: bool = False
 
 
-async def run_pipeline(request_context: Dict[str, Any]) -> PipelineResult:
-    """Main orchestration - executes all agents in sequence."""
-    
-    print(f"🚀 Starting Pipeline for {request_context['request_id']}")
-    
-    # Initialize session
-    session_service = InMemorySessionService()
-    session_id = f"session-{request_context['request_id']}"
-    await session_service.create_session(
-        app_name="accessops-intel",
-        user_id="demo-user",
-        session_id=session_id
-    )
-    
-    # Configure LLM with explicit API key
-    retry_config = types.HttpRetryOptions(
-        attempts=5,
-        exp_base=2,
-        initial_delay=1,
-        http_status_codes=[429, 500, 503, 504]
-    )
-    
-  # Use Vertex AI instead of API key
-    llm_model = Gemini(
-        model="gemini-2.0-flash-001",
-        vertexai=True,
-        project="accessops-intel",
-        location="us-central1",
-        retry_options=retry_config
-    )
+# Receives pipeline progress events:
+#   {"type": "phase", "phase": name, "output": ..., "trace": {...}}
+#   {"type": "token", "phase": "report", "text": chunk}
+PipelineEventSink = Callable[[Dict[str, Any]], None]
+
+
+def _emit_result_phases(result: PipelineResult, on_event: PipelineEventSink, skip: Tuple[str, ...] = ()) -> None:
+    # Phase events for a result that was not built live (cache hit, fast path)
+    outputs = {
+        "investigation": result.investigation,
+        "scoring": result.risk_score,
+        "report": result.board_report,
+    }
+    phases = set(skip)
+    for trace in result.execution_trace:
+        if trace["phase"] in skip:
+            continue
+        if trace["phase"] == "triage":
+            output = {"route": trace["route"], "reason": trace["reason"]}
+        elif trace["phase"] == "cache":
+            output = {"source_request_id": trace["source_request_id"], "age_s": trace["age_s"]}
+        else:
+            output = outputs.get(trace["phase"], trace.get("decision", trace.get("critique")))
+        on_event({"type": "phase", "phase": trace["phase"], "output": output, "trace": trace})
+        phases.add(trace["phase"])
+    if "report" not in phases:
+        on_event({"type": "phase", "phase": "report", "output": result.board_report, "trace": None})
+
+
+async def run_pipeline(
+    request_context: Dict[str, Any],
+    config: Optional[PipelineConfig] = None,
+    engine: Optional[AccessOpsEngine] = None,
+    on_event: Optional[PipelineEventSink] = None
+) -> PipelineResult:
+    """
+    Main orchestration - executes the agent phases as a dependency graph.
     
-    agents = create_agents(llm_model)
-    execution_trace = []
+    investigation -> scoring -> (critique || authorization -> report)
     
-    # PHASE 1: Investigation
-    print("\n🔍 PHASE 1: Context Investigation")
-    investigation_prompt = f"""
-    Investigate this access request:
+    The gatekeeper and narrator never read the critique, so the critic runs
+    alongside them instead of adding a round trip to the critical path.
+    Resubmissions of an already-adjudicated request are answered from the
+    decision cache while the identity data and policies are unchanged.
     
-    {json.dumps(request_context, indent=2)}
+    Agent phases run on `engine` (default: the process-wide get_engine()),
+    which is only built once a request actually needs a model. Phase,
+    token and decision metrics are recorded for every call (see metrics.py;
+    ACCESSOPS_METRICS_PORT serves them over HTTP).
     
-    User ID: {request_context['user_id']}
-    Resource: {request_context['requested_resource_id']}
-    Access Type: {request_context['access_type']}
-    Job Title: {request_context.get('job_title', 'Unknown')}
-    Department: {request_context.get('department', 'Unknown')}
+    on_event receives each phase's output as it completes and the board
+    report's text chunks as the narrator streams them (PipelineEventSink).
     
-    Call ALL tools to gather complete context.
+    Every result, cache hits included, is appended to the audit store when
+    ACCESSOPS_AUDIT_DIR is set (config.audit_mode).
     """
     
-    investigation = await execute_agent_with_trace(
-        agent=agents["investigator"],
-        prompt=investigation_prompt,
-        session_service=session_service,
-        session_id=session_id
+    config = config or PipelineConfig()
+    metrics.start_metrics_server_from_env()
+    request_token = current_request_id.set(request_context["request_id"])
+    start = time.perf_counter()
+    try:
+        result = await _cached_pipeline(request_context, config, engine, on_event)
+    finally:
+        current_request_id.reset(request_token)
+    metrics.record_pipeline(
+        result.execution_trace,
+        result.decision,
+        time.perf_counter() - start,
+        result.cache_hit
     )
+    if config.audit_mode != "off":
+        committed = await asyncio.to_thread(_record_audit, request_context, result)
+        if committed is not None and config.audit_mode == "durable":
+            await asyncio.wrap_future(committed)
+    return result
+
+
+def _record_audit(request_context: Dict[str, Any], result: PipelineResult) -> Optional[concurrent.futures.Future]:
+    # Opening the store touches the disk and record() contends for the
+    # store's lock with its writer thread: run in a worker thread, never on
+    # the event loop
+    audit_store = get_audit_store()
+    if audit_store is None:
+        return None
+    return audit_store.record(request_context, result)
+
+
+def _record_agent_error(trace: Dict[str, Any], call: Dict[str, Any]) -> None:
+    # execute_agent_with_trace reports failures (exceptions, timeouts, schema
+    # validation) as an "error" key in the response rather than raising
+    response = call["response"]
+    if isinstance(response, dict) and response.get("error"):
+        trace["error"] = response["error"]
+
+
+def _cacheable(result: PipelineResult) -> bool:
+    """True when every phase completed cleanly and a report was produced."""
+    return bool(result.board_report) and not any(t.get("error") for t in result.execution_trace)
+
+
+async def _cached_pipeline(
+    request_context: Dict[str, Any],
+    config: PipelineConfig,
+    engine: Optional[AccessOpsEngine],
+    on_event: Optional[PipelineEventSink] = None
+) -> PipelineResult:
+    if not config.use_cache:
+        return await _execute_pipeline(request_context, config, engine, on_event)
     
-    print(f"   ✓ Tools called: {[tc['tool'] for tc in investigation['tool_calls']]}")
-    execution_trace.append({
-        "phase": "investigation",
-        "agent": "investigator",
-        "tool_calls": investigation["tool_calls"]
-    })
-    
-    # PHASE 2: Risk Scoring
-    print("\n📊 PHASE 2: Risk Scoring (NIST 800-53)")
-    scoring_prompt = f"""
-    Calculate risk for this investigation:
+    cache = get_decision_cache()
+    # audit_mode only decides how the result is logged, not what it is
+    scope = json.dumps({k: v for k, v in asdict(config).items() if k != "audit_mode"}, sort_keys=True)
+    # Identity lookups may hit SQLite; keep them off the event loop
+    version = await asyncio.to_thread(request_input_version, request_context)
+    key = cache.make_key(request_context, version, scope)
+    hit = cache.get(key)
+    metrics.DECISION_CACHE.inc(result="miss" if hit is None else "hit")
+    if hit is not None:
+        cached, age_s = hit
+        # Entries are shared by every later hit; hand out a private copy
+        cached = copy.deepcopy(cached)
+        print(f"♻️  Decision cache hit for {request_context['request_id']} (from {cached.request_id})")
+        result = replace(
+            cached,
+            request_id=request_context["request_id"],
+            cache_hit=True,
+            execution_trace=[{
+                "phase": "cache",
+                "agent": "decision_cache",
+                "source_request_id": cached.request_id,
+                "age_s": round(age_s, 3)
+            }] + cached.execution_trace
+        )
+        if on_event is not None:
+            _emit_result_phases(result, on_event)
+        return result
     
-    Context: {json.dumps(investigation['response'], indent=2)}
-    Request: {json.dumps(request_context, indent=2)}
-    """
+    result = await _execute_pipeline(request_context, config, engine, on_event)
+    # A failed phase (error, timeout, empty report) must not be served for
+    # the whole TTL; the next identical request runs the pipeline again
+    if _cacheable(result):
+        # Store a copy so the caller mutating its result cannot alter the entry
+        cache.put(key, request_context["user_id"], copy.deepcopy(result))
+    return result
+
+
+async def _execute_pipeline(
+    request_context: Dict[str, Any],
+    config: PipelineConfig,
+    engine: Optional[AccessOpsEngine],
+    on_event: Optional[PipelineEventSink] = None
+) -> PipelineResult:
+    print(f"🚀 Starting Pipeline for {request_context['request_id']}")
     
-    initial_score = await execute_agent_with_trace(
-        agent=agents["analyst"],
-        prompt=scoring_prompt,
-        session_service=session_service,
-        session_id=session_id  # FIXED: Use same session
-    )
+    # PHASE 0: Triage - deterministic checks decide whether the agents run
+    triage_trace = None
+    prefetched = None
+    if config.triage:
+        start = time.perf_counter()
+        prefetched = await gather_investigation(request_context)
+        triage_score = score_request(request_context, prefetched["response"])
+        triage = triage_request(request_context, prefetched["response"], triage_score)
+        triage_trace = {
+            "phase": "triage",
+            "agent": "triage",
+            "route": triage["route"],
+            "reason": triage["reason"],
+            "latency_ms": round((time.perf_counter() - start) * 1000, 3)
+        }
+        print(f"\n⚡ PHASE 0: Triage → {triage['route']} ({triage['reason']})")
+        if on_event is not None:
+            on_event({"type": "phase", "phase": "triage", "output": triage, "trace": triage_trace})
+        
+        if triage["route"] != "full_review":
+            investigation = prefetched["response"]
+            decision = fast_path_decision(triage, triage_score)
+            result = PipelineResult(
+                request_id=request_context["request_id"],
+                decision=decision["decision"],
+                risk_score=triage_score,
+                investigation=investigation,
+                board_report=render_board_report(request_context, investigation, triage_score, decision),
+                execution_trace=[
+                    triage_trace,
+                    {
+                        "phase": "investigation",
+                        "agent": "investigator",
+                        "mode": "direct",
+                        "tool_calls": prefetched["tool_calls"]
+                    },
+                    {"phase": "scoring", "agent": "severity_analyst", "mode": "native", "score": triage_score},
+                    {"phase": "authorization", "agent": "gatekeeper", "mode": "fast_path", "decision": decision}
+                ]
+            )
+            if on_event is not None:
+                _emit_result_phases(result, on_event, skip=("triage",))
+            return result
     
-    print(f"   ✓ Score: {initial_score['response'].get('net_risk_score', 'N/A')}")
-    execution_trace.append({
-        "phase": "scoring",
-        "agent": "severity_analyst",
-        "score": initial_score["response"]
-    })
+    # Shared model, agents and runners; sessions are per run. The first
+    # build imports ADK and constructs every agent, so it runs off the loop.
+    engine = engine or _engine or await asyncio.to_thread(get_engine)
+    request_id = request_context["request_id"]
+    opened_sessions: List[str] = []
+    shared_session_id = None
+    if config.session_strategy != "isolated":
+        shared_session_id = await engine.open_session(
+            request_id,
+            trim_history=config.session_strategy == "shared_trimmed"
+        )
+        opened_sessions.append(shared_session_id)
     
-    # PHASE 3: Critique
-    print("\n🧐 PHASE 3: Internal Audit Review")
-    critique_prompt = f"""
-    Review this assessment:
+    async def session_for(phase: str) -> str:
+        # The critic runs concurrently with the gatekeeper, so it never
+        # joins the shared session; that keeps the shared history deterministic.
+        if shared_session_id is not None and phase != "critique":
+            return shared_session_id
+        session_id = await engine.open_session(f"{request_id}-{phase}")
+        opened_sessions.append(session_id)
+        return session_id
     
-    Investigation: {json.dumps(investigation['response'], indent=2)}
-    Score: {json.dumps(initial_score['response'], indent=2)}
-    """
+    # PHASE 1: Investigation
+    async def investigate(_: Dict[str, Any]):
+        print("\n🔍 PHASE 1: Context Investigation")
+        if config.investigation_mode == "direct" and prefetched is not None:
+            # Already gathered by triage
+            investigation = prefetched
+        elif config.investigation_mode == "llm":
+            investigation_prompt = build_prompt(
+                "investigation",
+                "Investigate this access request. Call ALL tools to gather complete context.",
+                [("Request", request_context)]
+            )
+            
+            investigation = await engine.execute(
+                "investigator", investigation_prompt.text, await session_for("investigation")
+            )
+            investigation["prompt"] = investigation_prompt.stats()
+        else:
+            investigation = await gather_investigation(request_context)
+        
+        print(f"   ✓ Tools called: {[tc['tool'] for tc in investigation['tool_calls']]}")
+        trace = {
+            "phase": "investigation",
+            "agent": "investigator",
+            "mode": config.investigation_mode,
+            "tool_calls": investigation["tool_calls"]
+        }
+        if "usage" in investigation:
+            trace["usage"] = investigation["usage"]
+            trace["prompt"] = investigation["prompt"]
+            trace["validation"] = investigation.get("validation")
+            _record_agent_error(trace, investigation)
+        return investigation["response"], trace
     
-    critique = await execute_agent_with_trace(
-        agent=agents["critic"],
-        prompt=critique_prompt,
-        session_service=session_service,
-        session_id=session_id  # FIXED: Use same session
-    )
+    # PHASE 2: Risk Scoring (deterministic; the LLM analyst may only review)
+    async def score(outputs: Dict[str, Any]):
+        print("\n📊 PHASE 2: Risk Scoring (NIST 800-53)")
+        initial_score = score_request(request_context, outputs["investigation"])
+        trace = {
+            "phase": "scoring",
+            "agent": "severity_analyst",
+            "mode": config.scoring_mode,
+            "score": initial_score
+        }
+        
+        if config.scoring_mode == "review":
+            scoring_prompt = build_prompt(
+                "scoring",
+                "Review this deterministic risk score using your method. Report your own "
+                "figures with the same keys; the deterministic score remains authoritative.",
+                [
+                    ("Deterministic Score", initial_score),
+                    ("Context", outputs["investigation"]),
+                    ("Request", request_context),
+                ]
+            )
+            
+            review = await engine.execute("analyst", scoring_prompt.text, await session_for("scoring"))
+            trace["review"] = review["response"]
+            trace["usage"] = review["usage"]
+            trace["prompt"] = scoring_prompt.stats()
+            trace["validation"] = review.get("validation")
+            _record_agent_error(trace, review)
+        
+        print(f"   ✓ Score: {initial_score['net_risk_score']} ({initial_score['severity_level']})")
+        return initial_score, trace
     
-    final_score = initial_score["response"]
-    if critique["response"].get("critique_valid"):
-        print(f"   ⚠️ Critique: {critique['response'].get('critique_reasoning', '')[:100]}...")
+    # PHASE 3: Critique
+    async def critique(outputs: Dict[str, Any]):
+        print("\n🧐 PHASE 3: Internal Audit Review")
+        critique_prompt = build_prompt(
+            "critique",
+            "Review this assessment:",
+            [("Score", outputs["scoring"]), ("Investigation", outputs["investigation"])]
+        )
+        
+        review = await engine.execute("critic", critique_prompt.text, await session_for("critique"))
+        
+        if review["response"].get("critique_valid"):
+            print(f"   ⚠️ Critique: {review['response'].get('critique_reasoning', '')[:100]}...")
+        
+        trace = {
+            "phase": "critique",
+            "agent": "critic",
+            "critique": review["response"],
+            "usage": review["usage"],
+            "prompt": critique_prompt.stats(),
+            "validation": review.get("validation")
+        }
+        _record_agent_error(trace, review)
+        return review["response"], trace
     
-    execution_trace.append({
-        "phase": "critique",
-        "agent": "critic",
-        "critique": critique["response"]
-    })
+    # PHASE 4: Gatekeeper (deterministic; the LLM may only explain)
+    async def authorize(outputs: Dict[str, Any]):
+        print("\n🚦 PHASE 4: Authorization")
+        final_score = outputs["scoring"]
+        decision = decide_authorization(final_score, outputs["investigation"])
+        explanation = None
+        
+        if config.gatekeeper_mode == "explain":
+            gatekeeper_prompt = build_prompt(
+                "authorization",
+                "Explain this authorization decision:",
+                [("Decision", decision), ("Risk", final_score), ("Context", outputs["investigation"])]
+            )
+            
+            explanation = await engine.execute(
+                "gatekeeper", gatekeeper_prompt.text, await session_for("authorization")
+            )
+            narrative = explanation["response"].get("reasoning")
+            if narrative:
+                decision["narrative"] = narrative
+        
+        decision_type = decision["decision"]
+        print(f"   ✓ Decision: {decision_type} ({decision['rule']})")
+        
+        if decision_type in ["DENY", "PENDING_HUMAN_REVIEW"]:
+            print("   🛑 STOP! Human intervention required")
+        
+        trace = {
+            "phase": "authorization",
+            "agent": "gatekeeper",
+            "mode": config.gatekeeper_mode,
+            "decision": decision
+        }
+        if explanation is not None:
+            trace["usage"] = explanation["usage"]
+            trace["prompt"] = gatekeeper_prompt.stats()
+            trace["validation"] = explanation.get("validation")
+            _record_agent_error(trace, explanation)
+        return decision, trace
     
-    # PHASE 4: Gatekeeper
-    print("\n🚦 PHASE 4: Authorization")
-    gatekeeper_prompt = f"""
-    Make authorization decision:
+    # PHASE 5: Board Report
+    async def narrate(outputs: Dict[str, Any]):
+        print("\n📝 PHASE 5: Executive Report")
+        report_prompt = build_prompt(
+            "report",
+            "Generate Board report:",
+            [
+                ("Decision", outputs["authorization"]),
+                ("Risk", outputs["scoring"]),
+                ("Investigation", outputs["investigation"]),
+            ]
+        )
+        
+        on_text = None
+        if on_event is not None:
+            on_text = lambda chunk: on_event({"type": "token", "phase": "report", "text": chunk})
+        report = await engine.execute(
+            "narrator", report_prompt.text, await session_for("report"), on_text=on_text
+        )
+        
+        board_report = report["response"].get("markdown_report", report["raw_output"])
+        print("   ✓ Report generated")
+        trace = {
+            "phase": "report",
+            "agent": "narrator",
+            "usage": report["usage"],
+            "prompt": report_prompt.stats()
+        }
+        _record_agent_error(trace, report)
+        if not board_report and "error" not in trace:
+            trace["error"] = "empty_board_report"
+        return board_report, trace
     
-    Risk: {json.dumps(final_score, indent=2)}
-    Context: {json.dumps(investigation['response'], indent=2)}
-    """
+    phases = [
+        Phase("investigation", (), investigate),
+        Phase("scoring", ("investigation",), score),
+        Phase("critique", ("investigation", "scoring"), critique),
+        Phase("authorization", ("investigation", "scoring"), authorize),
+        Phase("report", ("investigation", "scoring", "authorization"), narrate),
+    ]
+    try:
+        on_phase = None
+        if on_event is not None:
+            on_phase = lambda name, output, trace: on_event(
+                {"type": "phase", "phase": name, "output": output, "trace": trace}
+            )
+        outputs, traces = await run_phase_graph(
+            phases, concurrent=config.concurrent_phases, on_phase=on_phase
+        )
+    finally:
+        for session_id in opened_sessions:
+            await engine.close_session(session_id)
     
-    decision = await execute_agent_with_trace(
-        agent=agents["gatekeeper"],
-        prompt=gatekeeper_prompt,
-        session_service=session_service,
-        session_id=session_id  # FIXED: Use same session
+    return PipelineResult(
+        request_id=request_context["request_id"],
+        decision=outputs["authorization"]["decision"],
+        risk_score=outputs["scoring"],
+        investigation=outputs["investigation"],
+        board_report=outputs["report"],
+        execution_trace=[t for t in [triage_trace] + traces if t is not None]
     )
-    
-    decision_type = decision["response"].get("decision", "PENDING_HUMAN_REVIEW")
-    print(f"   ✓ Decision: {decision_type}")
-    
-    if decision_type in ["DENY", "PENDING_HUMAN_REVIEW"]:
-        print("   🛑 STOP! Human intervention required")
-    
-    execution_trace.append({
-        "phase": "authorization",
-        "agent": "gatekeeper",
-        "decision": decision["response"]
-    })
-    
-    # PHASE 5: Board Report
-    print("\n📝 PHASE 5: Executive Report")
-    report_prompt = f"""
-    Generate Board report:
-    
-    Investigation: {json.dumps(investigation['response'], indent=2)}
-    Risk: {json.dumps(final_score, indent=2)}
-    Decision: {json.dumps(decision['response'], indent=2)}
+
+
+async def run_pipeline_events(
+    request_context: Dict[str, Any],
+    config: Optional[PipelineConfig] = None,
+    engine: Optional[AccessOpsEngine] = None
+) -> AsyncIterator[Dict[str, Any]]:
     """
+    run_pipeline as a stream of progress events, for progressive UIs.
     
-    report = await execute_agent_with_trace(
-        agent=agents["narrator"],
-        prompt=report_prompt,
-        session_service=session_service,
-        session_id=session_id  # FIXED: Use same session
-    )
+    Yields phase events as each phase completes, token events while the
+    narrator writes the board report, then {"type": "result", "result":
+    PipelineResult}. Pipeline errors are raised from the iterator; closing
+    it early cancels the run.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    finished = object()
     
-    board_report = report["response"].get("markdown_report", report["raw_output"])
-    print("   ✓ Report generated")
+    async def produce() -> None:
+        try:
+            result = await run_pipeline(request_context, config, engine, on_event=queue.put_nowait)
+            queue.put_nowait({"type": "result", "result": result})
+        finally:
+            queue.put_nowait(finished)
     
-    return PipelineResult(
-        request_id=request_context["request_id"],
-        decision=decision_type,
-        risk_score=final_score,
-        investigation=investigation["response"],
-        board_report=board_report,
-        execution_trace=execution_trace
-    )
+    task = asyncio.create_task(produce())
+    try:
+        while True:
+            event = await queue.get()
+            if event is finished:
+                break
+            yield event
+        await task
+    finally:
+        if not task.done():
+            task.cancel()
 
 
 # ============================================================================
-# SECTION 6: MAIN EXECUTION
+# SECTION 8: MAIN EXECUTION
 # ============================================================================
 
 async def main():
@@ -643,4 +1689,18 @@ async def main():
 
 # Run in Kaggle
 if __name__ == "__main__":
+    import sys
+    
+    if len(sys.argv) > 1 and sys.argv[1] == "batch":
+        # python -m accessops_engine batch requests.jsonl [--concurrency N] [--out results.jsonl]
+        import batch_runner
+        sys.exit(batch_runner.main(sys.argv[2:], pipeline=run_pipeline))
+    if len(sys.argv) > 1 and sys.argv[1] == "board-pack":
+        # python -m accessops_engine board-pack results.jsonl [--format zip|merged] [--out pack.zip]
+        import board_pack
+        sys.exit(board_pack.main(sys.argv[2:]))
+    if len(sys.argv) > 1 and sys.argv[1] == "audit":
+        # python -m accessops_engine audit query|count|stats [--decision DENY] [--user 'svc_*'] [--since DATE]
+        import audit_store
+        sys.exit(audit_store.main(sys.argv[2:]))
     asyncio.run(main())
@@ -1,14 +1,13 @@
 import os
 import json
-import asyncio
-import io
+import uuid
 from datetime import datetime, timezone
-from typing import Any, Dict, List
+from typing import TYPE_CHECKING, Any, Dict, List
 
-import nest_asyncio
-import plotly.graph_objects as go
 import streamlit as st
-from streamlit_monaco import st_monaco 
+
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
 
 # One-time session timestamp in UTC 
 session_timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
@@ -16,14 +15,17 @@ session_timestamp = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
 # ---------------------------------------------------------------------
 # 0. ENGINE WIRING
 # ---------------------------------------------------------------------
+# Importing accessops_engine is cheap: google.adk/genai load when the engine
+# is first built (the first full-review run). plotly, ReportLab (board_pack)
+# and the Monaco editor are imported where they are used, so first paint
+# pays only for Streamlit and the editor.
 try:
     import accessops_engine
+    from background_loop import get_background_loop
 except ImportError:
     st.error("CRITICAL ERROR: 'accessops_engine.py' not found. Please ensure it is in the same directory.")
     st.stop()
 
-# Allow re-entrant event loop for Streamlit
-nest_asyncio.apply()
 
 # ---------------------------------------------------------------------
 # 1. PAGE CONFIG & LIGHT THEME
@@ -153,7 +155,9 @@ if "result" not in st.session_state:
 # ---------------------------------------------------------------------
 # 3. HELPERS
 # ---------------------------------------------------------------------
-def create_risk_gauge(score: float) -> go.Figure:
+def create_risk_gauge(score: float) -> "go.Figure":
+    import plotly.graph_objects as go
+
     score = score or 0
     fig = go.Figure(
         go.Indicator(
@@ -196,293 +200,157 @@ def format_badge(label: str, emoji: str) -> str:
 
 def create_pdf_bytes(board_report_md: str, title: str) -> bytes:
     """
-    Generate a Board Report PDF that closely matches the Streamlit UI:
-      - Title: AccessOps Board Report – <REQ-ID>
-      - 🛡 Executive Board Report heading + paragraph
-      - 🚦 Risk Factor Analysis (NIST/COBIT) table
-        * Status column uses per-row "traffic light" status (🔴 / 🟡 / 🟢)
-      - 📋 Recommended Management Action (supports numbered list OR single paragraph)
-
-    This version uses ReportLab Platypus so it plays nicely with the rest of the app.
+    Generate a Board Report PDF that closely matches the Streamlit UI
+    (layout and styles live in board_pack.py, shared with the bulk
+    board-pack renderer).
     """
+    import board_pack
 
-    import io
-    from reportlab.lib.pagesizes import LETTER
-    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-    from reportlab.lib import colors
-    from reportlab.lib.units import inch
-
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(
-        buffer,
-        pagesize=LETTER,
-        rightMargin=72,
-        leftMargin=72,
-        topMargin=72,
-        bottomMargin=72,
-    )
-
-    styles = getSampleStyleSheet()
+    return board_pack.render_board_report_pdf(board_report_md, title)
 
-    # Styles roughly matching UI
-    h_title = ParagraphStyle(
-        name="ReportTitle",
-        parent=styles["Heading1"],
-        fontSize=16,
-        leading=20,
-        spaceAfter=12,
-    )
-    h_section = ParagraphStyle(
-        name="SectionHeading",
-        parent=styles["Heading2"],
-        fontSize=14,
-        leading=18,
-        spaceAfter=10,
-    )
-    body = ParagraphStyle(
-        name="Body",
-        parent=styles["BodyText"],
-        fontSize=10,
-        leading=14,
-        spaceAfter=10,
-    )
 
-    story = []
-
-    # ------------------------------------------------------------------
-    # 0. Top title ("AccessOps Board Report – REQ-XXX")
-    # ------------------------------------------------------------------
-    story.append(Paragraph(title, h_title))
-    story.append(Spacer(1, 6))
-
-    lines = board_report_md.splitlines()
-
-    # ------------------------------------------------------------------
-    # 1. Executive Board Report (🛡 heading + paragraph)
-    # ------------------------------------------------------------------
-    story.append(Paragraph("🛡 Executive Board Report", h_section))
-
-    exec_summary_lines = []
-    i = 0
-    while i < len(lines):
-        line = lines[i].strip()
-        if "Executive Board Report" in line:
-            # consume following non-empty lines until blank or next heading
-            i += 1
-            while i < len(lines):
-                l = lines[i].strip()
-                if not l:
-                    break
-                # skip markdown headings
-                if l.startswith("#"):
-                    break
-                exec_summary_lines.append(l)
-                i += 1
-            break
-        i += 1
-
-    if exec_summary_lines:
-        exec_text = " ".join(exec_summary_lines)
-        story.append(Paragraph(exec_text, body))
-        story.append(Spacer(1, 12))
-
-    # ------------------------------------------------------------------
-    # 2. Risk Factor Analysis (🚦 heading + table)
-    # ------------------------------------------------------------------
-    story.append(Paragraph("🚦 Risk Factor Analysis (NIST/COBIT)", h_section))
-
-    headers = []
-    rows = []
-
-    i = 0
-    while i < len(lines):
-        if "| Status" in lines[i] and "Risk Component" in lines[i]:
-            # header row
-            header_cells = [c.strip() for c in lines[i].strip().split("|") if c.strip()]
-            headers = header_cells
-            # skip separator row
-            i += 2
-            # data rows
-            while i < len(lines) and lines[i].strip().startswith("|"):
-                cells = [c.strip() for c in lines[i].strip().split("|") if c.strip()]
-                rows.append(cells)
-                i += 1
-            break
-        i += 1
-
-    # Clean markdown from data cells (remove **)
-    cleaned_rows = []
-    for r in rows:
-        cleaned_rows.append([cell.replace("**", "") for cell in r])
-
-    # Table rendering: Status column shows traffic-light status
-    if headers and cleaned_rows:
-        col_widths = [0.6 * inch, 2.1 * inch, 3.0 * inch]
-        table_data = [headers] + cleaned_rows
-
-        t = Table(table_data, colWidths=col_widths, repeatRows=1)
-        ts = TableStyle(
-            [
-                ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
-                ("TEXTCOLOR", (0, 0), (-1, 0), colors.black),
-                ("ALIGN", (0, 0), (-1, -1), "LEFT"),
-                ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                ("FONTSIZE", (0, 0), (-1, 0), 10),
-                ("BOTTOMPADDING", (0, 0), (-1, 0), 6),
-                ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-            ]
-        )
+# Derived views are memoized per (request_id, run_key): run_key changes on
+# every completed run, so a re-run of the same request never sees stale
+# bytes. Underscore arguments are not hashed.
+@st.cache_resource(max_entries=101, show_spinner=False)
+def cached_risk_gauge(score: float) -> "go.Figure":
+    """Gauge figures are never mutated after construction; share one per score."""
+    return create_risk_gauge(score)
 
-        # Status column colors (per-row)
-        for row_idx in range(1, len(table_data)):
-            status_cell = table_data[row_idx][0]
-            status_str = str(status_cell).strip()
-            # Map emojis / words to colors
-            if "🔴" in status_str or "HIGH" in status_str.upper() or "CRIT" in status_str.upper():
-                fill = colors.red
-            elif "🟡" in status_str or "MED" in status_str.upper():
-                fill = colors.yellow
-            elif "🟠" in status_str or "ORANGE" in status_str.upper():
-                fill = colors.orange
-            else:
-                # default LOW/green
-                fill = colors.green
-            ts.add("BACKGROUND", (0, row_idx), (0, row_idx), fill)
-            ts.add("TEXTCOLOR", (0, row_idx), (0, row_idx), colors.white)
-            ts.add("ALIGN", (0, row_idx), (0, row_idx), "CENTER")
-
-        t.setStyle(ts)
-        story.append(t)
-        story.append(Spacer(1, 12))
-
-    # ------------------------------------------------------------------
-    # 3. Recommended Management Action (📋 heading + body)
-    # ------------------------------------------------------------------
-    story.append(Paragraph("📋 Recommended Management Action", h_section))
-
-    actions_raw = []
-    i = 0
-    while i < len(lines):
-        if "Recommended Management Action" in lines[i]:
-            i += 1
-            while i < len(lines):
-                l = lines[i].strip()
-                if not l:
-                    i += 1
-                    continue
-                # stop if we hit another markdown heading (unlikely at end)
-                if l.startswith("#"):
-                    break
-                actions_raw.append(l)
-                i += 1
-            break
-        i += 1
-
-    if actions_raw:
-        # Determine if we have numbered list items like "1. text"
-        numbered = all(
-            (len(l) > 2 and l[0].isdigit() and l[1] in {".", ")"})
-            for l in actions_raw
-        )
-        if numbered:
-            # Render each as its own numbered paragraph
-            for l in actions_raw:
-                # strip leading "1. " or "1) "
-                parts = l.split(" ", 1)
-                if len(parts) == 2 and parts[0][0].isdigit():
-                    text = parts[1]
-                else:
-                    text = l
-                story.append(Paragraph(text, body))
-        else:
-            # Treat as a single paragraph (e.g. DevOps LOW-risk example)
-            combined = " ".join(actions_raw)
-            story.append(Paragraph(combined, body))
 
-    doc.build(story)
-    pdf_bytes = buffer.getvalue()
-    buffer.close()
-    return pdf_bytes
+@st.cache_data(max_entries=64, show_spinner=False)
+def normalize_board_report(request_id: str, run_key: str, _board_report: str) -> str:
+    """Board report with the heading renamed to "Executive Board Report"."""
+    import board_pack
 
+    return board_pack.normalize_board_report(_board_report)
 
 
+@st.cache_data(max_entries=64, show_spinner=False)
+def board_report_pdf(request_id: str, run_key: str, _normalized_board_report: str) -> bytes:
+    import board_pack
 
-    styles = getSampleStyleSheet()
-    h1 = ParagraphStyle(
-        "h1",
-        parent=styles["Heading1"],
-        fontSize=18,
-        spaceAfter=12,
-        leading=22,
-    )
-    h2 = ParagraphStyle(
-        "h2",
-        parent=styles["Heading2"],
-        fontSize=15,
-        spaceAfter=10,
-        leading=20,
-    )
-    body = ParagraphStyle(
-        "body",
-        parent=styles["BodyText"],
-        fontSize=11,
-        leading=16,
-    )
+    return create_pdf_bytes(_normalized_board_report, board_pack.report_title(request_id))
 
-    doc = SimpleDocTemplate(filename, pagesize=letter, leftMargin=50, rightMargin=50)
-    story = []
 
-    # Title
-    story.append(Paragraph("<b>AccessOps Board Report</b>", h1))
-    story.append(Spacer(1, 6))
+@st.cache_data(max_entries=64, show_spinner=False)
+def audit_log_markdown(request_id: str, run_key: str, _audit_log: Dict[str, Any]) -> bytes:
+    audit_log_md = "```json\n" + json.dumps(_audit_log, indent=2) + "\n```"
+    return audit_log_md.encode("utf-8")
 
-    # EXECUTIVE SUMMARY
-    story.append(Paragraph("🛡️ <b>Executive Board Report</b>", h2))
-    story.append(Paragraph(executive_summary, body))
-    story.append(Spacer(1, 12))
 
-    # RISK FACTOR ANALYSIS
-    story.append(Paragraph("🚦 <b>Risk Factor Analysis (NIST/COBIT)</b>", h2))
+def run_pipeline_sync(request_context: Dict[str, Any], on_event=None):
+    """
+    Helper to run the async pipeline from Streamlit safely.
+    The pipeline runs on the process-wide background event loop shared by
+    all sessions; this script thread only waits for its events. on_event is
+    called with every progress event (see run_pipeline_events) as it
+    arrives, so the page can render phases before the run finishes.
+    A session's previous run is cancelled when it starts a new one.
+    No engine is passed: the pipeline builds the process-wide one (agents,
+    runners, ADK) only when a request reaches full review, so fast-path
+    requests never pay for it.
+    """
+    previous = st.session_state.get("pipeline_run")
+    if previous is not None:
+        previous.cancel()
 
-    table_data = [["Status", "Risk Component", "Audit Note"]]
-    for row in risk_rows:
-        table_data.append([row[0], row[1], row[2]])
+    run = get_background_loop().stream(lambda: accessops_engine.run_pipeline_events(request_context))
+    st.session_state["pipeline_run"] = run
+    result = None
+    try:
+        for event in run:
+            if event["type"] == "result":
+                result = event["result"]
+            elif on_event is not None:
+                on_event(event)
+    finally:
+        # Iteration also ends early when Streamlit stops this script run
+        if st.session_state.get("pipeline_run") is run:
+            st.session_state["pipeline_run"] = None
+    return result
+
+
+LIVE_PHASES = [
+    ("investigation", "1️⃣ Investigator"),
+    ("scoring", "2️⃣ Severity Analyst"),
+    ("critique", "3️⃣ Critic"),
+    ("authorization", "4️⃣ Gatekeeper"),
+    ("report", "5️⃣ Narrator"),
+]
 
-    table = Table(table_data, colWidths=[60, 170, 230])
-    table.setStyle(
-        TableStyle(
-            [
-                ("BACKGROUND", (0, 0), (-1, 0), colors.whitesmoke),
-                ("TEXTCOLOR", (0, 0), (-1, 0), colors.black),
-                ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
-                ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                ("FONTNAME", (0, 1), (-1, -1), "Helvetica"),
-                ("FONTSIZE", (0, 0), (-1, -1), 10),
-                ("ALIGN", (0, 0), (-1, -1), "LEFT"),
-                ("VALIGN", (0, 0), (-1, -1), "TOP"),
-            ]
-        )
-    )
 
-    risk_rows = [
-    ("🔴", "Inherent Risk", "Score: TBD"),
-    ("🟡", "Control Effectiveness", "API Quota Exceeded"),
-    ("🔴", "Compliance Gaps", "TBD"),
-    ("🔴", "Net Risk Score", "PENDING")
-]
-    
-def run_pipeline_sync(request_context: Dict[str, Any]):
+class LivePipelineView:
     """
-    Helper to run the async pipeline from Streamlit safely.
-    Uses the existing event loop or creates one if needed.
+    Placeholders for each phase, filled in as pipeline events land.
+
+    The narrator's board report is re-rendered on every streamed chunk.
     """
-    try:
-        loop = asyncio.get_event_loop()
-    except RuntimeError:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-    return loop.run_until_complete(accessops_engine.run_pipeline(request_context))
+
+    def __init__(self, container):
+        self.container = container
+        with container.container():
+            st.markdown('<div class="step-header">⏱️ Live Agent Progress</div>', unsafe_allow_html=True)
+            self.banner = st.empty()
+            self.slots = {}
+            for phase, label in LIVE_PHASES:
+                self.slots[phase] = st.empty()
+                self.slots[phase].markdown(f"⏳ **{label}** – waiting…")
+        self.report_text = ""
+
+    def __call__(self, event: Dict[str, Any]) -> None:
+        phase = event.get("phase")
+        if event["type"] == "token":
+            self.report_text += event["text"]
+            self.slots["report"].markdown("✍️ **5️⃣ Narrator** – writing…\n\n" + self.report_text)
+            return
+
+        output = event.get("output")
+        if phase not in ("report", "authorization", "critique") and not isinstance(output, dict):
+            output = {}
+        if phase == "cache":
+            source = output.get("source_request_id")
+            self.banner.info(
+                "♻️ Served from the decision cache"
+                + (f" (from {source})" if source else "")
+                + " – identity data and policies unchanged."
+            )
+        elif phase == "triage":
+            self.banner.info(
+                f"⚡ Triage → **{output.get('route', 'unknown')}** – {output.get('reason', 'no reason recorded')}"
+            )
+        elif phase == "investigation":
+            violations = output.get("policy_violations") or []
+            signals = [k.replace("_", " ") for k, v in (output.get("risk_signals") or {}).items() if v]
+            self.slots[phase].markdown(
+                f"✅ **1️⃣ Investigator** – {len(violations)} policy violation(s); "
+                f"signals: {', '.join(signals) or 'none'}"
+            )
+        elif phase == "scoring":
+            with self.slots[phase].container():
+                st.markdown(
+                    f"✅ **2️⃣ Severity Analyst** – net risk {output.get('net_risk_score', 0)}/100 "
+                    f"({output.get('severity_level', 'UNKNOWN')})"
+                )
+                st.plotly_chart(
+                    cached_risk_gauge(float(output.get("net_risk_score", 0) or 0)),
+                    use_container_width=True,
+                    key="live_risk_gauge",
+                )
+        elif phase == "critique":
+            reasoning = (output or {}).get("critique_reasoning") or "No objections raised."
+            self.slots[phase].markdown(f"✅ **3️⃣ Critic** – {reasoning}")
+        elif phase == "authorization":
+            decision = (output or {}).get("decision", "UNKNOWN")
+            if "DENY" in decision.upper() or "REVIEW" in decision.upper():
+                self.slots[phase].error(f"🛑 **4️⃣ Gatekeeper** – {decision}")
+            else:
+                self.slots[phase].success(f"✅ **4️⃣ Gatekeeper** – {decision}")
+        elif phase == "report":
+            self.slots[phase].markdown("✅ **5️⃣ Narrator**\n\n" + (output or self.report_text))
+
+    def clear(self) -> None:
+        self.container.empty()
 
 
 # ---------------------------------------------------------------------
@@ -680,6 +548,8 @@ with input_col:
     st.caption("This JSON is passed into the ADK / Vortex agentic pipeline.")
     
     # Monaco editor with JSON syntax highlighting (no key argument)
+    from streamlit_monaco import st_monaco
+
     request_text = st_monaco(
         value=json.dumps(default_json, indent=2),
         language="json",
@@ -726,8 +596,11 @@ if run_btn:
                 + ". Please add them and re-run."
             )
         else:
+            # Render each phase as it completes; the full dashboard below
+            # replaces the live view once the run is done
+            live_view = LivePipelineView(output_col.empty())
             try:
-                result = run_pipeline_sync(req_data)
+                result = run_pipeline_sync(req_data, on_event=live_view)
             except Exception as e:
                 st.session_state["result"] = None
                 st.session_state["req_data"] = None
@@ -740,10 +613,271 @@ if run_btn:
             else:
                 st.session_state["result"] = result
                 st.session_state["req_data"] = req_data
+                st.session_state["run_key"] = uuid.uuid4().hex
                 st.session_state["error_msg"] = None
+            live_view.clear()
 
 # ---------------------------------------------------------------------
-# 8. RENDER OUTPUT (PERSISTS ACROSS INTERACTIONS)
+# 8. DASHBOARD TABS
+# Each tab is a fragment: a widget inside one tab reruns only that tab,
+# not the whole page and the other four tabs.
+# ---------------------------------------------------------------------
+@st.fragment
+def render_overview_tab(view: Dict[str, Any]) -> None:
+    """Executive Overview: metrics, gauge, board report and downloads."""
+    decision = view["decision"]
+    decision_state = view["decision_state"]
+    score = view["score"]
+    severity = view["severity"]
+    policy_violations = view["policy_violations"]
+    board_report = view["board_report"]
+    req_data = view["req_data"]
+    risk_score_obj = view["risk_score_obj"]
+    investigation = view["investigation"]
+    execution_trace = view["execution_trace"]
+    request_id = view["request_id"]
+    run_key = view["run_key"]
+    m1, m2, m3 = st.columns(3)
+    m1.metric("Decision", decision, delta="STOP" if score > 50 else "GO", delta_color="inverse")
+    m2.metric(
+        "Net Risk Score",
+        f"{score:.0f}/100",
+        delta=severity,
+        delta_color="inverse",
+    )
+    m3.metric(
+        "Policy Violations",
+        len(policy_violations),
+        delta="DETECTED" if policy_violations else "None",
+        delta_color="inverse",
+    )
+
+    st.plotly_chart(cached_risk_gauge(float(score)), use_container_width=True)
+
+    if decision_state == "error":
+        st.error(
+            "🛑 **BLOCKED / ESCALATE** – This access request breaches SoD / NIST guardrails. "
+            "See Risk Indicators & Board Report for detailed rationale."
+        )
+    else:
+        st.success(
+            "✅ **APPROVED / WITHIN GUARDRAILS** – Risk is within the defined policy envelope."
+        )
+
+    st.caption(
+        "Mapped to **NIST 800-53** controls (AC-6, IA-5, AU-6) and Segregation-of-Duties policies."
+    )
+    # Normalize heading: change "Executive Audit Summary" -> "Executive Board Report"
+    normalized_board_report = normalize_board_report(request_id, run_key, board_report)
+
+    # --- Executive / Board Report (collapsed by default to keep layout compact) ---
+    st.markdown("#### 📄 Executive / Board Report")
+
+    # Clear, accurate preview label
+    st.caption("Preview: ### 🛡️ Board and Audit Reports")
+
+    with st.expander("View full Board Report", expanded=False):
+        # Use the normalized version so the heading says "Executive Board Report"
+        st.markdown(normalized_board_report, unsafe_allow_html=True)
+
+        # --- Download buttons: Board Report first, then Audit Log ---
+        report_id = request_id
+
+        # Built once per run; later reruns reuse the cached bytes
+        pdf_bytes = board_report_pdf(
+            request_id,
+            run_key,
+            normalized_board_report,  # <- use normalized text in the PDF as well
+        )
+
+        audit_log = {
+            "request": req_data,
+            "decision": decision,
+            "risk_score": risk_score_obj,
+            "investigation": investigation,
+            "execution_trace": execution_trace,
+        }
+        audit_log_bytes = audit_log_markdown(request_id, run_key, audit_log)
+
+        dl_col1, dl_col2 = st.columns(2)
+        with dl_col1:
+            st.download_button(
+                label="📊 Board Report (PDF)",
+                data=pdf_bytes,
+                file_name=f"Board_Report_{report_id}.pdf",
+                mime="application/pdf",
+                on_click="ignore",
+                use_container_width=True,
+            )
+        with dl_col2:
+            st.download_button(
+                label="📄 Audit Log Report (Markdown)",
+                data=audit_log_bytes,
+                file_name=f"Audit_Log_{report_id}.md",
+                mime="text/markdown",
+                on_click="ignore",
+                use_container_width=True,
+            )
+
+
+    # Architecture diagram (Data Flow) – also in an expander, closed by default
+    with st.expander("📦 End-to-End AccessOps Pipeline (Architecture Diagram)", expanded=False):
+        try:
+            st.image("data_flow.png", use_column_width=True)
+        except Exception:
+            st.info("Architecture diagram PNG not found in repository (data_flow.png).")
+
+
+@st.fragment
+def render_signals_tab(view: Dict[str, Any]) -> None:
+    """Risk Indicators: investigator signals and the scoring JSON."""
+    investigation = view["investigation"]
+    risk_score_obj = view["risk_score_obj"]
+    st.markdown("#### 🚦 Risk Factor Analysis")
+    risk_signals = investigation.get("risk_signals", {}) or {}
+    if not isinstance(risk_signals, dict) or not risk_signals:
+        st.info(
+            "The engine did not return structured Risk Indicators  for this run. "
+            "Showing the full investigation details instead."
+        )
+        st.json(investigation)
+    else:
+        col_a, col_b = st.columns(2)
+        with col_a:
+            st.markdown("**Binary / Categorical Signals**")
+            for key, val in risk_signals.items():
+                emoji = "🔴" if bool(val) else "🟢"
+                label = key.replace("_", " ").title()
+                st.markdown(format_badge(label, emoji), unsafe_allow_html=True)
+        with col_b:
+            st.markdown("**High-Level Interpretation**")
+            high_flags = [k for k, v in risk_signals.items() if v]
+            if not high_flags:
+                st.success("No critical risk flags raised by the investigator.")
+            else:
+                st.error(
+                    "Raised signals: "
+                    + ", ".join(k.replace("_", " ") for k in high_flags)
+                )
+
+        st.markdown("---")
+        st.markdown("**Risk Scoring JSON**")
+        st.json(risk_score_obj)
+
+
+@st.fragment
+def render_context_tab(view: Dict[str, Any]) -> None:
+    """Context & Policies: identity context and policy violations."""
+    investigation = view["investigation"]
+    policy_violations = view["policy_violations"]
+    st.markdown("#### 🧩 Context Signals")
+    up = investigation.get("user_profile", {})
+    ent = investigation.get("current_access", {})
+    peer = investigation.get("peer_baseline", {})
+    act = investigation.get("activity_summary", {})
+
+    c1, c2 = st.columns(2)
+    with c1:
+        st.markdown("**Identity Profile (WHO)**")
+        st.json(up or {"note": "No user profile returned."})
+
+        st.markdown("**Current Entitlements (WHAT THEY ALREADY HAVE)**")
+        st.json(ent or {"note": "No entitlement data returned."})
+
+    with c2:
+        st.markdown("**Peer Baseline (NORM)**")
+        st.json(peer or {"note": "No peer baseline returned."})
+
+        st.markdown("**Recent Activity (BEHAVIOR)**")
+        st.json(act or {"note": "No SIEM / activity summary returned."})
+
+    st.markdown("---")
+    st.markdown("#### 📜 Policy Violations")
+    if not policy_violations:
+        st.success("No explicit policy violations detected.")
+    else:
+        for v in policy_violations:
+            policy_id = v.get("policy_id", "POLICY")
+            severity_v = v.get("severity", "SEVERITY")
+            with st.expander(f"🛑 {policy_id} – {severity_v}", expanded=True):
+                st.write(v.get("description", ""))
+                st.markdown(
+                    f"**NIST Control:** `{v.get('nist_control', 'N/A')}`  \n"
+                    f"**Finding:** {v.get('finding', 'N/A')}"
+                )
+
+    # Gatekeeper deterministic logic diagram
+    with st.expander("🚦 Gatekeeper Safety Logic (Deterministic Controls)", expanded=False):
+        try:
+            st.image("gatekeeper_logic.png", use_column_width=True)
+        except Exception:
+            st.info(
+                "Gatekeeper diagram PNG not found in repository "
+                "(5. Decision Logic Flow (Gatekeeper).png)."
+            )
+
+
+@st.fragment
+def render_trace_tab(view: Dict[str, Any]) -> None:
+    """Agent Trace (ADK): one expander per executed phase."""
+    execution_trace = view["execution_trace"]
+    st.markdown("#### 🧬 ADK Agent Trace")
+    if not execution_trace:
+        st.info(
+            "No detailed agent trace was returned for this request. "
+            "You can still review the decision, risk score and board report."
+        )
+    else:
+        for i, phase in enumerate(execution_trace, start=1):
+            phase_name = phase.get("phase", "unknown")
+            agent_name = phase.get("agent", "unknown")
+            with st.expander(f"{i}. Phase: {phase_name}", expanded=True):
+                st.markdown(
+                    f"<div class='caption-sm'>Agent: `{agent_name}`</div>",
+                    unsafe_allow_html=True,
+                )
+                st.markdown("<div class='trace-card'>", unsafe_allow_html=True)
+                st.json(phase)
+                st.markdown("</div>", unsafe_allow_html=True)
+
+    # Toxic scenario interaction diagram
+    with st.expander("🧪 Multi-Agent Sequence Diagram (Toxic Scenario)", expanded=False):
+        try:
+            st.image("agent_sequence_toxic.png", use_column_width=True)
+        except Exception:
+            st.info(
+                "Sequence diagram PNG not found in repository "
+                '(2. Agent Interaction Sequence (The "Toxic" Scenario).png).'
+            )
+
+
+@st.fragment
+def render_raw_tab(view: Dict[str, Any]) -> None:
+    """Raw JSON: every engine payload for this run."""
+    decision = view["decision"]
+    execution_trace = view["execution_trace"]
+    investigation = view["investigation"]
+    req_data = view["req_data"]
+    risk_score_obj = view["risk_score_obj"]
+    st.markdown("#### 🧾 Raw Engine Payloads")
+    st.markdown("**Request Context**")
+    st.json(req_data)
+    st.markdown("---")
+    st.markdown("**Investigation Output**")
+    st.json(investigation)
+    st.markdown("---")
+    st.markdown("**Risk Scoring Output**")
+    st.json(risk_score_obj)
+    st.markdown("---")
+    st.markdown("**Gatekeeper Decision JSON**")
+    st.json({"decision": decision})
+    st.markdown("---")
+    st.markdown("**Execution Trace**")
+    st.json(execution_trace)
+
+
+# ---------------------------------------------------------------------
+# 9. RENDER OUTPUT (PERSISTS ACROSS INTERACTIONS)
 # ---------------------------------------------------------------------
 with output_col:
     st.markdown('<div class="step-header">🧠 Step 4 – Agentic Reasoning Trace</div>', unsafe_allow_html=True)
@@ -856,224 +990,37 @@ with output_col:
         </style>
         """, unsafe_allow_html=True)
 
+        view = {
+            "decision": decision,
+            "decision_state": decision_state,
+            "score": score,
+            "severity": severity,
+            "policy_violations": policy_violations,
+            "board_report": board_report,
+            "req_data": req_data,
+            "risk_score_obj": risk_score_obj,
+            "investigation": investigation,
+            "execution_trace": execution_trace,
+            "request_id": req_data.get("request_id", "UNKNOWN"),
+            "run_key": st.session_state.get("run_key") or "",
+        }
+
         # Executive Overview
         with overview_tab:
-            m1, m2, m3 = st.columns(3)
-            m1.metric("Decision", decision, delta="STOP" if score > 50 else "GO", delta_color="inverse")
-            m2.metric(
-                "Net Risk Score",
-                f"{score:.0f}/100",
-                delta=severity,
-                delta_color="inverse",
-            )
-            m3.metric(
-                "Policy Violations",
-                len(policy_violations),
-                delta="DETECTED" if policy_violations else "None",
-                delta_color="inverse",
-            )
-
-            st.plotly_chart(create_risk_gauge(float(score)), use_container_width=True)
-
-            if decision_state == "error":
-                st.error(
-                    "🛑 **BLOCKED / ESCALATE** – This access request breaches SoD / NIST guardrails. "
-                    "See Risk Indicators & Board Report for detailed rationale."
-                )
-            else:
-                st.success(
-                    "✅ **APPROVED / WITHIN GUARDRAILS** – Risk is within the defined policy envelope."
-                )
-
-            st.caption(
-                "Mapped to **NIST 800-53** controls (AC-6, IA-5, AU-6) and Segregation-of-Duties policies."
-            )
-            # Normalize heading: change "Executive Audit Summary" -> "Executive Board Report"
-            normalized_board_report = board_report or "No board report returned."
-            normalized_board_report = normalized_board_report.replace(
-                "Executive Audit Summary", "Executive Board Report", 1
-            )
-            
-            # --- Executive / Board Report (collapsed by default to keep layout compact) ---
-            st.markdown("#### 📄 Executive / Board Report")
-            
-            # Clear, accurate preview label
-            st.caption("Preview: ### 🛡️ Board and Audit Reports")
-            
-            with st.expander("View full Board Report", expanded=False):
-                # Use the normalized version so the heading says "Executive Board Report"
-                st.markdown(normalized_board_report, unsafe_allow_html=True)
-            
-                # --- Download buttons: Board Report first, then Audit Log ---
-                report_id = req_data.get("request_id", "UNKNOWN")
-            
-                pdf_bytes = create_pdf_bytes(
-                    normalized_board_report,  # <- use normalized text in the PDF as well
-                    f"AccessOps Board Report – {report_id}",
-                )
-            
-                audit_log = {
-                    "request": req_data,
-                    "decision": decision,
-                    "risk_score": risk_score_obj,
-                    "investigation": investigation,
-                    "execution_trace": execution_trace,
-                }
-                audit_log_md = "```json\n" + json.dumps(audit_log, indent=2) + "\n```"
-                audit_log_bytes = audit_log_md.encode("utf-8")
-            
-                dl_col1, dl_col2 = st.columns(2)
-                with dl_col1:
-                    st.download_button(
-                        label="📊 Board Report (PDF)",
-                        data=pdf_bytes,
-                        file_name=f"Board_Report_{report_id}.pdf",
-                        mime="application/pdf",
-                        use_container_width=True,
-                    )
-                with dl_col2:
-                    st.download_button(
-                        label="📄 Audit Log Report (Markdown)",
-                        data=audit_log_bytes,
-                        file_name=f"Audit_Log_{report_id}.md",
-                        mime="text/markdown",
-                        use_container_width=True,
-                    )
-
-            
-            # Architecture diagram (Data Flow) – also in an expander, closed by default
-            with st.expander("📦 End-to-End AccessOps Pipeline (Architecture Diagram)", expanded=False):
-                try:
-                    st.image("data_flow.png", use_column_width=True)
-                except Exception:
-                    st.info("Architecture diagram PNG not found in repository (data_flow.png).")
+            render_overview_tab(view)
 
         # Risk Indicators 
         with signals_tab:
-            st.markdown("#### 🚦 Risk Factor Analysis")
-            risk_signals = investigation.get("risk_signals", {}) or {}
-            if not isinstance(risk_signals, dict) or not risk_signals:
-                st.info(
-                    "The engine did not return structured Risk Indicators  for this run. "
-                    "Showing the full investigation details instead."
-                )
-                st.json(investigation)
-            else:
-                col_a, col_b = st.columns(2)
-                with col_a:
-                    st.markdown("**Binary / Categorical Signals**")
-                    for key, val in risk_signals.items():
-                        emoji = "🔴" if bool(val) else "🟢"
-                        label = key.replace("_", " ").title()
-                        st.markdown(format_badge(label, emoji), unsafe_allow_html=True)
-                with col_b:
-                    st.markdown("**High-Level Interpretation**")
-                    high_flags = [k for k, v in risk_signals.items() if v]
-                    if not high_flags:
-                        st.success("No critical risk flags raised by the investigator.")
-                    else:
-                        st.error(
-                            "Raised signals: "
-                            + ", ".join(k.replace("_", " ") for k in high_flags)
-                        )
-
-                st.markdown("---")
-                st.markdown("**Risk Scoring JSON**")
-                st.json(risk_score_obj)
+            render_signals_tab(view)
 
         # Context & Policies
         with context_tab:
-            st.markdown("#### 🧩 Context Signals")
-            up = investigation.get("user_profile", {})
-            ent = investigation.get("current_access", {})
-            peer = investigation.get("peer_baseline", {})
-            act = investigation.get("activity_summary", {})
-
-            c1, c2 = st.columns(2)
-            with c1:
-                st.markdown("**Identity Profile (WHO)**")
-                st.json(up or {"note": "No user profile returned."})
-
-                st.markdown("**Current Entitlements (WHAT THEY ALREADY HAVE)**")
-                st.json(ent or {"note": "No entitlement data returned."})
-
-            with c2:
-                st.markdown("**Peer Baseline (NORM)**")
-                st.json(peer or {"note": "No peer baseline returned."})
-
-                st.markdown("**Recent Activity (BEHAVIOR)**")
-                st.json(act or {"note": "No SIEM / activity summary returned."})
-
-            st.markdown("---")
-            st.markdown("#### 📜 Policy Violations")
-            if not policy_violations:
-                st.success("No explicit policy violations detected.")
-            else:
-                for v in policy_violations:
-                    policy_id = v.get("policy_id", "POLICY")
-                    severity_v = v.get("severity", "SEVERITY")
-                    with st.expander(f"🛑 {policy_id} – {severity_v}", expanded=True):
-                        st.write(v.get("description", ""))
-                        st.markdown(
-                            f"**NIST Control:** `{v.get('nist_control', 'N/A')}`  \n"
-                            f"**Finding:** {v.get('finding', 'N/A')}"
-                        )
-
-            # Gatekeeper deterministic logic diagram
-            with st.expander("🚦 Gatekeeper Safety Logic (Deterministic Controls)", expanded=False):
-                try:
-                    st.image("gatekeeper_logic.png", use_column_width=True)
-                except Exception:
-                    st.info(
-                        "Gatekeeper diagram PNG not found in repository "
-                        "(5. Decision Logic Flow (Gatekeeper).png)."
-                    )
+            render_context_tab(view)
 
         # Agent Trace
         with trace_tab:
-            st.markdown("#### 🧬 ADK Agent Trace")
-            if not execution_trace:
-                st.info(
-                    "No detailed agent trace was returned for this request. "
-                    "You can still review the decision, risk score and board report."
-                )
-            else:
-                for i, phase in enumerate(execution_trace, start=1):
-                    phase_name = phase.get("phase", "unknown")
-                    agent_name = phase.get("agent", "unknown")
-                    with st.expander(f"{i}. Phase: {phase_name}", expanded=True):
-                        st.markdown(
-                            f"<div class='caption-sm'>Agent: `{agent_name}`</div>",
-                            unsafe_allow_html=True,
-                        )
-                        st.markdown("<div class='trace-card'>", unsafe_allow_html=True)
-                        st.json(phase)
-                        st.markdown("</div>", unsafe_allow_html=True)
-
-            # Toxic scenario interaction diagram
-            with st.expander("🧪 Multi-Agent Sequence Diagram (Toxic Scenario)", expanded=False):
-                try:
-                    st.image("agent_sequence_toxic.png", use_column_width=True)
-                except Exception:
-                    st.info(
-                        "Sequence diagram PNG not found in repository "
-                        '(2. Agent Interaction Sequence (The "Toxic" Scenario).png).'
-                    )
+            render_trace_tab(view)
 
         # Raw JSON
         with raw_tab:
-            st.markdown("#### 🧾 Raw Engine Payloads")
-            st.markdown("**Request Context**")
-            st.json(req_data)
-            st.markdown("---")
-            st.markdown("**Investigation Output**")
-            st.json(investigation)
-            st.markdown("---")
-            st.markdown("**Risk Scoring Output**")
-            st.json(risk_score_obj)
-            st.markdown("---")
-            st.markdown("**Gatekeeper Decision JSON**")
-            st.json({"decision": decision})
-            st.markdown("---")
-            st.markdown("**Execution Trace**")
-            st.json(execution_trace)
+            render_raw_tab(view)
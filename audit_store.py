@@ -0,0 +1,790 @@
+"""
+AccessOps Intelligence - Audit Store
+Durable, queryable record of every decision the engine makes.
+
+Each PipelineResult is appended to a local, append-only store:
+
+    segment-000001.log   zlib-compressed frames, one per group commit
+    segment-000001.idx   one JSON line per frame with the index rows it holds
+
+append() stamps the record, queues it and returns at once. A single writer
+thread takes everything that queued up while the previous fsync was in
+flight, writes it as one frame and fsyncs once (group commit), so the
+decision path never waits on the disk and a burst of N decisions costs one
+fsync, not N. Callers that must not answer before their record is durable
+wait on the Future that append() returns.
+
+Secondary indexes by user_id, decision, severity and time live in memory as
+columnar arrays plus sorted posting lists, rebuilt from the .idx files on
+open (an .idx that is missing or behind is rebuilt from its segment, and a
+torn final frame is truncated). Queries such as "all DENYs for svc_*
+identities last quarter" resolve on the indexes and only decompress the
+frames holding matching records.
+
+run_pipeline appends to the store in ACCESSOPS_AUDIT_DIR when it is set
+(see PipelineConfig.audit_mode).
+
+Usage:
+    python audit_store.py query --dir audit --decision DENY --user 'svc_*' --since 2026-07-01
+    python -m accessops_engine audit stats --dir audit
+"""
+
+import argparse
+import atexit
+import bisect
+import concurrent.futures
+import fnmatch
+import glob
+import itertools
+import json
+import os
+import queue
+import re
+import struct
+import sys
+import threading
+import time
+import zlib
+from array import array
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, Any, Iterable, Iterator, List, Optional, Tuple, Union
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-writer is not enforced
+    fcntl = None
+
+import metrics
+from risk_engine import normalize_severity
+
+DEFAULT_SEGMENT_BYTES = 64 * 1024 * 1024
+DEFAULT_COMMIT_INTERVAL_MS = 2.0
+DEFAULT_MAX_BATCH = 512
+COMPRESSION_LEVEL = 6
+FRAME_CACHE_SIZE = 64
+# A filter matching more values than this (e.g. svc_* over thousands of
+# service accounts) is checked per row rather than merged as a driver
+MAX_DRIVER_VALUES = 64
+GLOB_CACHE_SIZE = 256
+
+# magic, compressed payload bytes, crc32 of the payload, records in the frame
+_FRAME_HEADER = struct.Struct("<4sIII")
+_FRAME_MAGIC = b"AUD1"
+_SEGMENT_NAME = "segment-{:06d}"
+_LOCK_NAME = "writer.lock"
+_STOP = object()
+
+TimeBound = Union[None, int, float, datetime, str]
+ValueFilter = Union[None, str, Iterable[str]]
+
+
+# ============================================================================
+# SECTION 1: RECORDS
+# ============================================================================
+
+def audit_record(request_context: Dict[str, Any], result: Any) -> Dict[str, Any]:
+    """Audit entry for a PipelineResult; recorded_at is stamped on append."""
+    risk_score = result.risk_score or {}
+    return {
+        "request_id": result.request_id,
+        "user_id": request_context.get("user_id", ""),
+        "identity_type": request_context.get("identity_type", ""),
+        "decision": result.decision,
+        "severity": normalize_severity(risk_score) or "UNKNOWN",
+        "net_risk_score": risk_score.get("net_risk_score"),
+        "cache_hit": getattr(result, "cache_hit", False),
+        "request": request_context,
+        "risk_score": risk_score,
+        "investigation": result.investigation,
+        "board_report": result.board_report,
+        "execution_trace": result.execution_trace,
+    }
+
+
+def _index_row(record: Dict[str, Any]) -> List[Any]:
+    return [
+        record["recorded_at"],
+        str(record.get("user_id", "")),
+        str(record.get("decision", "")),
+        str(record.get("severity", "")),
+    ]
+
+
+def to_epoch(value: TimeBound) -> Optional[float]:
+    """Epoch seconds for a time bound (naive datetimes and ISO strings are UTC)."""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+
+# ============================================================================
+# SECTION 2: SECONDARY INDEXES
+# ============================================================================
+
+class _Column:
+    """Dictionary-encoded string column with a sorted posting list per value."""
+
+    def __init__(self):
+        self.values: List[str] = []
+        self.codes: Dict[str, int] = {}
+        self.rows = array("I")
+        self.postings: List[array] = []
+        # pattern -> (values checked, matching codes); values are never
+        # removed, so only values added since the last query are tested
+        self._globs: Dict[str, Tuple[int, List[int]]] = {}
+
+    def add(self, value: str, row: int) -> None:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+            self.postings.append(array("I"))
+        self.rows.append(code)
+        self.postings[code].append(row)
+
+    def match(self, wanted: ValueFilter) -> List[int]:
+        """Codes of the values in `wanted`; glob patterns (svc_*) are expanded."""
+        if isinstance(wanted, str):
+            wanted = [wanted]
+        codes = set()
+        for value in wanted:
+            if any(c in value for c in "*?["):
+                codes.update(self._glob(value))
+            elif value in self.codes:
+                codes.add(self.codes[value])
+        return sorted(codes)
+
+    def _glob(self, pattern: str) -> List[int]:
+        checked, codes = self._globs.get(pattern, (0, []))
+        if checked < len(self.values):
+            matches = re.compile(fnmatch.translate(pattern)).match
+            codes = codes + [code for code in range(checked, len(self.values)) if matches(self.values[code])]
+            if len(self._globs) >= GLOB_CACHE_SIZE:
+                self._globs.clear()
+            self._globs[pattern] = (len(self.values), codes)
+        return codes
+
+
+class AuditIndex:
+    """
+    Row-numbered index over every committed record.
+
+    Rows are numbered in commit order and recorded_at never decreases, so a
+    time range is a contiguous row range found by bisection, and each
+    posting list can be cut to that range the same way.
+    """
+
+    def __init__(self):
+        self.recorded_at = array("d")
+        self.segments = array("I")
+        self.offsets = array("Q")
+        self.slots = array("I")
+        self.columns = {"user_id": _Column(), "decision": _Column(), "severity": _Column()}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.recorded_at)
+
+    def add_frame(self, rows: List[List[Any]], segment: int, offset: int) -> int:
+        """Index one frame's rows; returns the row number of the first."""
+        users, decisions, severities = (self.columns[c] for c in ("user_id", "decision", "severity"))
+        with self._lock:
+            first = len(self.recorded_at)
+            for slot, (recorded_at, user_id, decision, severity) in enumerate(rows):
+                row = first + slot
+                self.recorded_at.append(recorded_at)
+                self.segments.append(segment)
+                self.offsets.append(offset)
+                self.slots.append(slot)
+                users.add(user_id, row)
+                decisions.add(decision, row)
+                severities.add(severity, row)
+        return first
+
+    def location(self, row: int) -> Tuple[int, int, int]:
+        return self.segments[row], self.offsets[row], self.slots[row]
+
+    def select(
+        self,
+        decision: ValueFilter = None,
+        severity: ValueFilter = None,
+        user_id: ValueFilter = None,
+        since: TimeBound = None,
+        until: TimeBound = None
+    ) -> List[int]:
+        """Matching row numbers in commit order; since is inclusive, until exclusive."""
+        with self._lock:
+            lo, hi = 0, len(self.recorded_at)
+            if since is not None:
+                lo = bisect.bisect_left(self.recorded_at, to_epoch(since), lo, hi)
+            if until is not None:
+                hi = bisect.bisect_left(self.recorded_at, to_epoch(until), lo, hi)
+
+            filters = []
+            for name, wanted in (("user_id", user_id), ("decision", decision), ("severity", severity)):
+                if wanted is None:
+                    continue
+                column = self.columns[name]
+                codes = column.match(wanted)
+                if not codes:
+                    return []
+                filters.append((column, codes))
+            if not filters:
+                return list(range(lo, hi))
+
+            # Drive from the most selective narrow filter's posting lists,
+            # cut to the time range; check the remaining filters per row
+            narrow = [f for f in filters if len(f[1]) <= MAX_DRIVER_VALUES] or filters[:1]
+            best = None
+            for column, codes in narrow:
+                spans = []
+                for code in codes:
+                    posting = column.postings[code]
+                    spans.append((posting, bisect.bisect_left(posting, lo), bisect.bisect_left(posting, hi)))
+                size = sum(end - start for _, start, end in spans)
+                if best is None or size < best[0]:
+                    best = (size, column, spans)
+            _, driver, spans = best
+            if len(spans) == 1:
+                posting, start, end = spans[0]
+                rows = posting[start:end].tolist()
+            else:
+                rows = sorted(itertools.chain.from_iterable(p[start:end] for p, start, end in spans))
+            for column, codes in filters:
+                if column is driver:
+                    continue
+                wanted_codes = set(codes)
+                column_rows = column.rows
+                rows = [row for row in rows if column_rows[row] in wanted_codes]
+            return rows
+
+
+# ============================================================================
+# SECTION 3: SEGMENT FILES
+# ============================================================================
+
+def _encode_frame(lines: List[bytes]) -> bytes:
+    payload = zlib.compress(b"\n".join(lines), COMPRESSION_LEVEL)
+    return _FRAME_HEADER.pack(_FRAME_MAGIC, len(payload), zlib.crc32(payload), len(lines)) + payload
+
+
+def _read_frame(f, offset: int) -> Optional[Tuple[List[bytes], int]]:
+    """(record lines, next offset) for the frame at offset; None if torn or corrupt."""
+    f.seek(offset)
+    header = f.read(_FRAME_HEADER.size)
+    if len(header) < _FRAME_HEADER.size:
+        return None
+    magic, length, crc, count = _FRAME_HEADER.unpack(header)
+    if magic != _FRAME_MAGIC:
+        return None
+    payload = f.read(length)
+    if len(payload) < length or zlib.crc32(payload) != crc:
+        return None
+    lines = zlib.decompress(payload).split(b"\n")
+    if len(lines) != count:
+        return None
+    return lines, offset + _FRAME_HEADER.size + length
+
+
+def _load_segment(log_path: str, idx_path: str, repair: bool) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Index entries for one segment, and the segment's valid length.
+
+    The .idx is trusted up to its first unreadable or out-of-range line;
+    frames past that are re-indexed from the .log. With repair, a torn
+    trailing frame is truncated and the .idx rewritten to match.
+    """
+    size = os.path.getsize(log_path)
+    entries: List[Dict[str, Any]] = []
+    covered = 0
+    idx_stale = not os.path.exists(idx_path)
+    if not idx_stale:
+        with open(idx_path, "rb") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    valid = entry["offset"] == covered and entry["next"] <= size
+                except (ValueError, KeyError, TypeError):
+                    valid = False
+                if not valid:
+                    idx_stale = True
+                    break
+                entries.append(entry)
+                covered = entry["next"]
+
+    if covered < size:
+        idx_stale = True
+        with open(log_path, "rb") as f:
+            while covered < size:
+                frame = _read_frame(f, covered)
+                if frame is None:
+                    break
+                lines, end = frame
+                rows = [_index_row(json.loads(line)) for line in lines]
+                entries.append({"offset": covered, "next": end, "rows": rows})
+                covered = end
+        if covered < size and repair:
+            print(f"⚠️ Audit store: truncating torn frame at {log_path}:{covered} ({size - covered} bytes)")
+            os.truncate(log_path, covered)
+
+    if idx_stale and repair:
+        tmp_path = idx_path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            for entry in entries:
+                f.write(json.dumps(entry, separators=(",", ":")).encode("utf-8") + b"\n")
+        os.replace(tmp_path, idx_path)
+    return entries, covered
+
+
+# ============================================================================
+# SECTION 4: STORE
+# ============================================================================
+
+class AuditStore:
+    """
+    Segmented, compressed, append-only audit log with group commit.
+
+    One writer per directory (enforced with a lock file where fcntl exists).
+    A writable store loads its indexes on the writer thread, so opening it
+    never blocks the caller: appends queue at once and queries wait for the
+    load. read_only stores load synchronously without the writer thread or
+    repairs and see the records committed when they were opened, so
+    auditors can query a directory a running service is appending to.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        segment_bytes: int = DEFAULT_SEGMENT_BYTES,
+        commit_interval_ms: float = DEFAULT_COMMIT_INTERVAL_MS,
+        max_batch: int = DEFAULT_MAX_BATCH,
+        fsync: bool = True,
+        read_only: bool = False
+    ):
+        """
+        Args:
+            directory: Store directory (created if missing)
+            segment_bytes: Roll to a new segment once the current one exceeds this
+            commit_interval_ms: How long the writer lingers for more records
+                after the first of a commit arrives
+            max_batch: Largest number of records per commit (frame)
+            fsync: fsync each commit; False trades durability for speed in tests
+            read_only: Query-only snapshot; append() raises
+        """
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.commit_interval_ms = commit_interval_ms
+        self.max_batch = max_batch
+        self.fsync = fsync
+        self.read_only = read_only
+        self.index = AuditIndex()
+        self.commits = 0
+        self.committed = 0
+        self.failed = 0
+        self._lock = threading.Lock()
+        self._queue: "queue.SimpleQueue[Any]" = queue.SimpleQueue()
+        self._frames: "OrderedDict[Tuple[int, int], List[bytes]]" = OrderedDict()
+        self._frames_lock = threading.Lock()
+        self._closed = False
+        self._lock_file = None
+        self._log = self._idx = None
+        self._segment = 1
+        self._segment_size = 0
+        self._ready = threading.Event()
+        self._load_error: Optional[BaseException] = None
+
+        self._writer = None
+        if read_only:
+            self._load(repair=False)
+            self._ready.set()
+        else:
+            os.makedirs(directory, exist_ok=True)
+            self._acquire_writer_lock()
+            self._writer = threading.Thread(target=self._run, name="accessops-audit-writer", daemon=True)
+            self._writer.start()
+
+    def _path(self, segment: int, suffix: str) -> str:
+        return os.path.join(self.directory, _SEGMENT_NAME.format(segment) + suffix)
+
+    def _acquire_writer_lock(self) -> None:
+        if fcntl is None:
+            return
+        self._lock_file = open(os.path.join(self.directory, _LOCK_NAME), "a")
+        try:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            self._lock_file.close()
+            raise RuntimeError(f"Audit store {self.directory!r} is already open for writing by another process")
+
+    def _load(self, repair: bool) -> None:
+        for log_path in sorted(glob.glob(os.path.join(self.directory, "segment-*.log"))):
+            self._segment = int(os.path.basename(log_path)[len("segment-"):-len(".log")])
+            entries, self._segment_size = _load_segment(log_path, self._path(self._segment, ".idx"), repair)
+            for entry in entries:
+                self.index.add_frame(entry["rows"], self._segment, entry["offset"])
+
+    def wait_ready(self, timeout: Optional[float] = None) -> None:
+        """Block until the indexes are loaded; raises if the store failed to open."""
+        if not self._ready.wait(timeout):
+            raise TimeoutError(f"Audit store {self.directory!r} is still loading")
+        if self._load_error is not None:
+            raise self._load_error
+
+    def _open_segment(self) -> None:
+        self._log = open(self._path(self._segment, ".log"), "ab")
+        self._idx = open(self._path(self._segment, ".idx"), "ab")
+
+    def __len__(self) -> int:
+        self.wait_ready()
+        return len(self.index)
+
+    # --- writing -----------------------------------------------------------
+
+    def append(self, record: Dict[str, Any]) -> concurrent.futures.Future:
+        """
+        Queue a record for the next group commit and return immediately.
+
+        recorded_at is stamped now. A record that already carries one (an
+        in-order import of older logs) keeps it, raised at commit if needed
+        so times never decrease.
+
+        Returns:
+            Future resolving to the record's row number once its frame is
+            fsynced, or to the write error
+        """
+        future: concurrent.futures.Future = concurrent.futures.Future()
+        with self._lock:
+            if self._closed or self.read_only:
+                raise RuntimeError("Audit store is closed" if self._closed else "Audit store is read-only")
+            self._queue.put((dict(record, recorded_at=float(record.get("recorded_at") or time.time())), future))
+        return future
+
+    def record(self, request_context: Dict[str, Any], result: Any) -> concurrent.futures.Future:
+        """append() the audit entry for a PipelineResult."""
+        return self.append(audit_record(request_context, result))
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        """Block until everything appended so far is durable."""
+        barrier: concurrent.futures.Future = concurrent.futures.Future()
+        with self._lock:
+            if self._closed or self.read_only:
+                return
+            self._queue.put((None, barrier))
+        barrier.result(timeout)
+
+    def _run(self) -> None:
+        try:
+            self._load(repair=True)
+            self._open_segment()
+        except Exception as e:
+            self._load_error = e
+            print(f"⚠️ Audit store: cannot open {self.directory}: {type(e).__name__}: {e}")
+        finally:
+            self._ready.set()
+        stop = False
+        while not stop:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            # Everything queued during the previous fsync joins this commit
+            deadline = time.monotonic() + self.commit_interval_ms / 1000
+            while len(batch) < self.max_batch:
+                try:
+                    item = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                    break
+                batch.append(item)
+            self._commit(batch)
+
+    def _commit(self, batch: List[Tuple[Optional[Dict[str, Any]], concurrent.futures.Future]]) -> None:
+        records = [(record, future) for record, future in batch if record is not None]
+        if records and self._load_error is not None:
+            for _, future in records:
+                _settle(future, error=self._load_error)
+        elif records:
+            self._write_frame(records)
+        for record, future in batch:
+            if record is None:
+                _settle(future, None)
+
+    def _write_frame(self, records: List[Tuple[Dict[str, Any], concurrent.futures.Future]]) -> None:
+        start = time.perf_counter()
+        offset = self._segment_size
+        # The time index needs recorded_at non-decreasing in commit order;
+        # this thread is the only one adding rows
+        last = self.index.recorded_at[-1] if len(self.index) else 0.0
+        for record, _ in records:
+            last = record["recorded_at"] = max(record["recorded_at"], last)
+        try:
+            lines = [
+                json.dumps(record, separators=(",", ":"), default=str).encode("utf-8")
+                for record, _ in records
+            ]
+            rows = [_index_row(record) for record, _ in records]
+            frame = _encode_frame(lines)
+            if self._segment_size and self._segment_size + len(frame) > self.segment_bytes:
+                self._log.close()
+                self._idx.close()
+                self._segment += 1
+                self._segment_size = offset = 0
+                self._open_segment()
+            self._log.write(frame)
+            self._log.flush()
+            if self.fsync:
+                os.fsync(self._log.fileno())
+            self._segment_size += len(frame)
+            # The .idx is derived data (rebuilt from the .log on open), so it
+            # is flushed but never fsynced
+            self._idx.write(json.dumps(
+                {"offset": offset, "next": self._segment_size, "rows": rows}, separators=(",", ":")
+            ).encode("utf-8") + b"\n")
+            self._idx.flush()
+        except Exception as e:
+            self._rollback(offset)
+            self.failed += len(records)
+            metrics.AUDIT_RECORDS.inc(len(records), result="failed")
+            print(f"⚠️ Audit store: failed to commit {len(records)} record(s): {type(e).__name__}: {e}")
+            for _, future in records:
+                _settle(future, error=e)
+            return
+
+        first = self.index.add_frame(rows, self._segment, offset)
+        self.commits += 1
+        self.committed += len(records)
+        metrics.AUDIT_RECORDS.inc(len(records), result="committed")
+        metrics.AUDIT_COMMIT_SECONDS.observe(time.perf_counter() - start)
+        for slot, (_, future) in enumerate(records):
+            _settle(future, first + slot)
+
+    def _rollback(self, offset: int) -> None:
+        # Drop a partially written frame so later commits stay readable
+        try:
+            self._log.flush()
+        except OSError:
+            pass
+        try:
+            os.truncate(self._path(self._segment, ".log"), offset)
+            self._segment_size = offset
+        except OSError:
+            pass
+
+    def close(self, timeout: Optional[float] = 30.0) -> None:
+        """Commit everything queued, stop the writer and close the files."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            if self._writer is not None:
+                self._queue.put(_STOP)
+        if self._writer is not None:
+            self._writer.join(timeout)
+            for f in (self._log, self._idx):
+                if f is not None:
+                    f.close()
+        if self._lock_file is not None:
+            self._lock_file.close()
+
+    # --- reading -----------------------------------------------------------
+
+    def _frame(self, segment: int, offset: int) -> List[bytes]:
+        key = (segment, offset)
+        with self._frames_lock:
+            lines = self._frames.get(key)
+            if lines is not None:
+                self._frames.move_to_end(key)
+                return lines
+        with open(self._path(segment, ".log"), "rb") as f:
+            frame = _read_frame(f, offset)
+        if frame is None:
+            raise ValueError(f"Corrupt audit frame in segment {segment} at offset {offset}")
+        with self._frames_lock:
+            self._frames[key] = frame[0]
+            while len(self._frames) > FRAME_CACHE_SIZE:
+                self._frames.popitem(last=False)
+        return frame[0]
+
+    def get(self, row: int) -> Dict[str, Any]:
+        """The record at a row number (as returned by append or select)."""
+        self.wait_ready()
+        segment, offset, slot = self.index.location(row)
+        return json.loads(self._frame(segment, offset)[slot])
+
+    def select(
+        self,
+        decision: ValueFilter = None,
+        severity: ValueFilter = None,
+        user_id: ValueFilter = None,
+        since: TimeBound = None,
+        until: TimeBound = None
+    ) -> List[int]:
+        """Row numbers matching every given filter (see query)."""
+        self.wait_ready()
+        return self.index.select(decision, severity, user_id, since, until)
+
+    def count(self, **filters: Any) -> int:
+        """Number of records matching select()-style filters; reads no records."""
+        return len(self.select(**filters))
+
+    def query(
+        self,
+        decision: ValueFilter = None,
+        severity: ValueFilter = None,
+        user_id: ValueFilter = None,
+        since: TimeBound = None,
+        until: TimeBound = None,
+        limit: Optional[int] = None,
+        newest_first: bool = False
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Records matching every given filter, oldest first by default.
+
+        Args:
+            decision: Decision or decisions, e.g. "DENY"
+            severity: Severity level(s), e.g. ["HIGH", "CRITICAL"]
+            user_id: Exact id(s) or glob pattern(s) such as "svc_*"
+            since: Inclusive lower time bound (epoch seconds, datetime or ISO string)
+            until: Exclusive upper time bound
+            limit: Stop after this many records
+            newest_first: Reverse chronological order
+
+        Returns:
+            Iterator over matching records; the match set is fixed when
+            query() is called and records are decompressed as iterated
+        """
+        rows = self.select(decision, severity, user_id, since, until)
+        if newest_first:
+            rows.reverse()
+        if limit is not None:
+            rows = rows[:limit]
+        return (self.get(row) for row in rows)
+
+    def stats(self) -> Dict[str, Any]:
+        self.wait_ready()
+        recorded_at = self.index.recorded_at
+        segments = glob.glob(os.path.join(self.directory, "segment-*.log"))
+        return {
+            "records": len(self.index),
+            "segments": len(segments),
+            "bytes": sum(os.path.getsize(p) for p in segments),
+            "users": len(self.index.columns["user_id"].values),
+            "decisions": {
+                value: len(posting)
+                for value, posting in zip(self.index.columns["decision"].values, self.index.columns["decision"].postings)
+            },
+            "oldest": recorded_at[0] if recorded_at else None,
+            "newest": recorded_at[-1] if recorded_at else None,
+            "commits": self.commits,
+            "committed": self.committed,
+            "failed": self.failed,
+            "read_only": self.read_only,
+        }
+
+
+def _settle(
+    future: concurrent.futures.Future,
+    result: Any = None,
+    error: Optional[BaseException] = None
+) -> None:
+    # A caller that gave up waiting (e.g. a cancelled durable pipeline) may
+    # have cancelled its future already
+    if future.cancelled():
+        return
+    try:
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+    except concurrent.futures.InvalidStateError:
+        pass
+
+
+def open_store_from_env() -> Optional[AuditStore]:
+    """
+    AuditStore in ACCESSOPS_AUDIT_DIR, or None when it is unset.
+
+    Tuned by ACCESSOPS_AUDIT_COMMIT_MS and ACCESSOPS_AUDIT_SEGMENT_MB; the
+    store is closed (pending records committed) at interpreter exit.
+    """
+    directory = os.environ.get("ACCESSOPS_AUDIT_DIR")
+    if not directory:
+        return None
+    store = AuditStore(
+        directory,
+        segment_bytes=int(float(os.environ.get("ACCESSOPS_AUDIT_SEGMENT_MB", DEFAULT_SEGMENT_BYTES / 2**20)) * 2**20),
+        commit_interval_ms=float(os.environ.get("ACCESSOPS_AUDIT_COMMIT_MS", DEFAULT_COMMIT_INTERVAL_MS))
+    )
+    atexit.register(store.close)
+    return store
+
+
+# ============================================================================
+# SECTION 5: COMMAND LINE
+# ============================================================================
+
+SUMMARY_FIELDS = ("recorded_at", "request_id", "user_id", "identity_type", "decision", "severity", "net_risk_score")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Query the AccessOps audit store")
+    parser.add_argument("command", choices=["query", "count", "stats"])
+    parser.add_argument("--dir", default=os.environ.get("ACCESSOPS_AUDIT_DIR"), help="Store directory")
+    parser.add_argument("--decision", action="append", help="Repeatable, e.g. --decision DENY")
+    parser.add_argument("--severity", action="append", help="Repeatable, e.g. --severity CRITICAL")
+    parser.add_argument("--user", action="append", help="user_id or glob pattern, e.g. 'svc_*' (repeatable)")
+    parser.add_argument("--since", help="Inclusive ISO date/time (UTC unless an offset is given)")
+    parser.add_argument("--until", help="Exclusive ISO date/time")
+    parser.add_argument("--limit", type=int)
+    parser.add_argument("--newest-first", action="store_true")
+    parser.add_argument("--full", action="store_true", help="Print whole records, not summaries")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    if not args.dir:
+        print("❌ No store: pass --dir or set ACCESSOPS_AUDIT_DIR", file=sys.stderr)
+        return 2
+    if not os.path.isdir(args.dir):
+        print(f"❌ {args.dir} is not a directory", file=sys.stderr)
+        return 2
+
+    start = time.perf_counter()
+    store = AuditStore(args.dir, read_only=True)
+    load_ms = (time.perf_counter() - start) * 1000
+    if args.command == "stats":
+        print(json.dumps({**store.stats(), "load_ms": round(load_ms, 1)}, indent=2))
+        return 0
+
+    filters = dict(
+        decision=args.decision, severity=args.severity, user_id=args.user,
+        since=args.since, until=args.until
+    )
+    start = time.perf_counter()
+    if args.command == "count":
+        print(store.count(**filters))
+    else:
+        for record in store.query(**filters, limit=args.limit, newest_first=args.newest_first):
+            if not args.full:
+                record = {k: record.get(k) for k in SUMMARY_FIELDS}
+            print(json.dumps(record, default=str))
+    print(
+        f"{args.command}: {(time.perf_counter() - start) * 1000:.1f} ms over {len(store)} records "
+        f"(index load {load_ms:.0f} ms)",
+        file=sys.stderr
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
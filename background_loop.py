@@ -0,0 +1,138 @@
+"""
+AccessOps Intelligence - Background Event Loop
+One long-lived asyncio loop on a daemon thread, shared by every caller in
+the process.
+
+Streamlit runs each user session's script on its own thread. Driving the
+pipeline with run_until_complete on those threads (patched re-entrant with
+nest_asyncio) meant every session ran its own loop and blocked its thread,
+and loop-bound state in the shared engine crossed loops. Instead, sessions
+hand coroutines to this loop and wait on thread-safe futures, so concurrent
+users' pipelines interleave on one loop the way concurrent requests do in
+the batch runner and the HTTP service.
+
+Because every session shares this one loop, coroutines submitted to it
+must not block: the pipeline pushes engine construction, identity lookups
+and audit writes to worker threads with asyncio.to_thread.
+"""
+
+import asyncio
+import concurrent.futures
+import queue
+import threading
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterator, Optional
+
+_THREAD_NAME = "accessops-event-loop"
+
+
+class BackgroundLoop:
+    """An asyncio event loop running forever on a dedicated daemon thread."""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._started = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=_THREAD_NAME, daemon=True)
+        self._thread.start()
+        self._started.wait()
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self.loop)
+        self.loop.call_soon(self._started.set)
+        self.loop.run_forever()
+
+    @property
+    def running(self) -> bool:
+        return self._thread.is_alive() and self.loop.is_running()
+
+    def submit(self, coro: Awaitable[Any]) -> concurrent.futures.Future:
+        """Schedule a coroutine on the loop; cancel() on the future cancels the task."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+        """Run a coroutine on the loop and block the calling thread for its result."""
+        future = self.submit(coro)
+        try:
+            return future.result(timeout)
+        except BaseException:
+            # Timeout or the caller's thread being interrupted: stop the task too
+            future.cancel()
+            raise
+
+    def stream(self, make_iterator: Callable[[], AsyncIterator[Any]]) -> "BackgroundStream":
+        """Consume an async iterator on the loop from a synchronous thread."""
+        return BackgroundStream(self, make_iterator)
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Cancel outstanding tasks and stop the loop thread."""
+        async def cancel_all():
+            tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        if self.running:
+            asyncio.run_coroutine_threadsafe(cancel_all(), self.loop).result(timeout)
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join(timeout)
+
+
+class BackgroundStream:
+    """
+    Synchronous iterator over an async iterator running on a BackgroundLoop.
+
+    Items are handed across threads through a queue. Errors raised on the
+    loop are re-raised to the consumer; cancel() (or abandoning the
+    iteration, e.g. a Streamlit rerun) cancels the producing task.
+    """
+
+    _DONE = object()
+
+    def __init__(self, background: BackgroundLoop, make_iterator: Callable[[], AsyncIterator[Any]]):
+        self._items: "queue.Queue[Any]" = queue.Queue()
+        self.future = background.submit(self._pump(make_iterator))
+
+    async def _pump(self, make_iterator: Callable[[], AsyncIterator[Any]]) -> None:
+        try:
+            iterator = make_iterator()
+            try:
+                async for item in iterator:
+                    self._items.put(item)
+            finally:
+                aclose = getattr(iterator, "aclose", None)
+                if aclose is not None:
+                    await aclose()
+        finally:
+            self._items.put(self._DONE)
+
+    def __iter__(self) -> Iterator[Any]:
+        try:
+            while True:
+                item = self._items.get()
+                if item is self._DONE:
+                    break
+                yield item
+            self.future.result()
+        finally:
+            self.cancel()
+
+    def cancel(self) -> bool:
+        """Cancel the producing task; False if it had already finished."""
+        return self.future.cancel()
+
+    @property
+    def done(self) -> bool:
+        return self.future.done()
+
+
+_background: Optional[BackgroundLoop] = None
+_background_lock = threading.Lock()
+
+
+def get_background_loop() -> BackgroundLoop:
+    """Return the process-wide loop, starting its thread on first use."""
+    global _background
+    if _background is None or not _background.running:
+        with _background_lock:
+            if _background is None or not _background.running:
+                _background = BackgroundLoop()
+    return _background
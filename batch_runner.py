@@ -0,0 +1,357 @@
+"""
+AccessOps Intelligence - Batch Runner
+Adjudicates a JSONL file of access requests with bounded concurrency.
+
+Input is read one line at a time and at most `concurrency` pipelines are in
+flight, so memory stays flat however long the file is. Each result is
+appended to the output JSONL as soon as it finishes; re-running against the
+same output skips request_ids that already have a result.
+
+With --score-only no pipeline runs: requests are read in chunks and given
+their native risk score with risk_engine.score_requests_batch, a quick way to
+rank a large backlog before adjudicating it.
+
+Usage:
+    python -m accessops_engine batch requests.jsonl --out results.jsonl --concurrency 8
+    python -m accessops_engine batch requests.jsonl --score-only --out scores.jsonl
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, Any, Awaitable, Callable, Iterator, List, Optional, Set, TextIO, Tuple
+
+DEFAULT_CONCURRENCY = 8
+DEFAULT_SCORE_CHUNK = 10_000
+
+
+# ============================================================================
+# SECTION 1: INPUT / OUTPUT
+# ============================================================================
+
+def iter_requests(path: str) -> Iterator[Tuple[int, Optional[Dict[str, Any]], Optional[str]]]:
+    """
+    Stream (line_number, request, error) from a JSONL file.
+
+    Blank lines are skipped; malformed lines yield (line_number, None, error)
+    so the caller can report them without aborting the batch.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                request = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield line_number, None, f"invalid JSON: {e}"
+                continue
+            if not isinstance(request, dict) or "request_id" not in request:
+                yield line_number, None, "record has no request_id"
+                continue
+            yield line_number, request, None
+
+
+def completed_request_ids(path: str) -> Set[str]:
+    """request_ids that already have a successful record in an output file."""
+    done: Set[str] = set()
+    if not os.path.exists(path):
+        return done
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # Torn final line from an interrupted run
+                continue
+            if isinstance(record, dict) and "error" not in record and "request_id" in record:
+                done.add(record["request_id"])
+    return done
+
+
+def result_record(result: Any, latency_ms: float) -> Dict[str, Any]:
+    """JSONL record for a PipelineResult."""
+    return {
+        "request_id": result.request_id,
+        "decision": result.decision,
+        "risk_score": result.risk_score,
+        "investigation": result.investigation,
+        "board_report": result.board_report,
+        "execution_trace": result.execution_trace,
+        "cache_hit": getattr(result, "cache_hit", False),
+        "latency_ms": round(latency_ms, 3)
+    }
+
+
+# ============================================================================
+# SECTION 2: STATISTICS
+# ============================================================================
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(int(round(pct / 100 * len(sorted_values))) - 1, 0)
+    return sorted_values[min(rank, len(sorted_values) - 1)]
+
+
+@dataclass
+class BatchSummary:
+    """Counters and latency samples collected over a batch run."""
+    processed: int = 0
+    failed: int = 0
+    skipped: int = 0
+    invalid: int = 0
+    cache_hits: int = 0
+    decisions: Counter = field(default_factory=Counter)
+    severities: Counter = field(default_factory=Counter)
+    latencies_ms: List[float] = field(default_factory=list)
+    elapsed_s: float = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        latencies = sorted(self.latencies_ms)
+        return {
+            "processed": self.processed,
+            "failed": self.failed,
+            "skipped_resume": self.skipped,
+            "invalid_lines": self.invalid,
+            "cache_hits": self.cache_hits,
+            "decisions": dict(self.decisions),
+            "severities": dict(self.severities),
+            "elapsed_s": round(self.elapsed_s, 3),
+            "throughput_rps": round(self.processed / self.elapsed_s, 2) if self.elapsed_s else 0.0,
+            "latency_ms": {
+                "p50": round(percentile(latencies, 50), 3),
+                "p95": round(percentile(latencies, 95), 3),
+                "p99": round(percentile(latencies, 99), 3),
+                "max": round(latencies[-1], 3) if latencies else 0.0
+            }
+        }
+
+
+# ============================================================================
+# SECTION 3: RUNNER
+# ============================================================================
+
+async def _adjudicate(
+    pipeline: Callable[..., Awaitable[Any]],
+    request: Dict[str, Any],
+    config: Any
+) -> Tuple[Dict[str, Any], Optional[Any]]:
+    start = time.perf_counter()
+    try:
+        result = await pipeline(request, config)
+    except Exception as e:
+        return {
+            "request_id": request["request_id"],
+            "error": f"{type(e).__name__}: {e}",
+            "latency_ms": round((time.perf_counter() - start) * 1000, 3)
+        }, None
+    return result_record(result, (time.perf_counter() - start) * 1000), result
+
+
+async def run_batch(
+    input_path: str,
+    output_path: str,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    config: Any = None,
+    resume: bool = True,
+    pipeline: Optional[Callable[..., Awaitable[Any]]] = None
+) -> BatchSummary:
+    """
+    Run the pipeline over every request in input_path.
+
+    Args:
+        input_path: JSONL file, one request_context per line
+        output_path: JSONL file results are appended to
+        concurrency: Maximum pipelines in flight
+        config: PipelineConfig passed to every run
+        resume: Skip request_ids already recorded in output_path
+        pipeline: Coroutine function (request_context, config) -> PipelineResult;
+            defaults to accessops_engine.run_pipeline
+
+    Returns:
+        BatchSummary for the run
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    if pipeline is None:
+        from accessops_engine import run_pipeline as pipeline
+
+    summary = BatchSummary()
+    done = completed_request_ids(output_path) if resume else set()
+    in_flight: Set[asyncio.Task] = set()
+    start = time.perf_counter()
+
+    with open(output_path, "a" if resume else "w", encoding="utf-8") as out:
+
+        def record(task: asyncio.Task) -> None:
+            payload, result = task.result()
+            _write(out, payload)
+            if result is None:
+                summary.failed += 1
+                return
+            summary.processed += 1
+            summary.decisions[payload["decision"]] += 1
+            summary.cache_hits += payload["cache_hit"]
+            summary.latencies_ms.append(payload["latency_ms"])
+
+        async def drain(return_when: str) -> None:
+            finished, _ = await asyncio.wait(in_flight, return_when=return_when)
+            for task in finished:
+                in_flight.discard(task)
+                record(task)
+
+        for line_number, request, error in iter_requests(input_path):
+            if request is None:
+                summary.invalid += 1
+                print(f"⚠️  {input_path}:{line_number}: {error}", file=sys.stderr)
+                continue
+            if request["request_id"] in done:
+                summary.skipped += 1
+                continue
+            # Duplicate request_ids within one file are adjudicated once
+            done.add(request["request_id"])
+
+            if len(in_flight) >= concurrency:
+                await drain(asyncio.FIRST_COMPLETED)
+            in_flight.add(asyncio.create_task(_adjudicate(pipeline, request, config)))
+
+        if in_flight:
+            await drain(asyncio.ALL_COMPLETED)
+
+    summary.elapsed_s = time.perf_counter() - start
+    return summary
+
+
+def score_batch(input_path: str, output_path: str, chunk_size: int = DEFAULT_SCORE_CHUNK) -> BatchSummary:
+    """
+    Native risk score for every request in input_path; no investigation,
+    no agents.
+
+    Requests are scored chunk_size at a time, so memory stays bounded by
+    the chunk rather than the file. Each output record carries the
+    request_id and its risk_score (control failures are empty, as nothing
+    was investigated).
+
+    Returns:
+        BatchSummary with severity counts; latency is per chunk, per request
+    """
+    from risk_engine import score_requests_batch
+
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    summary = BatchSummary()
+    start = time.perf_counter()
+
+    with open(output_path, "w", encoding="utf-8") as out:
+
+        def flush(chunk: List[Dict[str, Any]]) -> None:
+            chunk_start = time.perf_counter()
+            scores = score_requests_batch(chunk)
+            latency_ms = (time.perf_counter() - chunk_start) * 1000 / len(chunk)
+            out.writelines(
+                json.dumps({"request_id": request["request_id"], "risk_score": score}, default=str) + "\n"
+                for request, score in zip(chunk, scores)
+            )
+            summary.processed += len(chunk)
+            summary.severities.update(score["severity_level"] for score in scores)
+            summary.latencies_ms.extend([latency_ms] * len(chunk))
+
+        chunk: List[Dict[str, Any]] = []
+        for line_number, request, error in iter_requests(input_path):
+            if request is None:
+                summary.invalid += 1
+                print(f"⚠️  {input_path}:{line_number}: {error}", file=sys.stderr)
+                continue
+            chunk.append(request)
+            if len(chunk) >= chunk_size:
+                flush(chunk)
+                chunk = []
+        if chunk:
+            flush(chunk)
+
+    summary.elapsed_s = time.perf_counter() - start
+    return summary
+
+
+def _write(out: TextIO, payload: Dict[str, Any]) -> None:
+    out.write(json.dumps(payload, default=str) + "\n")
+    out.flush()
+
+
+# ============================================================================
+# SECTION 4: CLI
+# ============================================================================
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="python -m accessops_engine batch",
+        description="Adjudicate a JSONL file of access requests."
+    )
+    parser.add_argument("input", help="JSONL file with one request per line")
+    parser.add_argument("--out", help="Results JSONL (default: <input>.results.jsonl)")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Pipelines in flight")
+    parser.add_argument("--no-resume", action="store_true", help="Overwrite --out instead of resuming")
+    parser.add_argument("--summary", help="Also write the run summary as JSON to this path")
+    parser.add_argument("--quiet", action="store_true", help="Suppress per-request pipeline progress output")
+    parser.add_argument("--metrics-port", type=int, help="Serve Prometheus /metrics and /metrics.json on this port")
+    parser.add_argument(
+        "--score-only", action="store_true",
+        help="Only compute native risk scores (no investigation or agents); overwrites --out"
+    )
+    parser.add_argument(
+        "--chunk-size", type=int, default=DEFAULT_SCORE_CHUNK, help="Requests scored per batch with --score-only"
+    )
+    return parser
+
+
+def main(argv: Optional[List[str]] = None, pipeline=None, config=None) -> int:
+    """CLI entry point. Returns a process exit code (1 if any request failed or input line was invalid)."""
+    args = build_parser().parse_args(argv)
+    output_path = args.out or f"{os.path.splitext(args.input)[0]}.results.jsonl"
+    if args.metrics_port:
+        from metrics import start_metrics_server
+        start_metrics_server(args.metrics_port)
+
+    with contextlib.ExitStack() as stack:
+        if args.quiet:
+            stack.enter_context(contextlib.redirect_stdout(stack.enter_context(open(os.devnull, "w"))))
+        if args.score_only:
+            summary = score_batch(args.input, output_path, chunk_size=args.chunk_size)
+        else:
+            summary = asyncio.run(run_batch(
+                args.input,
+                output_path,
+                concurrency=args.concurrency,
+                config=config,
+                resume=not args.no_resume,
+                pipeline=pipeline
+            ))
+    report = summary.as_dict()
+
+    print("\n" + "="*60)
+    print("   📦 BATCH COMPLETE")
+    print("="*60)
+    print(f"Processed: {report['processed']}  Failed: {report['failed']}  "
+          f"Resumed-skip: {report['skipped_resume']}  Invalid: {report['invalid_lines']}")
+    print(f"Throughput: {report['throughput_rps']} req/s over {report['elapsed_s']}s")
+    latency = report["latency_ms"]
+    print(f"Latency ms: p50={latency['p50']} p95={latency['p95']} p99={latency['p99']} max={latency['max']}")
+    if args.score_only:
+        print(f"Severities: {report['severities']}")
+    else:
+        print(f"Decisions: {report['decisions']}  Cache hits: {report['cache_hits']}")
+    print(f"Results: {output_path}")
+
+    if args.summary:
+        with open(args.summary, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    return 1 if summary.failed or summary.invalid else 0
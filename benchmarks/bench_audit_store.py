@@ -0,0 +1,177 @@
+"""
+Benchmark: audit store append throughput, group commit and query latency.
+
+Usage:
+    python benchmarks/bench_audit_store.py --records 1000000
+    python benchmarks/bench_audit_store.py --dir /data/audit --records 0   # query an existing store
+    python benchmarks/bench_audit_store.py --writers 64 --no-fsync
+
+Appends --records synthetic decisions spread over the past year (about a
+tenth of identities are svc_* service accounts), then reports:
+
+- append throughput and records per group commit
+- durable-append latency with --writers threads each waiting on its own record
+- time to reopen the store (index rebuild from the .idx files)
+- p50/p95 latency of typical auditor queries, index-only (count) and with
+  every matching record decompressed (fetch)
+"""
+
+import argparse
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, Any, Callable, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audit_store import AuditStore  # noqa: E402
+
+DECISIONS = [("AUTO_APPROVE", 55), ("PENDING_MANAGER_REVIEW", 20), ("PENDING_HUMAN_REVIEW", 15), ("DENY", 10)]
+SEVERITIES = {
+    "AUTO_APPROVE": ["LOW", "MEDIUM"],
+    "PENDING_MANAGER_REVIEW": ["MEDIUM", "HIGH"],
+    "PENDING_HUMAN_REVIEW": ["HIGH"],
+    "DENY": ["CRITICAL"],
+}
+DAY = 86400.0
+
+
+def synthetic_record(rng: random.Random, index: int, recorded_at: float, identities: int) -> Dict[str, Any]:
+    service = rng.random() < 0.1
+    user_id = f"svc_bot_{rng.randrange(identities // 10):05d}" if service else f"user_{rng.randrange(identities):06d}"
+    decision = rng.choices([d for d, _ in DECISIONS], weights=[w for _, w in DECISIONS])[0]
+    severity = rng.choice(SEVERITIES[decision])
+    score = {"LOW": 20, "MEDIUM": 45, "HIGH": 75, "CRITICAL": 95}[severity]
+    return {
+        "recorded_at": recorded_at,
+        "request_id": f"REQ-BENCH-{index:08d}",
+        "user_id": user_id,
+        "identity_type": "ai_agent" if service else "human",
+        "decision": decision,
+        "severity": severity,
+        "net_risk_score": score,
+        "request": {"user_id": user_id, "requested_resource_id": f"res_{rng.randrange(2000):04d}", "access_type": "read"},
+        "risk_score": {"net_risk_score": score, "severity_level": severity},
+        "board_report": f"### Executive Board Report\nDecision {decision} at severity {severity}.\n" * 4,
+        "execution_trace": [{"phase": "triage"}, {"phase": "authorization", "decision": {"decision": decision}}],
+    }
+
+
+def fill(store: AuditStore, records: int, identities: int, seed: int) -> float:
+    """Append `records` records over the past year; returns elapsed seconds."""
+    rng = random.Random(seed)
+    now = time.time()
+    start_time = now - 365 * DAY
+    step = 365 * DAY / max(records, 1)
+    start = time.perf_counter()
+    for i in range(records):
+        store.append(synthetic_record(rng, i, start_time + i * step, identities))
+    store.flush()
+    return time.perf_counter() - start
+
+
+def durable_latency(store: AuditStore, writers: int, per_writer: int, identities: int) -> List[float]:
+    """Latency of append().result() with `writers` threads appending concurrently."""
+    latencies: List[float] = []
+    lock = threading.Lock()
+
+    def writer(seed: int) -> None:
+        rng = random.Random(seed)
+        mine = []
+        for i in range(per_writer):
+            start = time.perf_counter()
+            store.append(synthetic_record(rng, i, 0, identities)).result()
+            mine.append((time.perf_counter() - start) * 1000)
+        with lock:
+            latencies.extend(mine)
+
+    threads = [threading.Thread(target=writer, args=(seed,)) for seed in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return sorted(latencies)
+
+
+def timed(fn: Callable[[], Any], repeat: int) -> Dict[str, Any]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        value = fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {"p50": samples[len(samples) // 2], "p95": samples[min(int(len(samples) * 0.95), len(samples) - 1)], "value": value}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--records", type=int, default=200_000)
+    parser.add_argument("--identities", type=int, default=50_000)
+    parser.add_argument("--dir", help="Store directory (default: a temporary one, removed afterwards)")
+    parser.add_argument("--writers", type=int, default=32, help="Concurrent durable writers")
+    parser.add_argument("--per-writer", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=20, help="Runs per query")
+    parser.add_argument("--no-fsync", action="store_true")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    directory = args.dir or tempfile.mkdtemp(prefix="audit-bench-")
+    try:
+        store = AuditStore(directory, fsync=not args.no_fsync)
+        if args.records:
+            elapsed = fill(store, args.records, args.identities, args.seed)
+            print(
+                f"append: {args.records} records in {elapsed:.1f}s ({args.records / elapsed:,.0f}/s), "
+                f"{store.commits} commits ({store.committed / max(store.commits, 1):.0f} records/commit)"
+            )
+        commits_before = store.commits
+        latencies = durable_latency(store, args.writers, args.per_writer, args.identities)
+        durable = args.writers * args.per_writer
+        print(
+            f"durable append, {args.writers} writers: p50 {statistics.median(latencies):.2f} ms, "
+            f"p99 {latencies[min(int(len(latencies) * 0.99), len(latencies) - 1)]:.2f} ms, "
+            f"{durable} records in {store.commits - commits_before} commits"
+        )
+        store.close()
+
+        start = time.perf_counter()
+        store = AuditStore(directory, read_only=True)
+        stats = store.stats()
+        print(
+            f"reopen: {len(store):,} records, {stats['users']:,} users, {stats['bytes'] / 2**20:.1f} MiB "
+            f"in {stats['segments']} segment(s), index rebuilt in {(time.perf_counter() - start) * 1000:.0f} ms"
+        )
+
+        newest = stats["newest"] or time.time()
+        quarter = dict(since=newest - 180 * DAY, until=newest - 90 * DAY)
+        some_user = store.index.columns["user_id"].values[0] if len(store) else "user_000000"
+        queries = {
+            "DENY, svc_*, one quarter": dict(decision="DENY", user_id="svc_*", **quarter),
+            "one user, all time": dict(user_id=some_user),
+            "CRITICAL, last 30 days": dict(severity="CRITICAL", since=newest - 30 * DAY),
+            "HIGH|CRITICAL not DENY, quarter": dict(
+                severity=["HIGH", "CRITICAL"],
+                decision=["AUTO_APPROVE", "PENDING_MANAGER_REVIEW", "PENDING_HUMAN_REVIEW"],
+                **quarter
+            ),
+        }
+        print(f"\n{'query':<34}{'matches':>9}{'count p50':>11}{'p95':>8}{'fetch p50':>11}{'p95':>8}  (ms)")
+        for name, filters in queries.items():
+            count = timed(lambda: store.count(**filters), args.repeat)
+            fetch = timed(lambda: sum(1 for _ in store.query(**filters)), max(args.repeat // 4, 1))
+            print(
+                f"{name:<34}{count['value']:>9,}{count['p50']:>11.2f}{count['p95']:>8.2f}"
+                f"{fetch['p50']:>11.1f}{fetch['p95']:>8.1f}"
+            )
+    finally:
+        if not args.dir:
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,232 @@
+"""
+Benchmark: cold-start time and import profile, with budget gates.
+
+Usage:
+    python benchmarks/bench_cold_start.py
+    python benchmarks/bench_cold_start.py --targets engine_import,fast_path --runs 5
+    python benchmarks/bench_cold_start.py --budget app_first_paint=1500 --out cold_start.json
+
+Every run of every target is a fresh interpreter started with
+`python -X importtime`, i.e. what a new Cloud Run instance pays before its
+first response. Targets:
+
+    engine_import    import accessops_engine (the engine used as a library)
+    fast_path        ... plus run_pipeline on REQ-TC01, which triage approves
+                     without any agent (google.adk must stay unloaded)
+    engine_build     ... plus get_engine() on the replay provider (ADK agents
+                     and runners; the first full-review request pays this)
+    app_first_paint  app.py's first script run under Streamlit's AppTest
+
+Reports the median wall time per target (interpreter start included) and
+the packages with the most import time, then exits non-zero if any target's
+median exceeds its budget (defaults: DEFAULT_BUDGETS_MS).
+"""
+
+import argparse
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, Any, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_FAST_PATH = """
+import asyncio, json, re
+with open("UnitTest/Audit_Log_REQ-TC01.md", encoding="utf-8") as f:
+    request = json.loads(re.search(r"```json\\s*(.*?)```", f.read(), re.S).group(1))["request"]
+from accessops_engine import PipelineConfig, run_pipeline
+result = asyncio.run(run_pipeline(request, PipelineConfig(use_cache=False)))
+assert result.decision, result
+"""
+
+TARGETS: Dict[str, str] = {
+    "engine_import": "import accessops_engine",
+    "fast_path": _FAST_PATH,
+    "engine_build": "import accessops_engine\naccessops_engine.get_engine()",
+    "app_first_paint": (
+        "from streamlit.testing.v1 import AppTest\n"
+        "app = AppTest.from_file('app.py', default_timeout=120)\n"
+        "app.run()\n"
+        "assert not app.exception, app.exception"
+    ),
+}
+
+# Medians measured on 1 vCPU were ~190 / 200 / 1250 / 1500 ms; budgets leave headroom
+DEFAULT_BUDGETS_MS: Dict[str, float] = {
+    "engine_import": 250,
+    "fast_path": 400,
+    "engine_build": 2000,
+    "app_first_paint": 2000,
+}
+
+_REPORT_MARKER = "@@cold_start@@"
+_PROBE = """
+import json as _json, sys as _sys, time as _time
+_start = _time.perf_counter()
+exec(compile({code!r}, "<{target}>", "exec"))
+print({marker!r} + _json.dumps({{
+    "target_ms": (_time.perf_counter() - _start) * 1000,
+    "adk_loaded": "google.adk" in _sys.modules,
+}}))
+"""
+_IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+
+def parse_importtime(stderr: str) -> List[Tuple[str, int, int, int]]:
+    """(module, self_us, cumulative_us, depth) for each -X importtime line."""
+    rows = []
+    for line in stderr.splitlines():
+        match = _IMPORT_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append((module, int(self_us), int(cumulative_us), len(indent) // 2))
+    return rows
+
+
+def package_times(rows: List[Tuple[str, int, int, int]]) -> Dict[str, float]:
+    """Self import time summed per top-level package, in ms."""
+    totals: Dict[str, float] = defaultdict(float)
+    for module, self_us, _, _ in rows:
+        totals[module.split(".")[0]] += self_us / 1000
+    return dict(totals)
+
+
+def run_once(target: str, env: Dict[str, str]) -> Dict[str, Any]:
+    """One fresh interpreter for `target`; raises RuntimeError if it fails."""
+    code = _PROBE.format(code=TARGETS[target], target=target, marker=_REPORT_MARKER)
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, env=env, capture_output=True, text=True
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+    report = next((line for line in proc.stdout.splitlines() if line.startswith(_REPORT_MARKER)), None)
+    if proc.returncode != 0 or report is None:
+        tail = "\n".join(line for line in proc.stderr.splitlines() if not line.startswith("import time:"))[-2000:]
+        raise RuntimeError(f"{target} exited {proc.returncode}:\n{tail}")
+    rows = parse_importtime(proc.stderr)
+    return {
+        "wall_ms": wall_ms,
+        "import_ms": sum(self_us for _, self_us, _, _ in rows) / 1000,
+        "packages_ms": package_times(rows),
+        "modules": len(rows),
+        **json.loads(report[len(_REPORT_MARKER):]),
+    }
+
+
+def profile_target(target: str, runs: int, env: Dict[str, str], top: int) -> Dict[str, Any]:
+    """Median cold-start figures for `target` over `runs` fresh interpreters."""
+    samples = [run_once(target, env) for _ in range(runs)]
+    packages: Dict[str, List[float]] = defaultdict(list)
+    for sample in samples:
+        for package, ms in sample["packages_ms"].items():
+            packages[package].append(ms)
+    heaviest = sorted(
+        ((package, statistics.median(values)) for package, values in packages.items()),
+        key=lambda item: item[1], reverse=True
+    )[:top]
+    return {
+        "target": target,
+        "runs": runs,
+        "wall_ms": round(statistics.median(s["wall_ms"] for s in samples), 1),
+        "target_ms": round(statistics.median(s["target_ms"] for s in samples), 1),
+        "import_ms": round(statistics.median(s["import_ms"] for s in samples), 1),
+        "modules": samples[-1]["modules"],
+        "adk_loaded": samples[-1]["adk_loaded"],
+        "top_packages_ms": {package: round(ms, 1) for package, ms in heaviest},
+    }
+
+
+def check_budgets(results: List[Dict[str, Any]], budgets: Dict[str, float]) -> List[str]:
+    """Human-readable budget failures (empty when every target fits)."""
+    failures = []
+    for result in results:
+        budget = budgets.get(result["target"])
+        if budget is not None and result["wall_ms"] > budget:
+            failures.append(f"{result['target']}: {result['wall_ms']} ms > budget {budget:g} ms")
+        if result["target"] == "fast_path" and result["adk_loaded"]:
+            failures.append("fast_path: google.adk was imported on a request that needs no agent")
+    return failures
+
+
+def parse_budget(value: str) -> Tuple[str, float]:
+    target, _, ms = value.partition("=")
+    if target not in TARGETS or not ms:
+        raise argparse.ArgumentTypeError(f"expected TARGET=MS with TARGET in {sorted(TARGETS)}")
+    return target, float(ms)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--targets", type=lambda s: s.split(","), default=list(TARGETS),
+        help=f"Comma-separated subset of {', '.join(TARGETS)}"
+    )
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters per target (median is reported)")
+    parser.add_argument("--top", type=int, default=8, help="Heaviest packages listed per target")
+    parser.add_argument(
+        "--budget", type=parse_budget, action="append", default=[],
+        help="Override a budget, e.g. app_first_paint=1500 (repeatable)"
+    )
+    parser.add_argument("--out", help="Write results as JSON")
+    args = parser.parse_args()
+
+    unknown = [t for t in args.targets if t not in TARGETS]
+    if unknown:
+        parser.error(f"unknown target(s) {unknown}; expected {sorted(TARGETS)}")
+    budgets = {**DEFAULT_BUDGETS_MS, **dict(args.budget)}
+
+    # Offline model so engine_build measures construction, not credentials
+    env = {**os.environ, "ACCESSOPS_MODEL_PROVIDER": "replay", "PYTHONDONTWRITEBYTECODE": "1"}
+    env.pop("ACCESSOPS_LLM_CACHE", None)
+
+    results = []
+    print(f"{'target':<17}{'wall ms':>9}{'in-proc ms':>12}{'imports ms':>12}{'modules':>9}{'budget':>9}  adk")
+    for target in args.targets:
+        try:
+            result = profile_target(target, args.runs, env, args.top)
+        except RuntimeError as e:
+            print(f"❌ {e}")
+            sys.exit(2)
+        results.append(result)
+        budget = budgets.get(target)
+        print(
+            f"{target:<17}{result['wall_ms']:>9.0f}{result['target_ms']:>12.0f}{result['import_ms']:>12.0f}"
+            f"{result['modules']:>9}{(f'{budget:g}' if budget else '-'):>9}  {'yes' if result['adk_loaded'] else 'no'}"
+        )
+
+    for result in results:
+        packages = ", ".join(f"{package} {ms:.0f}" for package, ms in result["top_packages_ms"].items())
+        print(f"\n{result['target']} heaviest imports (ms): {packages}")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({
+                "meta": {
+                    "python": platform.python_version(),
+                    "cpus": os.cpu_count(),
+                    "runs": args.runs,
+                    "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                },
+                "budgets_ms": budgets,
+                "targets": results,
+            }, f, indent=2)
+        print(f"\nResults: {args.out}")
+
+    failures = check_budgets(results, budgets)
+    if failures:
+        print(f"\n❌ {len(failures)} cold-start budget failure(s):")
+        for failure in failures:
+            print(f"  - {failure}")
+        sys.exit(1)
+    print("\n✅ All targets within budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Benchmark: per-request setup cost with and without the shared AccessOpsEngine.
+
+Usage:
+    python benchmarks/bench_engine_overhead.py --requests 200
+    python benchmarks/bench_engine_overhead.py --with-client   # also build the genai client
+
+"Per-request" repeats what run_pipeline used to do on every call: build the
+retry options, a Gemini model, the five LlmAgents, a Runner per agent phase
+and a fresh session service. "Engine" builds those once and only opens and
+closes the per-run sessions. No model calls are made.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from google.adk.runners import Runner  # noqa: E402
+from google.adk.sessions import InMemorySessionService  # noqa: E402
+
+import accessops_engine  # noqa: E402
+from accessops_engine import APP_NAME, SESSION_USER_ID, AccessOpsEngine, create_agents, create_llm_model  # noqa: E402
+
+
+async def per_request_setup(request_id: str, with_client: bool) -> None:
+    session_service = InMemorySessionService()
+    for suffix in ("", "-critique"):
+        await session_service.create_session(
+            app_name=APP_NAME,
+            user_id=SESSION_USER_ID,
+            session_id=f"session-{request_id}{suffix}"
+        )
+    llm_model = create_llm_model()
+    if with_client:
+        llm_model.api_client
+    agents = create_agents(llm_model)
+    for agent in agents.values():
+        Runner(agent=agent, app_name=APP_NAME, session_service=session_service)
+
+
+async def engine_setup(engine: AccessOpsEngine, request_id: str) -> None:
+    session_id = await engine.open_session(request_id)
+    critique_session_id = await engine.open_session(f"{request_id}-critique")
+    await engine.close_session(session_id)
+    await engine.close_session(critique_session_id)
+
+
+async def time_runs(make_coro, count: int):
+    samples = []
+    for i in range(count):
+        start = time.perf_counter()
+        await make_coro(f"REQ-{i:06d}")
+        samples.append((time.perf_counter() - start) * 1e3)
+    return samples
+
+
+def report(name: str, samples) -> None:
+    samples = sorted(samples)
+    p50 = samples[len(samples) // 2]
+    p99 = samples[max(int(len(samples) * 0.99) - 1, 0)]
+    print(f"{name:<14}{p50:>10.3f}{p99:>10.3f}{statistics.fmean(samples):>10.3f}")
+
+
+async def run(args) -> None:
+    start = time.perf_counter()
+    engine = AccessOpsEngine()
+    if args.with_client:
+        engine.llm_model.api_client
+    accessops_engine.set_engine(engine)
+    print(f"Engine built once in {(time.perf_counter() - start) * 1e3:.1f} ms")
+
+    per_request = await time_runs(lambda rid: per_request_setup(rid, args.with_client), args.requests)
+    shared = await time_runs(lambda rid: engine_setup(engine, rid), args.requests)
+
+    print(f"\n{args.requests} requests, setup cost per request (ms)")
+    print(f"{'mode':<14}{'p50':>10}{'p99':>10}{'mean':>10}")
+    report("per-request", per_request)
+    report("engine", shared)
+    print(f"\nSaved ~{statistics.fmean(per_request) - statistics.fmean(shared):.3f} ms per request")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--with-client", action="store_true",
+                        help="Include google-genai client construction (needs Vertex AI credentials)")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+Microbenchmark: per-tool lookup latency against the IdentityStore.
+
+Usage:
+    python benchmarks/bench_identity_store.py --identities 1000000
+    python benchmarks/bench_identity_store.py --snapshot identities.jsonl
+    python benchmarks/bench_identity_store.py --backend sqlite
+
+Builds (or loads) a snapshot, installs it as the process-wide backend and
+times each of the five investigator tools, including JSON serialization.
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import accessops_engine  # noqa: E402
+from identity_store import load_snapshot  # noqa: E402
+from sqlite_backend import SQLiteIdentityBackend, bulk_import  # noqa: E402
+
+ROLES = [
+    ("DevOps Engineer", "Engineering"),
+    ("Data Analyst", "Analytics"),
+    ("CI/CD Pipeline", "Platform"),
+    ("Automated Financial Ops", "Finance Automation"),
+    ("Key Rotation Service", "Security"),
+]
+RESOURCES = [f"res_{i:04d}" for i in range(2000)]
+
+
+def write_synthetic_snapshot(path: str, identities: int, seed: int = 7) -> None:
+    """Write a JSONL snapshot with `identities` users plus peer baselines."""
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8") as f:
+        for job_title, department in ROLES:
+            f.write(json.dumps({
+                "type": "peer_baseline",
+                "job_title": job_title,
+                "department": department,
+                "typical_access": rng.sample(RESOURCES, 5),
+                "write_access_rate": round(rng.random() * 0.3, 2)
+            }) + "\n")
+        for i in range(identities):
+            job_title, department = ROLES[i % len(ROLES)]
+            f.write(json.dumps({
+                "type": "user",
+                "user_id": f"user_{i:07d}",
+                "job_title": job_title,
+                "department": department,
+                "tenure_months": i % 120,
+                "identity_type": "human" if i % 3 else "service_account",
+                "entitlements": rng.sample(RESOURCES, 3),
+                "activity": {"lookback_days": 30, "recent_high_risk_actions": []}
+            }) + "\n")
+
+
+def time_calls(fn, args_list):
+    """Return per-call latencies in microseconds."""
+    samples = []
+    for args in args_list:
+        start = time.perf_counter()
+        fn(*args)
+        samples.append((time.perf_counter() - start) * 1e6)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--identities", type=int, default=100_000)
+    parser.add_argument("--snapshot", help="Existing .json/.jsonl snapshot to load")
+    parser.add_argument("--calls", type=int, default=20_000)
+    parser.add_argument("--backend", choices=["memory", "sqlite"], default="memory")
+    args = parser.parse_args()
+
+    if args.snapshot:
+        path = args.snapshot
+    else:
+        path = os.path.join(tempfile.mkdtemp(), "identities.jsonl")
+        write_synthetic_snapshot(path, args.identities)
+
+    start = time.perf_counter()
+    store = load_snapshot(path)
+    build_s = time.perf_counter() - start
+    print(f"Loaded {len(store):,} identities in {build_s:.2f}s")
+    backend = store
+
+    if args.backend == "sqlite":
+        db_path = os.path.join(tempfile.mkdtemp(), "identities.db")
+        stats = bulk_import(db_path, path)
+        print(f"Imported {stats['rows']:,} SQLite rows in {stats['elapsed_s']:.2f}s")
+        backend = SQLiteIdentityBackend(db_path)
+    accessops_engine.set_identity_backend(backend)
+
+    rng = random.Random(11)
+    user_ids = list(store.users)
+    sample = [rng.choice(user_ids) for _ in range(args.calls)]
+    profiles = [store.get_user(u) for u in sample]
+
+    cases = {
+        "get_user_profile": (accessops_engine.get_user_profile, [(u,) for u in sample]),
+        "get_current_entitlements": (accessops_engine.get_current_entitlements, [(u,) for u in sample]),
+        "get_peer_baseline": (
+            accessops_engine.get_peer_baseline,
+            [(p["job_title"], p["department"]) for p in profiles]
+        ),
+        "check_policy_violations": (
+            accessops_engine.check_policy_violations,
+            [(u, p["job_title"], rng.choice(RESOURCES), "write") for u, p in zip(sample, profiles)]
+        ),
+        "get_activity_logs": (accessops_engine.get_activity_logs, [(u,) for u in sample]),
+    }
+
+    print(f"\n{'tool':<28}{'p50 us':>10}{'p99 us':>10}{'mean us':>10}")
+    for name, (fn, call_args) in cases.items():
+        samples = sorted(time_calls(fn, call_args))
+        p50 = samples[len(samples) // 2]
+        p99 = samples[int(len(samples) * 0.99) - 1]
+        print(f"{name:<28}{p50:>10.2f}{p99:>10.2f}{statistics.fmean(samples):>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Benchmark: score_requests_batch vs. a score_request loop.
+
+Usage:
+    python benchmarks/bench_risk_scoring.py --sizes 1000,10000,100000
+    python benchmarks/bench_risk_scoring.py --sizes 10000 --repeat 9
+
+Generates synthetic requests in three shapes, checks the batch scorer's
+output is identical to the per-request loop, then reports the median time
+per request and the speedup at each size:
+
+    clean        canonical field values, no investigation
+    messy        ~30% of fields None, numeric, padded/cased or unique junk
+    investigated every request shares one investigation (control failures)
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+from typing import Dict, Any, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from risk_engine import score_request, score_requests_batch  # noqa: E402
+
+ACCESS_TYPES = ["read", "write", "read_write", "admin", "execute (key rotation)"]
+CRITICALITIES = ["prod", "non_prod", "tier_1", "saas_internal", "external"]
+SENSITIVITIES = ["internal", "restricted", "confidential", "public"]
+IDENTITY_TYPES = ["human", "service_account", "ai_agent"]
+INVESTIGATION = {
+    "policy_violations": [{"policy_id": "SOD-001", "nist_control": "AC-5 (Separation of Duties)"}],
+    "risk_signals": {"privilege_escalation": True, "outside_peer_norms": True},
+    "activity_summary": {"recent_high_risk_actions": []},
+}
+SHAPES = ("clean", "messy", "investigated")
+
+
+def synth_requests(count: int, messy: bool, seed: int = 11) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    requests = []
+    for i in range(count):
+        request = {
+            "request_id": f"REQ-BENCH-{i:08d}",
+            "user_id": f"{rng.choice(['user', 'svc_bot', 'agent'])}_{i % 5000:04d}",
+            "identity_type": rng.choice(IDENTITY_TYPES),
+            "access_type": rng.choice(ACCESS_TYPES),
+            "system_criticality": rng.choice(CRITICALITIES),
+            "data_sensitivity": rng.choice(SENSITIVITIES),
+        }
+        if rng.random() < 0.3:
+            request["mfa_enabled"] = True
+        if rng.random() < 0.2:
+            request["duration_hours"] = 8
+        if messy and rng.random() < 0.3:
+            field = rng.choice(["access_type", "system_criticality", "data_sensitivity", "identity_type"])
+            request[field] = rng.choice([None, 42, " PROD ", "Read", f"junk_{i}"])
+        requests.append(request)
+    return requests
+
+
+def median_ms(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=lambda s: [int(x) for x in s.split(",")], default=[1_000, 10_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement (median is reported)")
+    args = parser.parse_args()
+
+    # Pay the NumPy import and table build outside the timings
+    score_requests_batch(synth_requests(10, messy=False))
+
+    print(f"{'shape':<14}{'requests':>10}{'loop us/req':>13}{'batch us/req':>14}{'speedup':>9}")
+    for shape in SHAPES:
+        for size in args.sizes:
+            requests = synth_requests(size, messy=shape == "messy")
+            investigations: Optional[List[Dict[str, Any]]] = [INVESTIGATION] * size if shape == "investigated" else None
+            paired = investigations or [None] * size
+
+            expected = [score_request(r, i) for r, i in zip(requests, paired)]
+            if score_requests_batch(requests, investigations) != expected:
+                print(f"❌ {shape}/{size}: batch output differs from score_request()")
+                sys.exit(1)
+
+            loop = median_ms(lambda: [score_request(r, i) for r, i in zip(requests, paired)], args.repeat)
+            batch = median_ms(lambda: score_requests_batch(requests, investigations), args.repeat)
+            print(
+                f"{shape:<14}{size:>10,}{loop * 1000 / size:>13.2f}{batch * 1000 / size:>14.2f}"
+                f"{loop / batch:>8.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
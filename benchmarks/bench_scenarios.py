@@ -0,0 +1,230 @@
+"""
+Benchmark: the 30 UnitTest scenarios end-to-end, with regression gates.
+
+Usage:
+    python benchmarks/bench_scenarios.py --concurrency 1,8,32 --out results.json
+    python benchmarks/bench_scenarios.py --baseline results.json   # gate a change
+    python benchmarks/bench_scenarios.py --provider gemini --concurrency 4
+
+Runs every UnitTest/Audit_Log_REQ-TC*.md request through run_pipeline at each
+concurrency level (default model: the offline replay provider with injected
+latency), then reports requests/sec, end-to-end and per-phase p50/p95/p99
+latency, and agreement with the recorded decisions and net risk scores.
+Results are written as JSON. With --baseline, the run exits non-zero if
+throughput drops or p95 latency grows beyond --tolerance at any level, or if
+any scenario's decision differs from the baseline's.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, Any, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import accessops_engine  # noqa: E402
+from accessops_engine import AccessOpsEngine, PipelineConfig, run_pipeline  # noqa: E402
+from model_providers import create_model  # noqa: E402
+from replay_model import DEFAULT_REPLAY_DIR, AuditLogLibrary, ReplayLlm  # noqa: E402
+
+PIPELINES = {
+    # Shipping defaults: triage, native scoring and gatekeeper, isolated sessions
+    "default": dict(use_cache=False),
+    # Every agent makes a model call
+    "full": dict(
+        use_cache=False,
+        triage=False,
+        investigation_mode="llm",
+        scoring_mode="review",
+        gatekeeper_mode="explain"
+    ),
+}
+
+
+def percentiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0}
+    ordered = sorted(values)
+
+    def pick(pct: float) -> float:
+        return ordered[min(max(int(round(pct / 100 * len(ordered))) - 1, 0), len(ordered) - 1)]
+
+    return {"p50": round(pick(50), 3), "p95": round(pick(95), 3), "p99": round(pick(99), 3)}
+
+
+async def run_level(
+    scenarios: List[Dict[str, Any]],
+    engine: AccessOpsEngine,
+    config: PipelineConfig,
+    concurrency: int,
+    rounds: int
+) -> Dict[str, Any]:
+    """Run every scenario `rounds` times with at most `concurrency` in flight."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    phase_latencies: Dict[str, List[float]] = defaultdict(list)
+    decisions: Dict[str, str] = {}
+    decision_matches = score_matches = errors = 0
+
+    async def one(scenario: Dict[str, Any]) -> None:
+        nonlocal decision_matches, score_matches, errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                result = await run_pipeline(dict(scenario["request"]), config, engine=engine)
+            except Exception:
+                errors += 1
+                return
+            latencies.append((time.perf_counter() - start) * 1000)
+        for trace in result.execution_trace:
+            if "latency_ms" in trace:
+                phase_latencies[trace["phase"]].append(trace["latency_ms"])
+        request_id = scenario["request"]["request_id"]
+        decisions[request_id] = result.decision
+        decision_matches += result.decision == scenario["decision"].get("decision")
+        score_matches += result.risk_score.get("net_risk_score") == scenario["risk_score"].get("net_risk_score")
+
+    wall_start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        await asyncio.gather(*(one(s) for _ in range(rounds) for s in scenarios))
+    wall = time.perf_counter() - wall_start
+
+    total = len(scenarios) * rounds
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "errors": errors,
+        "elapsed_s": round(wall, 3),
+        "rps": round(len(latencies) / wall, 2) if wall else 0.0,
+        "latency_ms": percentiles(latencies),
+        "phases_ms": {phase: percentiles(values) for phase, values in sorted(phase_latencies.items())},
+        "agreement": {
+            "decision": round(decision_matches / total, 4),
+            "net_risk_score": round(score_matches / total, 4),
+        },
+        "decisions": dict(sorted(decisions.items())),
+    }
+
+
+def check_regressions(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Human-readable gate failures (empty when the run passes)."""
+    failures = []
+    baseline_levels = {level["concurrency"]: level for level in baseline.get("levels", [])}
+    for level in results["levels"]:
+        base = baseline_levels.get(level["concurrency"])
+        if base is None:
+            continue
+        c = level["concurrency"]
+        if level["rps"] < base["rps"] * (1 - tolerance):
+            failures.append(f"c={c}: throughput {level['rps']} rps < baseline {base['rps']} rps -{tolerance:.0%}")
+        if level["latency_ms"]["p95"] > base["latency_ms"]["p95"] * (1 + tolerance):
+            failures.append(
+                f"c={c}: p95 {level['latency_ms']['p95']} ms > baseline {base['latency_ms']['p95']} ms +{tolerance:.0%}"
+            )
+        if level["errors"] > base["errors"]:
+            failures.append(f"c={c}: {level['errors']} errors (baseline {base['errors']})")
+        for request_id, decision in level["decisions"].items():
+            expected = base["decisions"].get(request_id)
+            if expected is not None and expected != decision:
+                failures.append(f"c={c}: {request_id} decision flipped {expected} -> {decision}")
+    return failures
+
+
+async def run(args) -> int:
+    library = AuditLogLibrary(args.replay_dir)
+    scenarios = [library.records[rid] for rid in sorted(library.records)]
+
+    if args.provider == "replay":
+        model = ReplayLlm(
+            replay_dir=args.replay_dir,
+            latency_ms=args.latency_ms,
+            jitter_ms=args.jitter_ms,
+            failure_rate=args.failure_rate,
+            seed=args.seed
+        )
+    else:
+        model = create_model(args.provider)
+    engine = AccessOpsEngine(llm_model=model)
+    accessops_engine.set_engine(engine)
+    config = PipelineConfig(**PIPELINES[args.pipeline])
+
+    results = {
+        "meta": {
+            "provider": args.provider,
+            "pipeline": args.pipeline,
+            "scenarios": len(scenarios),
+            "rounds": args.rounds,
+            "latency_ms": args.latency_ms,
+            "jitter_ms": args.jitter_ms,
+            "failure_rate": args.failure_rate,
+            "python": platform.python_version(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        },
+        "levels": [],
+    }
+
+    print(f"{len(scenarios)} scenarios x {args.rounds} rounds, provider={args.provider}, pipeline={args.pipeline}")
+    if args.warmup:
+        # Keep first-call costs (lazy imports, runner setup) out of the first level
+        await run_level(scenarios[:args.warmup], engine, config, args.warmup, 1)
+    print(f"\n{'conc':>5}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'decision':>10}{'score':>8}{'errors':>8}")
+    for concurrency in args.concurrency:
+        level = await run_level(scenarios, engine, config, concurrency, args.rounds)
+        results["levels"].append(level)
+        latency = level["latency_ms"]
+        print(
+            f"{concurrency:>5}{level['rps']:>9.2f}{latency['p50']:>10.1f}{latency['p95']:>10.1f}"
+            f"{latency['p99']:>10.1f}{level['agreement']['decision']:>10.0%}"
+            f"{level['agreement']['net_risk_score']:>8.0%}{level['errors']:>8}"
+        )
+
+    last = results["levels"][-1]
+    print(f"\nPer-phase latency at concurrency {last['concurrency']} (ms)")
+    for phase, stats in last["phases_ms"].items():
+        print(f"  {phase:<14} p50 {stats['p50']:>9.1f}  p95 {stats['p95']:>9.1f}  p99 {stats['p99']:>9.1f}")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults: {args.out}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        failures = check_regressions(results, baseline, args.tolerance)
+        if failures:
+            print(f"\n❌ {len(failures)} regression(s) against {args.baseline}:")
+            for failure in failures:
+                print(f"  - {failure}")
+            return 1
+        print(f"\n✅ No regressions against {args.baseline}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--provider", default="replay", help="Model provider (replay, gemini)")
+    parser.add_argument("--pipeline", choices=sorted(PIPELINES), default="full")
+    parser.add_argument("--concurrency", type=lambda s: [int(c) for c in s.split(",")], default=[1, 8, 32])
+    parser.add_argument("--rounds", type=int, default=1, help="Times each scenario runs per level")
+    parser.add_argument("--warmup", type=int, default=4, help="Unmeasured requests before the first level")
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="Replay: mean model latency per call")
+    parser.add_argument("--jitter-ms", type=float, default=50.0, help="Replay: uniform latency jitter")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Replay: injected failure probability")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--replay-dir", default=DEFAULT_REPLAY_DIR)
+    parser.add_argument("--out", default="bench_scenarios_results.json")
+    parser.add_argument("--baseline", help="Earlier --out file to gate against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative rps/p95 regression")
+    sys.exit(asyncio.run(run(parser.parse_args())))
+
+
+if __name__ == "__main__":
+    main()
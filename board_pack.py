@@ -0,0 +1,591 @@
+"""
+AccessOps Intelligence - Board Pack Renderer
+Renders board-report PDFs for many decisions at once.
+
+Input is a JSONL of PipelineResults (e.g. the batch runner's output). Reports
+are rendered across a process pool whose workers import ReportLab and build
+the paragraph styles once at startup; each worker writes its PDF straight to
+a staging directory, so only file paths cross process boundaries.
+
+Output formats:
+    zip     one Board_Report_<request_id>.pdf per decision plus index.csv,
+            added to the archive as each PDF finishes; memory stays flat
+            however many decisions the pack holds
+    merged  a single PDF with a table of contents and one bookmark per
+            decision (needs pypdf). pypdf assembles the whole document in
+            memory before writing it, so use zip for very large packs
+
+Records the batch runner wrote for failed requests ({"request_id", "error"})
+and malformed lines are reported and skipped rather than rendered.
+
+Usage:
+    python -m accessops_engine board-pack results.jsonl --out board_pack.zip
+    python board_pack.py results.jsonl --out board_pack.pdf --format merged --workers 8
+"""
+
+import argparse
+import concurrent.futures
+import csv
+import io
+import json
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+import zipfile
+from dataclasses import dataclass, field
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import LETTER
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+PACK_FORMATS = ("zip", "merged")
+DEFAULT_WORKERS = os.cpu_count() or 2
+# Submitted-but-unfinished reports per worker (bounds parent memory)
+TASKS_PER_WORKER = 4
+
+_UNSAFE_FILENAME = re.compile(r"[^A-Za-z0-9._-]+")
+
+
+# ============================================================================
+# SECTION 1: SINGLE REPORT
+# ============================================================================
+
+@dataclass(frozen=True)
+class ReportStyles:
+    title: ParagraphStyle
+    section: ParagraphStyle
+    body: ParagraphStyle
+
+
+_styles: Optional[ReportStyles] = None
+
+
+def get_styles() -> ReportStyles:
+    """Paragraph styles roughly matching the UI, built once per process."""
+    global _styles
+    if _styles is None:
+        sample = getSampleStyleSheet()
+        _styles = ReportStyles(
+            title=ParagraphStyle(
+                name="ReportTitle",
+                parent=sample["Heading1"],
+                fontSize=16,
+                leading=20,
+                spaceAfter=12,
+            ),
+            section=ParagraphStyle(
+                name="SectionHeading",
+                parent=sample["Heading2"],
+                fontSize=14,
+                leading=18,
+                spaceAfter=10,
+            ),
+            body=ParagraphStyle(
+                name="Body",
+                parent=sample["BodyText"],
+                fontSize=10,
+                leading=14,
+                spaceAfter=10,
+            ),
+        )
+    return _styles
+
+
+def normalize_board_report(board_report_md: str) -> str:
+    """Rename the narrator's "Executive Audit Summary" heading as the UI shows it."""
+    normalized = board_report_md or "No board report returned."
+    return normalized.replace("Executive Audit Summary", "Executive Board Report", 1)
+
+
+def report_title(request_id: str) -> str:
+    return f"AccessOps Board Report – {request_id}"
+
+
+def _new_document(target: Any) -> SimpleDocTemplate:
+    return SimpleDocTemplate(
+        target,
+        pagesize=LETTER,
+        rightMargin=72,
+        leftMargin=72,
+        topMargin=72,
+        bottomMargin=72,
+    )
+
+
+def build_story(board_report_md: str, title: str) -> List[Any]:
+    """
+    Flowables for one board report:
+      - Title: AccessOps Board Report – <REQ-ID>
+      - 🛡 Executive Board Report heading + paragraph
+      - 🚦 Risk Factor Analysis (NIST/COBIT) table
+        * Status column uses per-row "traffic light" status (🔴 / 🟡 / 🟢)
+      - 📋 Recommended Management Action (supports numbered list OR single paragraph)
+    """
+    styles = get_styles()
+    h_title, h_section, body = styles.title, styles.section, styles.body
+
+    story = []
+
+    # ------------------------------------------------------------------
+    # 0. Top title ("AccessOps Board Report – REQ-XXX")
+    # ------------------------------------------------------------------
+    story.append(Paragraph(title, h_title))
+    story.append(Spacer(1, 6))
+
+    lines = board_report_md.splitlines()
+
+    # ------------------------------------------------------------------
+    # 1. Executive Board Report (🛡 heading + paragraph)
+    # ------------------------------------------------------------------
+    story.append(Paragraph("🛡 Executive Board Report", h_section))
+
+    exec_summary_lines = []
+    i = 0
+    while i < len(lines):
+        line = lines[i].strip()
+        if "Executive Board Report" in line:
+            # consume following non-empty lines until blank or next heading
+            i += 1
+            while i < len(lines):
+                l = lines[i].strip()
+                if not l:
+                    break
+                # skip markdown headings
+                if l.startswith("#"):
+                    break
+                exec_summary_lines.append(l)
+                i += 1
+            break
+        i += 1
+
+    if exec_summary_lines:
+        exec_text = " ".join(exec_summary_lines)
+        story.append(Paragraph(exec_text, body))
+        story.append(Spacer(1, 12))
+
+    # ------------------------------------------------------------------
+    # 2. Risk Factor Analysis (🚦 heading + table)
+    # ------------------------------------------------------------------
+    story.append(Paragraph("🚦 Risk Factor Analysis (NIST/COBIT)", h_section))
+
+    headers = []
+    rows = []
+
+    i = 0
+    while i < len(lines):
+        if "| Status" in lines[i] and "Risk Component" in lines[i]:
+            # header row
+            header_cells = [c.strip() for c in lines[i].strip().split("|") if c.strip()]
+            headers = header_cells
+            # skip separator row
+            i += 2
+            # data rows
+            while i < len(lines) and lines[i].strip().startswith("|"):
+                cells = [c.strip() for c in lines[i].strip().split("|") if c.strip()]
+                rows.append(cells)
+                i += 1
+            break
+        i += 1
+
+    # Clean markdown from data cells (remove **)
+    cleaned_rows = []
+    for r in rows:
+        cleaned_rows.append([cell.replace("**", "") for cell in r])
+
+    # Table rendering: Status column shows traffic-light status
+    if headers and cleaned_rows:
+        col_widths = [0.6 * inch, 2.1 * inch, 3.0 * inch]
+        table_data = [headers] + cleaned_rows
+
+        t = Table(table_data, colWidths=col_widths, repeatRows=1)
+        ts = TableStyle(
+            [
+                ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
+                ("TEXTCOLOR", (0, 0), (-1, 0), colors.black),
+                ("ALIGN", (0, 0), (-1, -1), "LEFT"),
+                ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+                ("FONTSIZE", (0, 0), (-1, 0), 10),
+                ("BOTTOMPADDING", (0, 0), (-1, 0), 6),
+                ("GRID", (0, 0), (-1, -1), 0.5, colors.grey),
+            ]
+        )
+
+        # Status column colors (per-row)
+        for row_idx in range(1, len(table_data)):
+            status_cell = table_data[row_idx][0]
+            status_str = str(status_cell).strip()
+            # Map emojis / words to colors
+            if "🔴" in status_str or "HIGH" in status_str.upper() or "CRIT" in status_str.upper():
+                fill = colors.red
+            elif "🟡" in status_str or "MED" in status_str.upper():
+                fill = colors.yellow
+            elif "🟠" in status_str or "ORANGE" in status_str.upper():
+                fill = colors.orange
+            else:
+                # default LOW/green
+                fill = colors.green
+            ts.add("BACKGROUND", (0, row_idx), (0, row_idx), fill)
+            ts.add("TEXTCOLOR", (0, row_idx), (0, row_idx), colors.white)
+            ts.add("ALIGN", (0, row_idx), (0, row_idx), "CENTER")
+
+        t.setStyle(ts)
+        story.append(t)
+        story.append(Spacer(1, 12))
+
+    # ------------------------------------------------------------------
+    # 3. Recommended Management Action (📋 heading + body)
+    # ------------------------------------------------------------------
+    story.append(Paragraph("📋 Recommended Management Action", h_section))
+
+    actions_raw = []
+    i = 0
+    while i < len(lines):
+        if "Recommended Management Action" in lines[i]:
+            i += 1
+            while i < len(lines):
+                l = lines[i].strip()
+                if not l:
+                    i += 1
+                    continue
+                # stop if we hit another markdown heading (unlikely at end)
+                if l.startswith("#"):
+                    break
+                actions_raw.append(l)
+                i += 1
+            break
+        i += 1
+
+    if actions_raw:
+        # Determine if we have numbered list items like "1. text"
+        numbered = all(
+            (len(l) > 2 and l[0].isdigit() and l[1] in {".", ")"})
+            for l in actions_raw
+        )
+        if numbered:
+            # Render each as its own numbered paragraph
+            for l in actions_raw:
+                # strip leading "1. " or "1) "
+                parts = l.split(" ", 1)
+                if len(parts) == 2 and parts[0][0].isdigit():
+                    text = parts[1]
+                else:
+                    text = l
+                story.append(Paragraph(text, body))
+        else:
+            # Treat as a single paragraph (e.g. DevOps LOW-risk example)
+            combined = " ".join(actions_raw)
+            story.append(Paragraph(combined, body))
+
+    return story
+
+
+def render_board_report_pdf(board_report_md: str, title: str) -> bytes:
+    """One board report as PDF bytes (the Command Center download)."""
+    buffer = io.BytesIO()
+    _new_document(buffer).build(build_story(board_report_md, title))
+    return buffer.getvalue()
+
+
+def render_board_report_file(board_report_md: str, title: str, path: str) -> int:
+    """Write one board report to path; returns its page count."""
+    doc = _new_document(path)
+    doc.build(build_story(board_report_md, title))
+    return doc.page
+
+
+# ============================================================================
+# SECTION 2: PARALLEL RENDERING
+# ============================================================================
+
+@dataclass
+class RenderedReport:
+    index: int
+    request_id: str
+    decision: str
+    net_risk_score: Any
+    path: Optional[str] = None
+    pages: int = 0
+    error: Optional[str] = None
+
+
+def _init_worker() -> None:
+    # Pay for ReportLab's font metrics and style sheets once per worker
+    get_styles()
+    render_board_report_pdf("", report_title("warmup"))
+
+
+def _render_task(task: Tuple[int, Dict[str, Any], str]) -> RenderedReport:
+    index, record, staging_dir = task
+    request_id = str(record.get("request_id") or f"record-{index}")
+    report = RenderedReport(
+        index=index,
+        request_id=request_id,
+        decision=str(record.get("decision", "UNKNOWN")),
+        net_risk_score=(record.get("risk_score") or {}).get("net_risk_score")
+    )
+    path = os.path.join(staging_dir, f"{index:08d}.pdf")
+    try:
+        report.pages = render_board_report_file(
+            normalize_board_report(record.get("board_report") or ""),
+            report_title(request_id),
+            path
+        )
+        report.path = path
+    except Exception as e:
+        report.error = f"{type(e).__name__}: {e}"
+    return report
+
+
+def iter_results(path: str) -> Iterator[Tuple[int, Optional[Dict[str, Any]], Optional[str]]]:
+    """
+    (line_number, record, error) for each PipelineResult in a JSONL file.
+
+    Blank lines are skipped; malformed lines yield (line_number, None, error)
+    so the caller can report them without aborting the pack.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield line_number, None, f"invalid JSON: {e}"
+                continue
+            if not isinstance(record, dict):
+                yield line_number, None, "record is not a JSON object"
+                continue
+            yield line_number, record, None
+
+
+def render_reports(
+    records: Iterator[Dict[str, Any]],
+    staging_dir: str,
+    workers: int = DEFAULT_WORKERS
+) -> Iterator[RenderedReport]:
+    """
+    Render records across a process pool, yielding reports as they finish
+    (not in input order). At most workers * TASKS_PER_WORKER records are
+    held in memory at once.
+    """
+    window = max(workers, 1) * TASKS_PER_WORKER
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        pending = set()
+        for index, record in enumerate(records):
+            pending.add(pool.submit(_render_task, (index, record, staging_dir)))
+            if len(pending) >= window:
+                done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        for future in concurrent.futures.as_completed(pending):
+            yield future.result()
+
+
+# ============================================================================
+# SECTION 3: PACK ASSEMBLY
+# ============================================================================
+
+@dataclass
+class PackSummary:
+    output_path: str
+    pack_format: str
+    reports: int = 0
+    pages: int = 0
+    failed: List[Dict[str, str]] = field(default_factory=list)
+    invalid: int = 0
+    elapsed_s: float = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "output": self.output_path,
+            "format": self.pack_format,
+            "reports": self.reports,
+            "pages": self.pages,
+            "failed": len(self.failed),
+            "errors": self.failed[:20],
+            "invalid_lines": self.invalid,
+            "elapsed_s": round(self.elapsed_s, 3),
+            "reports_per_s": round(self.reports / self.elapsed_s, 2) if self.elapsed_s else 0.0,
+        }
+
+
+def _zip_member_name(request_id: str, used: Dict[str, int]) -> str:
+    name = _UNSAFE_FILENAME.sub("_", request_id) or "request"
+    used[name] = used.get(name, 0) + 1
+    suffix = f"-{used[name]}" if used[name] > 1 else ""
+    return f"Board_Report_{name}{suffix}.pdf"
+
+
+def _write_zip(reports: Iterator[RenderedReport], output_path: str, summary: PackSummary) -> None:
+    used: Dict[str, int] = {}
+    index_rows = []
+    with zipfile.ZipFile(output_path, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for report in reports:
+            if report.error:
+                summary.failed.append({"request_id": report.request_id, "error": report.error})
+                continue
+            member = _zip_member_name(report.request_id, used)
+            archive.write(report.path, member)
+            os.remove(report.path)
+            index_rows.append((report.index, report.request_id, report.decision, report.net_risk_score, report.pages, member))
+            summary.reports += 1
+            summary.pages += report.pages
+
+        manifest = io.StringIO()
+        writer = csv.writer(manifest)
+        writer.writerow(["request_id", "decision", "net_risk_score", "pages", "file"])
+        for row in sorted(index_rows):
+            writer.writerow(row[1:])
+        archive.writestr("index.csv", manifest.getvalue())
+
+
+def _render_toc(entries: List[RenderedReport], first_page: int, path: str) -> int:
+    styles = get_styles()
+    rows = [["#", "Request", "Decision", "Net Risk", "Page"]]
+    page = first_page
+    for number, entry in enumerate(entries, start=1):
+        rows.append([str(number), entry.request_id, entry.decision, str(entry.net_risk_score), str(page)])
+        page += entry.pages
+    table = Table(rows, colWidths=[0.5 * inch, 2.2 * inch, 2.2 * inch, 0.8 * inch, 0.6 * inch], repeatRows=1)
+    table.setStyle(TableStyle([
+        ("BACKGROUND", (0, 0), (-1, 0), colors.lightgrey),
+        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+        ("FONTSIZE", (0, 0), (-1, -1), 9),
+        ("GRID", (0, 0), (-1, -1), 0.25, colors.grey),
+    ]))
+    doc = _new_document(path)
+    doc.build([Paragraph("AccessOps Board Pack – Table of Contents", styles.title), Spacer(1, 6), table])
+    return doc.page
+
+
+def _write_merged(
+    reports: Iterator[RenderedReport],
+    output_path: str,
+    staging_dir: str,
+    summary: PackSummary
+) -> None:
+    # Unlike _write_zip this does not stream: PdfWriter holds every page
+    # until write(), so peak memory grows with the size of the pack
+    try:
+        from pypdf import PdfWriter
+    except ImportError:
+        raise RuntimeError("The merged board pack needs pypdf (pip install pypdf); use --format zip instead")
+
+    # Reports finish out of order; they wait on disk until all are rendered
+    entries = []
+    for report in reports:
+        if report.error:
+            summary.failed.append({"request_id": report.request_id, "error": report.error})
+            continue
+        entries.append(report)
+    entries.sort(key=lambda r: r.index)
+
+    # The TOC's own length shifts every page number; settle it first
+    toc_path = os.path.join(staging_dir, "toc.pdf")
+    toc_pages = _render_toc(entries, 1, toc_path)
+    rendered_pages = _render_toc(entries, toc_pages + 1, toc_path)
+    if rendered_pages != toc_pages:
+        _render_toc(entries, rendered_pages + 1, toc_path)
+        toc_pages = rendered_pages
+
+    writer = PdfWriter()
+    writer.append(toc_path, import_outline=False)
+    page = toc_pages
+    for entry in entries:
+        writer.append(entry.path, import_outline=False)
+        writer.add_outline_item(f"{entry.request_id} – {entry.decision}", page)
+        page += entry.pages
+        summary.reports += 1
+        summary.pages += entry.pages
+    with open(output_path, "wb") as f:
+        writer.write(f)
+
+
+def _renderable(input_path: str, summary: PackSummary) -> Iterator[Dict[str, Any]]:
+    for line_number, record, error in iter_results(input_path):
+        if error is not None:
+            summary.invalid += 1
+            print(f"⚠️  {input_path}:{line_number}: {error}", file=sys.stderr)
+            continue
+        if "error" in record:
+            # The batch runner's record for a request that failed: no report
+            request_id = str(record.get("request_id") or f"line-{line_number}")
+            summary.failed.append({"request_id": request_id, "error": str(record["error"])})
+            continue
+        yield record
+
+
+def build_board_pack(
+    input_path: str,
+    output_path: str,
+    pack_format: str = "zip",
+    workers: int = DEFAULT_WORKERS
+) -> PackSummary:
+    """
+    Render every result in input_path into a board pack.
+
+    Args:
+        input_path: JSONL of PipelineResults (batch runner output)
+        output_path: .zip or .pdf to write
+        pack_format: "zip" (per-request PDFs) or "merged" (one PDF with TOC)
+        workers: Renderer processes
+
+    Returns:
+        PackSummary (failed lists failed requests and reports that could
+        not be rendered; invalid counts malformed input lines)
+    """
+    if pack_format not in PACK_FORMATS:
+        raise ValueError(f"Unknown pack format {pack_format!r}; expected one of {PACK_FORMATS}")
+    start = time.perf_counter()
+    summary = PackSummary(output_path, pack_format)
+    staging_dir = tempfile.mkdtemp(prefix=".board_pack-", dir=os.path.dirname(os.path.abspath(output_path)))
+    try:
+        reports = render_reports(_renderable(input_path, summary), staging_dir, workers)
+        if pack_format == "zip":
+            _write_zip(reports, output_path, summary)
+        else:
+            _write_merged(reports, output_path, staging_dir, summary)
+    finally:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+    summary.elapsed_s = time.perf_counter() - start
+    return summary
+
+
+# ============================================================================
+# SECTION 4: CLI
+# ============================================================================
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="accessops_engine board-pack",
+        description="Render board-report PDFs for a JSONL of pipeline results"
+    )
+    parser.add_argument("input", help="JSONL of PipelineResults (e.g. batch runner output)")
+    parser.add_argument("--out", help="Output path (default: <input>.board_pack.zip / .pdf)")
+    parser.add_argument(
+        "--format", choices=PACK_FORMATS, default="zip", dest="pack_format",
+        help="zip streams to disk; merged builds the whole PDF in memory"
+    )
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Renderer processes")
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """CLI entry point. Returns a process exit code (1 if any report failed or line was invalid)."""
+    args = build_parser().parse_args(argv)
+    extension = ".zip" if args.pack_format == "zip" else ".pdf"
+    output_path = args.out or f"{os.path.splitext(args.input)[0]}.board_pack{extension}"
+    summary = build_board_pack(args.input, output_path, args.pack_format, args.workers)
+    print(json.dumps(summary.as_dict(), indent=2))
+    return 1 if summary.failed or summary.invalid else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,171 @@
+"""
+AccessOps Intelligence - Decision Cache
+Remembers pipeline results for resubmitted requests. Entries are keyed by a
+canonical fingerprint of the request plus a version hash of the identity
+data the decision was made on, so a changed entitlement, policy or peer
+baseline can never serve a stale decision.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Any, Iterable, Mapping, Optional, Set, Tuple
+
+DEFAULT_MAX_ENTRIES = 10_000
+DEFAULT_TTL_SECONDS = 900.0
+
+# Fields that vary between resubmissions without changing the decision
+VOLATILE_FIELDS = frozenset({
+    "request_id",
+    "requested_resource_name",
+    "justification",
+    "submitted_at",
+    "timestamp",
+})
+
+# Enumerations the scorer reads case- and whitespace-insensitively
+CASE_INSENSITIVE_FIELDS = frozenset({"system_criticality", "data_sensitivity"})
+
+
+def request_fingerprint(request_context: Mapping[str, Any]) -> str:
+    """
+    Canonical hash of the decision-relevant fields of a request.
+
+    Two submissions of the same request (new request_id, reworded
+    justification) produce the same fingerprint.
+    """
+    canonical = {}
+    for key, value in request_context.items():
+        if key in VOLATILE_FIELDS or value is None:
+            continue
+        if key in CASE_INSENSITIVE_FIELDS and isinstance(value, str):
+            value = value.strip().lower()
+        canonical[key] = value
+    return _digest(canonical)
+
+
+def content_version(*parts: Any) -> str:
+    """Stable hash of JSON-serialisable inputs (entitlements, policies, ...)."""
+    return _digest(parts)
+
+
+def _digest(value: Any) -> str:
+    payload = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+@dataclass
+class CacheEntry:
+    """A cached value with the identity it belongs to and its expiry."""
+    value: Any
+    user_id: str
+    stored_at: float
+    expires_at: float
+
+
+class DecisionCache:
+    """
+    Thread-safe TTL + LRU cache of pipeline results.
+
+    Keys are (fingerprint, version) strings built by make_key. Beyond the
+    version hash, entries can be dropped explicitly per identity (after an
+    entitlement change) or wholesale (after a policy change).
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, ttl_seconds: float = DEFAULT_TTL_SECONDS):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._by_user: Dict[str, Set[str]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(request_context: Mapping[str, Any], version: str, scope: str = "") -> str:
+        """
+        Args:
+            request_context: The access request
+            version: content_version of the inputs the decision depends on
+            scope: Anything else the result depends on (e.g. pipeline config)
+        """
+        return f"{request_fingerprint(request_context)}:{version}:{scope}"
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        """
+        Returns:
+            (value, age_seconds) on a fresh hit, else None
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry.expires_at <= now:
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.value, now - entry.stored_at
+
+    def put(self, key: str, user_id: str, value: Any) -> None:
+        now = time.monotonic()
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = CacheEntry(value, user_id, now, now + self.ttl_seconds)
+            self._by_user.setdefault(user_id, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate_identity(self, user_id: str) -> int:
+        """Drop every decision made for user_id. Returns the number dropped."""
+        with self._lock:
+            keys = list(self._by_user.get(user_id, ()))
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def invalidate_identities(self, user_ids: Iterable[str]) -> int:
+        return sum(self.invalidate_identity(user_id) for user_id in user_ids)
+
+    def invalidate_policies(self) -> int:
+        """Drop everything: any decision may depend on the changed policy."""
+        return self.clear()
+
+    def clear(self) -> int:
+        with self._lock:
+            dropped = len(self._entries)
+            self._entries.clear()
+            self._by_user.clear()
+            return dropped
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def _remove(self, key: str) -> None:
+        # Caller holds the lock
+        entry = self._entries.pop(key)
+        keys = self._by_user.get(entry.user_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_user[entry.user_id]
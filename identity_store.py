@@ -0,0 +1,290 @@
+"""
+AccessOps Intelligence - Identity Store
+Immutable, indexed snapshot of identity data (HR profiles, entitlements,
+peer baselines, policies, SIEM activity) built once per process.
+"""
+
+import abc
+import json
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, Any, List, Iterable, Iterator, Mapping, Optional, Tuple
+
+# ============================================================================
+# SECTION 1: DEFAULTS
+# ============================================================================
+
+DEFAULT_PEER_BASELINE: Mapping[str, Any] = MappingProxyType({
+    "typical_access": ["read_only"],
+    "write_access_rate": 0.05
+})
+
+DEFAULT_ACTIVITY: Mapping[str, Any] = MappingProxyType({
+    "recent_high_risk_actions": []
+})
+
+
+def peer_key(job_title: str, department: str) -> str:
+    """Build the `job_title|department` key used to index peer baselines."""
+    return f"{job_title}|{department}"
+
+
+_CONTAINERS = (dict, list, tuple)
+
+
+def _freeze(value: Any) -> Any:
+    """Recursively convert dicts/lists into read-only equivalents."""
+    if isinstance(value, dict):
+        return MappingProxyType({
+            k: _freeze(v) if isinstance(v, _CONTAINERS) else v
+            for k, v in value.items()
+        })
+    if isinstance(value, _CONTAINERS):
+        return tuple(_freeze(v) if isinstance(v, _CONTAINERS) else v for v in value)
+    return value
+
+
+def thaw(value: Any) -> Any:
+    """Convert a frozen value back into plain dicts/lists (for json.dumps)."""
+    if isinstance(value, Mapping):
+        return {k: thaw(v) for k, v in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(v) for v in value]
+    return value
+
+
+# ============================================================================
+# SECTION 2: BACKEND INTERFACE
+# ============================================================================
+
+class IdentityBackend(abc.ABC):
+    """
+    Storage interface behind the investigator tools.
+
+    Implementations must be safe to call from multiple threads; the tool
+    functions may run concurrently in a thread pool. Returned mappings are
+    treated as read-only by callers.
+    """
+
+    @abc.abstractmethod
+    def get_user(self, user_id: str) -> Optional[Mapping[str, Any]]:
+        """HR profile for user_id, or None if unknown."""
+
+    @abc.abstractmethod
+    def get_entitlements(self, user_id: str) -> Tuple[str, ...]:
+        """Resources currently granted to user_id."""
+
+    @abc.abstractmethod
+    def get_peer_baseline(self, job_title: str, department: str) -> Mapping[str, Any]:
+        """Peer baseline for the role, falling back to DEFAULT_PEER_BASELINE."""
+
+    @abc.abstractmethod
+    def get_policies(self) -> Mapping[str, Mapping[str, Any]]:
+        """All policies keyed by policy_id."""
+
+    @abc.abstractmethod
+    def get_activity(self, user_id: str) -> Mapping[str, Any]:
+        """SIEM activity summary, falling back to DEFAULT_ACTIVITY."""
+
+    @abc.abstractmethod
+    def get_resource_holders(self, resource_id: str) -> Tuple[str, ...]:
+        """user_ids currently holding resource_id."""
+
+
+# ============================================================================
+# SECTION 3: IDENTITY STORE
+# ============================================================================
+
+@dataclass(frozen=True)
+class IdentityStore(IdentityBackend):
+    """
+    Read-only identity snapshot with hash indexes.
+
+    Indexes:
+        users / entitlements / activity_logs: by user_id
+        peer_baseline: by `job_title|department` peer key
+        resource_holders: by resource (entitlement) -> user_ids holding it
+    """
+    users: Mapping[str, Mapping[str, Any]]
+    entitlements: Mapping[str, Tuple[str, ...]]
+    peer_baseline: Mapping[str, Mapping[str, Any]]
+    policies: Mapping[str, Mapping[str, Any]]
+    activity_logs: Mapping[str, Mapping[str, Any]]
+    resource_holders: Mapping[str, Tuple[str, ...]]
+
+    # ------------------------------------------------------------------
+    # Lookups (all O(1) dict probes)
+    # ------------------------------------------------------------------
+
+    def get_user(self, user_id: str) -> Optional[Mapping[str, Any]]:
+        return self.users.get(user_id)
+
+    def get_entitlements(self, user_id: str) -> Tuple[str, ...]:
+        return self.entitlements.get(user_id, ())
+
+    def get_peer_baseline(self, job_title: str, department: str) -> Mapping[str, Any]:
+        return self.peer_baseline.get(peer_key(job_title, department), DEFAULT_PEER_BASELINE)
+
+    def get_policies(self) -> Mapping[str, Mapping[str, Any]]:
+        return self.policies
+
+    def get_activity(self, user_id: str) -> Mapping[str, Any]:
+        return self.activity_logs.get(user_id, DEFAULT_ACTIVITY)
+
+    def get_resource_holders(self, resource_id: str) -> Tuple[str, ...]:
+        return self.resource_holders.get(resource_id, ())
+
+    def __len__(self) -> int:
+        return len(self.users)
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "IdentityStore":
+        """Build a store from the nested dict shape returned by load_mock_data()."""
+        builder = _StoreBuilder()
+        for user_id, profile in data.get("users", {}).items():
+            builder.add_user(user_id, profile)
+        for user_id, resources in data.get("entitlements", {}).items():
+            builder.add_entitlements(user_id, resources)
+        for key, baseline in data.get("peer_baseline", {}).items():
+            builder.peer_baseline[key] = baseline
+        for policy_id, policy in data.get("policies", {}).items():
+            builder.policies[policy_id] = policy
+        for user_id, activity in data.get("activity_logs", {}).items():
+            builder.activity_logs[user_id] = activity
+        return builder.build()
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict[str, Any]]) -> "IdentityStore":
+        """
+        Build a store from a stream of flat records (see load_jsonl_snapshot).
+
+        Args:
+            records: Iterable of dicts with a "type" of user, peer_baseline or policy
+
+        Returns:
+            IdentityStore
+        """
+        builder = _StoreBuilder()
+        for record in records:
+            builder.add_record(record)
+        return builder.build()
+
+
+class _StoreBuilder:
+    """Mutable accumulator used while loading; frozen by build()."""
+
+    def __init__(self):
+        self.users: Dict[str, Dict[str, Any]] = {}
+        self.entitlements: Dict[str, List[str]] = {}
+        self.peer_baseline: Dict[str, Dict[str, Any]] = {}
+        self.policies: Dict[str, Dict[str, Any]] = {}
+        self.activity_logs: Dict[str, Dict[str, Any]] = {}
+
+    def add_user(self, user_id: str, profile: Dict[str, Any]) -> None:
+        self.users[user_id] = profile
+
+    def add_entitlements(self, user_id: str, resources: Iterable[str]) -> None:
+        self.entitlements.setdefault(user_id, []).extend(resources)
+
+    def add_record(self, record: Dict[str, Any]) -> None:
+        record_type = record.get("type", "user")
+        if record_type == "user":
+            record = dict(record)
+            record.pop("type", None)
+            user_id = record["user_id"]
+            resources = record.pop("entitlements", None)
+            activity = record.pop("activity", None)
+            self.add_user(user_id, record)
+            if resources is not None:
+                self.add_entitlements(user_id, resources)
+            if activity is not None:
+                self.activity_logs[user_id] = activity
+        elif record_type == "peer_baseline":
+            key = peer_key(record["job_title"], record["department"])
+            self.peer_baseline[key] = {
+                "typical_access": record.get("typical_access", []),
+                "write_access_rate": record.get("write_access_rate", 0.0)
+            }
+        elif record_type == "policy":
+            policy = dict(record)
+            policy.pop("type", None)
+            self.policies[policy.pop("policy_id")] = policy
+        else:
+            raise ValueError(f"Unknown snapshot record type: {record_type!r}")
+
+    def build(self) -> IdentityStore:
+        holders: Dict[str, List[str]] = {}
+        for user_id, resources in self.entitlements.items():
+            for resource in resources:
+                holders.setdefault(resource, []).append(user_id)
+
+        # Profiles and baselines are small leaf dicts; freezing them keeps the
+        # snapshot immutable without deep-copying on every lookup.
+        return IdentityStore(
+            users=MappingProxyType({k: _freeze(v) for k, v in self.users.items()}),
+            entitlements=MappingProxyType({k: tuple(v) for k, v in self.entitlements.items()}),
+            peer_baseline=MappingProxyType({k: _freeze(v) for k, v in self.peer_baseline.items()}),
+            policies=MappingProxyType({k: _freeze(v) for k, v in self.policies.items()}),
+            activity_logs=MappingProxyType({k: _freeze(v) for k, v in self.activity_logs.items()}),
+            resource_holders=MappingProxyType({k: tuple(v) for k, v in holders.items()})
+        )
+
+
+# ============================================================================
+# SECTION 4: SNAPSHOT LOADERS
+# ============================================================================
+
+def iter_jsonl(path: str) -> Iterator[Dict[str, Any]]:
+    """Stream JSON objects from a JSONL file, skipping blank lines."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}:{line_no}: invalid JSON ({e})") from e
+
+
+def load_json_snapshot(path: str) -> IdentityStore:
+    """
+    Load a single JSON document with the load_mock_data() shape.
+
+    Args:
+        path: Path to a .json file with users/entitlements/peer_baseline/
+              policies/activity_logs sections
+
+    Returns:
+        IdentityStore
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        return IdentityStore.from_dict(json.load(f))
+
+
+def load_jsonl_snapshot(path: str) -> IdentityStore:
+    """
+    Stream a JSONL snapshot, one record per line. Suitable for 1M+ identities
+    since only the built indexes (not the raw file) are held in memory.
+
+    Record shapes:
+        {"type": "user", "user_id": ..., "job_title": ..., "department": ...,
+         "entitlements": [...], "activity": {...}}
+        {"type": "peer_baseline", "job_title": ..., "department": ...,
+         "typical_access": [...], "write_access_rate": 0.1}
+        {"type": "policy", "policy_id": ..., "resource_pattern": ..., ...}
+
+    Records without a "type" are treated as users.
+    """
+    return IdentityStore.from_records(iter_jsonl(path))
+
+
+def load_snapshot(path: str) -> IdentityStore:
+    """Dispatch on file extension (.jsonl / .ndjson vs .json)."""
+    if path.endswith((".jsonl", ".ndjson")):
+        return load_jsonl_snapshot(path)
+    return load_json_snapshot(path)
@@ -0,0 +1,262 @@
+"""
+AccessOps Intelligence - LLM Response Cache
+Content-addressed on-disk cache of model responses, for iterating on prompts
+and the UI without re-spending Gemini quota.
+
+Every model call is keyed by a hash of (agent name, system instruction,
+model, tool names, streaming flag, conversation contents), so editing an agent's instruction
+or a prompt is a miss and everything else is a hit. Responses go to
+append-only JSONL segments; when the store outgrows its size bound the
+oldest whole segment is deleted, so nothing is ever rewritten in place.
+
+Modes:
+    passthrough  no caching (default)
+    record       always call the model and store the response
+    replay       serve hits from disk; misses call the model and are stored
+
+Selection: ACCESSOPS_LLM_CACHE=passthrough|record|replay,
+ACCESSOPS_LLM_CACHE_DIR (default .llm_cache), ACCESSOPS_LLM_CACHE_MAX_MB.
+"""
+
+import glob
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from typing import Dict, Any, AsyncGenerator, List, Optional, Tuple
+
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from pydantic import PrivateAttr
+
+import metrics
+
+CACHE_MODES = ("passthrough", "record", "replay")
+DEFAULT_CACHE_DIR = ".llm_cache"
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+SEGMENTS_PER_STORE = 8
+
+_AGENT_NAME = re.compile(r'internal name is "([^"]+)"')
+_SEGMENT_NAME = "segment-{:06d}.jsonl"
+
+
+# ============================================================================
+# SECTION 1: KEYING
+# ============================================================================
+
+_CALL_ID_OWNERS = ("function_call", "function_response")
+
+
+def _strip_call_ids(value: Any, owner: Optional[str] = None) -> Any:
+    # ADK stamps function calls/responses with a fresh random id per run;
+    # they must not leak into the key or a tool-using agent never hits.
+    # Any other "id" (e.g. in tool arguments or results) is real content.
+    if isinstance(value, dict):
+        return {
+            k: _strip_call_ids(v, k)
+            for k, v in value.items()
+            if not (k == "id" and owner in _CALL_ID_OWNERS)
+        }
+    if isinstance(value, list):
+        return [_strip_call_ids(v) for v in value]
+    return value
+
+
+def request_key(llm_request: LlmRequest, model: str, stream: bool = False) -> Tuple[str, str]:
+    """
+    Content hash of a model call.
+
+    Streamed and unary calls are keyed apart: a streamed call records its
+    partial chunks, which must not be replayed to a unary caller.
+
+    Returns:
+        (key, agent_name)
+    """
+    config = llm_request.config
+    system_instruction = str(config.system_instruction or "") if config else ""
+    match = _AGENT_NAME.search(system_instruction)
+    agent_name = match.group(1) if match else ""
+    contents = [
+        _strip_call_ids(content.model_dump(mode="json", exclude_none=True))
+        for content in llm_request.contents or []
+    ]
+    material = {
+        "agent": agent_name,
+        "instruction": system_instruction,
+        "model": model,
+        "tools": sorted(llm_request.tools_dict or {}),
+        "stream": stream,
+        "contents": contents,
+    }
+    digest = hashlib.blake2b(
+        json.dumps(material, sort_keys=True, separators=(",", ":"), default=str).encode("utf-8"),
+        digest_size=20
+    )
+    return digest.hexdigest(), agent_name
+
+
+# ============================================================================
+# SECTION 2: SEGMENTED STORE
+# ============================================================================
+
+class ResponseStore:
+    """
+    Append-only JSONL segments with an in-memory key -> (segment, offset) index.
+
+    A later record for the same key shadows earlier ones. When the total size
+    exceeds max_bytes the oldest segment is deleted with every entry in it.
+    """
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.segment_bytes = max(max_bytes // SEGMENTS_PER_STORE, 1)
+        self._lock = threading.Lock()
+        self._index: Dict[str, Tuple[int, int, int]] = {}
+        self._sizes: Dict[int, int] = {}
+        self.evicted_segments = 0
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    def _path(self, segment: int) -> str:
+        return os.path.join(self.directory, _SEGMENT_NAME.format(segment))
+
+    def _load(self) -> None:
+        for path in sorted(glob.glob(os.path.join(self.directory, "segment-*.jsonl"))):
+            segment = int(os.path.basename(path)[len("segment-"):-len(".jsonl")])
+            offset = 0
+            with open(path, "rb") as f:
+                for line in f:
+                    if line.endswith(b"\n"):
+                        try:
+                            self._index[json.loads(line)["key"]] = (segment, offset, len(line))
+                        except (ValueError, KeyError):
+                            pass  # Torn or foreign line; skip it
+                    offset += len(line)
+            self._sizes[segment] = offset
+        if not self._sizes:
+            self._sizes[1] = 0
+
+    @property
+    def _active(self) -> int:
+        return max(self._sizes)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        """Stored responses for key, or None."""
+        with self._lock:
+            location = self._index.get(key)
+        if location is None:
+            return None
+        segment, offset, length = location
+        try:
+            with open(self._path(segment), "rb") as f:
+                f.seek(offset)
+                return json.loads(f.read(length))["responses"]
+        except (OSError, ValueError, KeyError):
+            return None  # Segment evicted between lookup and read
+
+    def put(self, key: str, responses: List[Dict[str, Any]]) -> None:
+        line = (json.dumps(
+            {"key": key, "created": time.time(), "responses": responses},
+            separators=(",", ":")
+        ) + "\n").encode("utf-8")
+        with self._lock:
+            segment = self._active
+            if self._sizes[segment] and self._sizes[segment] + len(line) > self.segment_bytes:
+                segment += 1
+                self._sizes[segment] = 0
+            with open(self._path(segment), "ab") as f:
+                f.write(line)
+            self._index[key] = (segment, self._sizes[segment], len(line))
+            self._sizes[segment] += len(line)
+            self._evict()
+
+    def _evict(self) -> None:
+        while sum(self._sizes.values()) > self.max_bytes and len(self._sizes) > 1:
+            oldest = min(self._sizes)
+            del self._sizes[oldest]
+            self._index = {k: loc for k, loc in self._index.items() if loc[0] != oldest}
+            try:
+                os.remove(self._path(oldest))
+            except OSError:
+                pass
+            self.evicted_segments += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._index),
+                "segments": len(self._sizes),
+                "bytes": sum(self._sizes.values()),
+                "max_bytes": self.max_bytes,
+                "evicted_segments": self.evicted_segments,
+            }
+
+
+# ============================================================================
+# SECTION 3: CACHING MODEL
+# ============================================================================
+
+class CachingLlm(BaseLlm):
+    """Wraps another model; records and replays its responses per CACHE_MODES."""
+    inner: BaseLlm
+    mode: str = "replay"
+    cache_dir: str = DEFAULT_CACHE_DIR
+    max_bytes: int = DEFAULT_MAX_BYTES
+
+    _store: Optional[ResponseStore] = PrivateAttr(default=None)
+
+    def model_post_init(self, __context: Any) -> None:
+        if self.mode not in CACHE_MODES:
+            raise ValueError(f"Unknown LLM cache mode {self.mode!r}; expected one of {CACHE_MODES}")
+        self._store = ResponseStore(self.cache_dir, self.max_bytes)
+
+    @property
+    def store(self) -> ResponseStore:
+        return self._store
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        if self.mode == "passthrough":
+            async for response in self.inner.generate_content_async(llm_request, stream=stream):
+                yield response
+            return
+
+        key, agent_name = request_key(llm_request, self.inner.model, stream)
+        if self.mode == "replay":
+            cached = self._store.get(key)
+            if cached is not None:
+                metrics.LLM_CACHE.inc(agent=agent_name, result="hit")
+                for payload in cached:
+                    yield LlmResponse.model_validate(payload)
+                return
+        metrics.LLM_CACHE.inc(agent=agent_name, result="miss")
+
+        recorded = []
+        async for response in self.inner.generate_content_async(llm_request, stream=stream):
+            recorded.append(_strip_call_ids(response.model_dump(mode="json", exclude_none=True)))
+            yield response
+        # Only complete, error-free calls are worth replaying
+        if recorded and not any(r.get("error_code") for r in recorded):
+            self._store.put(key, recorded)
+
+
+def wrap_model_from_env(model: BaseLlm) -> BaseLlm:
+    """Wrap `model` in a CachingLlm unless ACCESSOPS_LLM_CACHE is passthrough/unset."""
+    mode = os.environ.get("ACCESSOPS_LLM_CACHE", "passthrough").lower()
+    if mode == "passthrough":
+        return model
+    return CachingLlm(
+        inner=model,
+        model=model.model,
+        mode=mode,
+        cache_dir=os.environ.get("ACCESSOPS_LLM_CACHE_DIR", DEFAULT_CACHE_DIR),
+        max_bytes=int(float(os.environ.get("ACCESSOPS_LLM_CACHE_MAX_MB", DEFAULT_MAX_BYTES / 2**20)) * 2**20)
+    )
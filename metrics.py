@@ -0,0 +1,358 @@
+"""
+AccessOps Intelligence - Metrics
+Dependency-free counters and histograms for phases, agents and tools, exposed
+in Prometheus text format (/metrics) and as a JSON summary with p50/p99
+(/metrics.json) from a background HTTP thread.
+
+Usage:
+    from metrics import start_metrics_server
+    start_metrics_server(9464)   # or set ACCESSOPS_METRICS_PORT
+"""
+
+import bisect
+import functools
+import json
+import math
+import os
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Deque, Iterable, List, Optional, Sequence, Tuple
+
+# Seconds; spans fast-path triage (~ms) to slow LLM phases (~tens of s)
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+TOKEN_BUCKETS = (64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384, 32768)
+
+# Recent observations kept per series for the JSON percentiles
+RESERVOIR_SIZE = 2048
+
+LabelValues = Tuple[str, ...]
+
+INF_BUCKET_LABEL = 'le="+Inf"'
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+# ============================================================================
+# SECTION 1: METRIC TYPES
+# ============================================================================
+
+class Counter:
+    """Monotonic counter with labels."""
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {_format_number(v)}" for k, v in items]
+
+    def summary(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [{"labels": dict(zip(self.labelnames, k)), "value": v} for k, v in items]
+
+
+class _HistogramSeries:
+    __slots__ = ("buckets", "count", "sum", "recent")
+
+    def __init__(self, bucket_count: int):
+        self.buckets = [0] * bucket_count
+        self.count = 0
+        self.sum = 0.0
+        self.recent: Deque[float] = deque(maxlen=RESERVOIR_SIZE)
+
+
+class Histogram:
+    """Cumulative-bucket histogram with labels and a recent-sample reservoir."""
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.bounds = tuple(sorted(buckets))
+        self._series: Dict[LabelValues, _HistogramSeries] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels.get(n, "")) for n in self.labelnames)
+        index = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _HistogramSeries(len(self.bounds))
+            if index < len(self.bounds):
+                series.buckets[index] += 1
+            series.count += 1
+            series.sum += value
+            series.recent.append(value)
+
+    def render(self) -> List[str]:
+        lines = []
+        with self._lock:
+            items = sorted((k, list(s.buckets), s.count, s.sum) for k, s in self._series.items())
+        for key, buckets, count, total in items:
+            cumulative = 0
+            for bound, bucket in zip(self.bounds, buckets):
+                cumulative += bucket
+                le = f'le="{_format_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, INF_BUCKET_LABEL)} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_number(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+    def summary(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            items = sorted((k, s.count, s.sum, sorted(s.recent)) for k, s in self._series.items())
+        return [
+            {
+                "labels": dict(zip(self.labelnames, key)),
+                "count": count,
+                "mean": round(total / count, 6) if count else 0.0,
+                "p50": round(_percentile(recent, 50), 6),
+                "p95": round(_percentile(recent, 95), 6),
+                "p99": round(_percentile(recent, 99), 6),
+            }
+            for key, count, total, recent in items
+        ]
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(int(math.ceil(pct / 100 * len(sorted_values))) - 1, 0)
+    return sorted_values[rank]
+
+
+# ============================================================================
+# SECTION 2: REGISTRY
+# ============================================================================
+
+class MetricsRegistry:
+    """Named metrics rendered together."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render_prometheus(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> Dict[str, Any]:
+        return {name: metric.summary() for name, metric in self._metrics.items()}
+
+
+REGISTRY = MetricsRegistry()
+
+PHASE_SECONDS = REGISTRY.histogram(
+    "accessops_phase_duration_seconds", "Wall time per pipeline phase", ("phase", "agent")
+)
+FIRST_EVENT_SECONDS = REGISTRY.histogram(
+    "accessops_phase_first_event_seconds", "Time to the first model/tool event of an LLM phase", ("phase", "agent")
+)
+PHASE_TOKENS = REGISTRY.histogram(
+    "accessops_phase_tokens", "Tokens per LLM phase", ("phase", "agent", "kind"), TOKEN_BUCKETS
+)
+TOKENS_TOTAL = REGISTRY.counter(
+    "accessops_tokens_total", "Tokens consumed", ("agent", "kind")
+)
+REPAIR_RETRIES = REGISTRY.counter(
+    "accessops_schema_repair_retries_total", "Repair turns after invalid structured output", ("agent",)
+)
+TOOL_SECONDS = REGISTRY.histogram(
+    "accessops_tool_duration_seconds", "Wall time per investigator tool call", ("tool",)
+)
+TOOL_CALLS = REGISTRY.counter(
+    "accessops_tool_calls_total", "Investigator tool calls", ("tool", "status")
+)
+PIPELINE_SECONDS = REGISTRY.histogram(
+    "accessops_pipeline_duration_seconds", "End-to-end run_pipeline wall time", ("route",)
+)
+DECISIONS = REGISTRY.counter(
+    "accessops_decisions_total", "Authorization decisions", ("decision", "route")
+)
+DECISION_CACHE = REGISTRY.counter(
+    "accessops_decision_cache_total", "Decision cache lookups", ("result",)
+)
+SERVICE_REQUESTS = REGISTRY.counter(
+    "accessops_service_requests_total", "HTTP adjudication requests by outcome", ("endpoint", "status")
+)
+LLM_CACHE = REGISTRY.counter(
+    "accessops_llm_cache_total", "LLM response cache lookups", ("agent", "result")
+)
+AUDIT_RECORDS = REGISTRY.counter(
+    "accessops_audit_records_total", "Decisions appended to the audit store", ("result",)
+)
+AUDIT_COMMIT_SECONDS = REGISTRY.histogram(
+    "accessops_audit_commit_seconds", "Audit store group commit (write + fsync) wall time"
+)
+
+
+def record_tool(tool: str, seconds: float, ok: bool) -> None:
+    TOOL_SECONDS.observe(seconds, tool=tool)
+    TOOL_CALLS.inc(tool=tool, status="ok" if ok else "error")
+
+
+def timed_tool(fn):
+    """Decorator: time a tool function and count its calls by status."""
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        ok = False
+        try:
+            result = fn(*args, **kwargs)
+            ok = True
+            return result
+        finally:
+            record_tool(fn.__name__, time.perf_counter() - start, ok)
+    return wrapper
+
+
+def record_phase(trace: Dict[str, Any]) -> None:
+    """Feed one execution_trace entry into the phase metrics."""
+    phase = trace.get("phase", "unknown")
+    agent = trace.get("agent", "unknown")
+    if "latency_ms" in trace:
+        PHASE_SECONDS.observe(trace["latency_ms"] / 1000, phase=phase, agent=agent)
+    usage = trace.get("usage")
+    if usage:
+        if usage.get("first_event_ms") is not None:
+            FIRST_EVENT_SECONDS.observe(usage["first_event_ms"] / 1000, phase=phase, agent=agent)
+        for kind, key in (("prompt", "prompt_tokens"), ("completion", "output_tokens")):
+            PHASE_TOKENS.observe(usage.get(key, 0), phase=phase, agent=agent, kind=kind)
+            TOKENS_TOTAL.inc(usage.get(key, 0), agent=agent, kind=kind)
+    validation = trace.get("validation")
+    if validation and validation.get("repair_attempts"):
+        REPAIR_RETRIES.inc(validation["repair_attempts"], agent=agent)
+
+
+def record_pipeline(traces: Iterable[Dict[str, Any]], decision: str, seconds: float, cache_hit: bool) -> None:
+    """Feed a finished run_pipeline call into the pipeline metrics."""
+    route = "cache" if cache_hit else "full_review"
+    if not cache_hit:
+        for trace in traces:
+            if trace.get("phase") == "triage":
+                route = trace.get("route", route)
+            record_phase(trace)
+    PIPELINE_SECONDS.observe(seconds, route=route)
+    DECISIONS.inc(decision=decision, route=route)
+
+
+# ============================================================================
+# SECTION 3: HTTP ENDPOINT
+# ============================================================================
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry: MetricsRegistry = REGISTRY
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if path == "/metrics":
+            body = self.registry.render_prometheus().encode("utf-8")
+            content_type = PROMETHEUS_CONTENT_TYPE
+        elif path == "/metrics.json":
+            body = json.dumps(self.registry.summary(), indent=2).encode("utf-8")
+            content_type = "application/json"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Scrapes every few seconds would flood stderr
+        pass
+
+
+_server: Optional[ThreadingHTTPServer] = None
+_server_lock = threading.Lock()
+
+
+def start_metrics_server(port: int, host: str = "0.0.0.0", registry: MetricsRegistry = REGISTRY) -> ThreadingHTTPServer:
+    """
+    Serve /metrics and /metrics.json from a daemon thread.
+
+    Idempotent: a second call returns the already running server.
+    """
+    global _server
+    with _server_lock:
+        if _server is None:
+            handler = type("MetricsHandler", (_MetricsHandler,), {"registry": registry})
+            _server = ThreadingHTTPServer((host, port), handler)
+            thread = threading.Thread(target=_server.serve_forever, name="accessops-metrics", daemon=True)
+            thread.start()
+        return _server
+
+
+def start_metrics_server_from_env() -> Optional[ThreadingHTTPServer]:
+    """Start the endpoint if ACCESSOPS_METRICS_PORT is set (safe to call repeatedly)."""
+    port = os.environ.get("ACCESSOPS_METRICS_PORT")
+    if not port:
+        return None
+    return start_metrics_server(int(port))
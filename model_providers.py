@@ -0,0 +1,98 @@
+"""
+AccessOps Intelligence - Model Providers
+Builds the LLM every agent runs on. "gemini" is the production Vertex AI
+model; "replay" is an offline stand-in (replay_model.ReplayLlm) that answers
+each agent with the payloads recorded in UnitTest/Audit_Log_REQ-TC*.md, with
+injectable latency and failures, so orchestration can be benchmarked
+without network access.
+
+Selection: ACCESSOPS_MODEL_PROVIDER=gemini|replay (default gemini).
+Replay knobs: ACCESSOPS_REPLAY_DIR, ACCESSOPS_REPLAY_LATENCY_MS,
+ACCESSOPS_REPLAY_JITTER_MS, ACCESSOPS_REPLAY_FAILURE_RATE,
+ACCESSOPS_REPLAY_SEED, ACCESSOPS_REPLAY_STREAM_DELAY_MS.
+
+This module stays free of google.adk/genai at import time (they cost most
+of a cold start); each factory imports what it builds.
+"""
+
+import contextvars
+import os
+from typing import TYPE_CHECKING, Dict, Callable, Optional
+
+if TYPE_CHECKING:
+    from google.adk.models.base_llm import BaseLlm
+
+DEFAULT_PROVIDER = "gemini"
+
+# Request being adjudicated by the current task; set by run_pipeline so
+# providers can correlate prompts that do not quote the request_id.
+current_request_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "accessops_request_id", default=None
+)
+
+
+class InjectedModelFailure(RuntimeError):
+    """Raised by ReplayLlm to simulate a provider error (e.g. HTTP 503)."""
+
+
+# ============================================================================
+# SECTION 1: PROVIDER REGISTRY
+# ============================================================================
+
+def _create_gemini() -> "BaseLlm":
+    from google.adk.models.google_llm import Gemini
+    from google.genai import types
+
+    retry_config = types.HttpRetryOptions(
+        attempts=5,
+        exp_base=2,
+        initial_delay=1,
+        http_status_codes=[429, 500, 503, 504]
+    )
+
+    # Use Vertex AI instead of API key
+    return Gemini(
+        model="gemini-2.0-flash-001",
+        vertexai=True,
+        project="accessops-intel",
+        location="us-central1",
+        retry_options=retry_config
+    )
+
+
+def _create_replay() -> "BaseLlm":
+    from replay_model import DEFAULT_REPLAY_DIR, ReplayLlm
+
+    seed = os.environ.get("ACCESSOPS_REPLAY_SEED")
+    return ReplayLlm(
+        replay_dir=os.environ.get("ACCESSOPS_REPLAY_DIR", DEFAULT_REPLAY_DIR),
+        latency_ms=float(os.environ.get("ACCESSOPS_REPLAY_LATENCY_MS", 0)),
+        jitter_ms=float(os.environ.get("ACCESSOPS_REPLAY_JITTER_MS", 0)),
+        failure_rate=float(os.environ.get("ACCESSOPS_REPLAY_FAILURE_RATE", 0)),
+        seed=int(seed) if seed else None,
+        stream_delay_ms=float(os.environ.get("ACCESSOPS_REPLAY_STREAM_DELAY_MS", 0))
+    )
+
+
+MODEL_PROVIDERS: Dict[str, Callable[[], "BaseLlm"]] = {
+    "gemini": _create_gemini,
+    "replay": _create_replay,
+}
+
+
+def create_model(provider: Optional[str] = None) -> "BaseLlm":
+    """
+    Build the model for `provider` (default: ACCESSOPS_MODEL_PROVIDER, then gemini),
+    wrapped in the on-disk response cache when ACCESSOPS_LLM_CACHE is set.
+
+    Raises:
+        ValueError: Unknown provider name
+    """
+    provider = (provider or os.environ.get("ACCESSOPS_MODEL_PROVIDER") or DEFAULT_PROVIDER).lower()
+    try:
+        factory = MODEL_PROVIDERS[provider]
+    except KeyError:
+        raise ValueError(f"Unknown model provider {provider!r}; expected one of {sorted(MODEL_PROVIDERS)}")
+    from llm_cache import wrap_model_from_env
+
+    return wrap_model_from_env(factory())
@@ -0,0 +1,293 @@
+"""
+AccessOps Intelligence - Compiled Policy Engine
+Compiles the policies table (resource_pattern globs, allowed roles, access
+types, identity types) once into literal-anchor hash indexes so each request
+is checked against every policy with a handful of dict probes.
+"""
+
+import fnmatch
+import functools
+import re
+from dataclasses import dataclass
+from typing import Dict, Any, List, Mapping, Optional, Tuple, FrozenSet
+
+WILDCARD_CHARS = "*?["
+
+# Literals shorter than this match too many resource ids to be useful anchors
+MIN_SELECTIVE_LITERAL = 3
+
+NON_HUMAN_IDENTITY_TYPES = frozenset({"ai_agent", "service_account", "bot"})
+
+DEFAULT_FINDING = "{identity_type} '{user_id}' requesting {access_type} access to '{resource_id}'"
+
+
+def infer_identity_type(user_id: str) -> str:
+    """Fallback when the HR profile carries no identity_type."""
+    if "bot" in user_id.lower() or "svc_" in user_id:
+        return "service_account"
+    return "human"
+
+
+# ============================================================================
+# SECTION 1: GLOB ANALYSIS
+# ============================================================================
+
+def _literal_runs(pattern: str) -> List[Tuple[int, int]]:
+    """Return (start, end) spans of wildcard-free text in a glob pattern."""
+    runs = []
+    i = 0
+    start = 0
+    n = len(pattern)
+    while i < n:
+        ch = pattern[i]
+        if ch in WILDCARD_CHARS:
+            if i > start:
+                runs.append((start, i))
+            if ch == "[":
+                close = pattern.find("]", i + 2)
+                i = close if close != -1 else i
+            i += 1
+            start = i
+        else:
+            i += 1
+    if start < n:
+        runs.append((start, n))
+    return runs
+
+
+def _anchor_options(pattern: str) -> List[Tuple[str, str, bool]]:
+    """
+    Literals a pattern could be indexed by.
+
+    Returns:
+        List of (kind, literal, exact) where kind is exact/prefix/suffix/
+        contains/any and exact is True when an index hit alone proves the
+        glob matches.
+    """
+    runs = _literal_runs(pattern)
+    if not runs:
+        return [("any", "", set(pattern) == {"*"})]
+    if runs == [(0, len(pattern))]:
+        return [("exact", pattern, True)]
+
+    options = []
+    first_start, first_end = runs[0]
+    if first_start == 0:
+        literal = pattern[:first_end]
+        options.append(("prefix", literal, pattern == literal + "*"))
+    last_start, last_end = runs[-1]
+    if last_end == len(pattern):
+        literal = pattern[last_start:]
+        options.append(("suffix", literal, pattern == "*" + literal))
+    for start, end in runs:
+        literal = pattern[start:end]
+        options.append(("contains", literal, pattern == "*" + literal + "*"))
+    return options
+
+
+# ============================================================================
+# SECTION 2: COMPILED POLICIES
+# ============================================================================
+
+@dataclass(frozen=True)
+class CompiledPolicy:
+    """A policy with its filters pre-built as frozensets and regexes."""
+    policy_id: str
+    order: int
+    patterns: Tuple[str, ...]
+    access_types: Optional[FrozenSet[str]]
+    identity_types: Optional[FrozenSet[str]]
+    allowed_roles: FrozenSet[str]
+    description: str
+    severity: str
+    nist_control: str
+    finding: str
+
+    def matches(self, resource_id: str) -> bool:
+        return any(_glob_matcher(p)(resource_id) for p in self.patterns)
+
+    def applies_to(self, access_type: str, identity_type: str, job_title: str) -> bool:
+        if self.access_types is not None and access_type not in self.access_types:
+            return False
+        if self.identity_types is not None and identity_type not in self.identity_types:
+            return False
+        return job_title not in self.allowed_roles
+
+
+@functools.lru_cache(maxsize=None)
+def _glob_matcher(pattern: str):
+    # Compiled on first verification only: most policies are proven by
+    # their index anchor and never need a regex.
+    return re.compile(fnmatch.translate(pattern)).match
+
+
+def _as_set(value: Any) -> Optional[FrozenSet[str]]:
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return frozenset({value})
+    return frozenset(value)
+
+
+def compile_policy(policy_id: str, policy: Mapping[str, Any], order: int) -> CompiledPolicy:
+    patterns = policy.get("resource_pattern", "*")
+    if isinstance(patterns, str):
+        patterns = [patterns]
+    return CompiledPolicy(
+        policy_id=policy_id,
+        order=order,
+        patterns=tuple(patterns),
+        access_types=_as_set(policy.get("access_types")),
+        identity_types=_as_set(policy.get("identity_types")),
+        allowed_roles=_as_set(policy.get("allowed_roles")) or frozenset(),
+        description=policy.get("description", ""),
+        severity=policy.get("severity", "MEDIUM"),
+        nist_control=policy.get("nist_control", "AC-6 (Least Privilege)"),
+        finding=policy.get("finding", DEFAULT_FINDING)
+    )
+
+
+# ============================================================================
+# SECTION 3: POLICY ENGINE
+# ============================================================================
+
+class PolicyEngine:
+    """
+    Literal-anchor index over resource patterns.
+
+    Every glob is filed under one of its literals (exact id, prefix, suffix
+    or infix), picked at compile time as the literal shared by the fewest
+    other patterns. Evaluating a resource id probes only the slice lengths
+    that occur in the index, then runs the full glob regex on the few
+    candidates whose anchor alone does not prove a match.
+    """
+
+    def __init__(self, policies: Mapping[str, Mapping[str, Any]]):
+        self.policies: List[CompiledPolicy] = []
+        self._exact: Dict[str, List[Tuple[int, bool]]] = {}
+        self._prefix: Dict[str, List[Tuple[int, bool]]] = {}
+        self._suffix: Dict[str, List[Tuple[int, bool]]] = {}
+        self._contains: Dict[str, List[Tuple[int, bool]]] = {}
+        self._any: List[Tuple[int, bool]] = []
+
+        indexes = {
+            "exact": self._exact,
+            "prefix": self._prefix,
+            "suffix": self._suffix,
+            "contains": self._contains,
+        }
+        pending = []
+        frequency: Dict[Tuple[str, str], int] = {}
+        for order, (policy_id, policy) in enumerate(policies.items()):
+            self.policies.append(compile_policy(policy_id, policy, order))
+            patterns = policy.get("resource_pattern", "*")
+            if isinstance(patterns, str):
+                patterns = [patterns]
+            for pattern in patterns:
+                options = _anchor_options(pattern)
+                for kind, literal, _ in options:
+                    frequency[kind, literal] = frequency.get((kind, literal), 0) + 1
+                pending.append((order, options))
+
+        for order, options in pending:
+            # Skip very short literals (they occur in most resource ids), then
+            # take the one shared by the fewest patterns, then the longest;
+            # exact-proof anchors win ties since they skip the regex.
+            kind, literal, exact = min(
+                options,
+                key=lambda o: (
+                    len(o[1]) < MIN_SELECTIVE_LITERAL,
+                    frequency[o[0], o[1]],
+                    -len(o[1]),
+                    not o[2]
+                )
+            )
+            if kind == "any":
+                self._any.append((order, exact))
+            else:
+                indexes[kind].setdefault(literal, []).append((order, exact))
+
+        self._prefix_lengths = sorted({len(k) for k in self._prefix})
+        self._suffix_lengths = sorted({len(k) for k in self._suffix})
+        self._contains_lengths = sorted({len(k) for k in self._contains})
+
+    def __len__(self) -> int:
+        return len(self.policies)
+
+    def matching_policies(self, resource_id: str) -> List[CompiledPolicy]:
+        """Policies whose resource_pattern matches resource_id, in table order."""
+        hits: Dict[int, bool] = {}
+
+        def collect(entries):
+            # order -> True once any anchor proves the match on its own
+            for order, exact in entries:
+                hits[order] = hits.get(order, False) or exact
+
+        n = len(resource_id)
+        entries = self._exact.get(resource_id)
+        if entries:
+            collect(entries)
+        for length in self._prefix_lengths:
+            if length > n:
+                break
+            entries = self._prefix.get(resource_id[:length])
+            if entries:
+                collect(entries)
+        for length in self._suffix_lengths:
+            if length > n:
+                break
+            entries = self._suffix.get(resource_id[n - length:])
+            if entries:
+                collect(entries)
+        contains = self._contains
+        for length in self._contains_lengths:
+            if length > n:
+                break
+            for i in range(n - length + 1):
+                entries = contains.get(resource_id[i:i + length])
+                if entries:
+                    collect(entries)
+        if self._any:
+            collect(self._any)
+
+        matched = []
+        for order in sorted(hits):
+            policy = self.policies[order]
+            if hits[order] or policy.matches(resource_id):
+                matched.append(policy)
+        return matched
+
+    def evaluate(
+        self,
+        user_id: str,
+        job_title: str,
+        resource_id: str,
+        access_type: str,
+        identity_type: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Check one access request against every policy.
+
+        Returns:
+            List of violation dicts (policy_id, description, severity,
+            nist_control, finding), in policy table order
+        """
+        identity_type = identity_type or infer_identity_type(user_id)
+        violations = []
+        for policy in self.matching_policies(resource_id):
+            if not policy.applies_to(access_type, identity_type, job_title):
+                continue
+            violations.append({
+                "policy_id": policy.policy_id,
+                "description": policy.description,
+                "severity": policy.severity,
+                "nist_control": policy.nist_control,
+                "finding": policy.finding.format(
+                    user_id=user_id,
+                    job_title=job_title,
+                    resource_id=resource_id,
+                    access_type=access_type,
+                    identity_type=identity_type
+                )
+            })
+        return violations
@@ -0,0 +1,238 @@
+"""
+AccessOps Intelligence - Prompt Builder
+Assembles agent prompts from compact, pruned JSON sections.
+
+Each phase only receives the fields its agent's rules read (the gatekeeper
+needs severity and violations, not the HR profile), serialized without
+indentation and without null/empty values. A per-phase token budget is
+enforced by truncating long lists and then dropping the lowest-priority
+sections, and every built prompt reports how many tokens it saved against
+the old pretty-printed full-context prompt.
+"""
+
+import json
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Mapping, Optional, Sequence, Tuple
+
+# Rough token estimate for Gemini-family tokenizers on JSON-heavy text
+CHARS_PER_TOKEN = 4
+
+# Lists longer than this are cut first when a prompt is over budget
+LIST_LIMIT = 10
+
+PHASE_TOKEN_BUDGETS = {
+    "investigation": 600,
+    "scoring": 1200,
+    "critique": 1000,
+    "authorization": 600,
+    "report": 1200,
+}
+
+# Per phase and section: the dotted field paths the agent needs. A section
+# missing from a phase's map is passed whole.
+PHASE_FIELDS: Dict[str, Dict[str, Tuple[str, ...]]] = {
+    "investigation": {
+        "Request": (
+            "request_id", "user_id", "identity_type", "job_title", "department",
+            "requested_resource_id", "access_type", "system_criticality",
+            "data_sensitivity", "justification",
+        ),
+    },
+    "scoring": {
+        "Request": (
+            "access_type", "system_criticality", "data_sensitivity",
+            "mfa_enabled", "time_bound", "duration_hours", "expires_in_hours", "peer_certified",
+        ),
+        "Context": (
+            "user_profile.identity_type", "user_profile.job_title", "peer_baseline",
+            "policy_violations", "activity_summary", "risk_signals",
+        ),
+    },
+    "critique": {
+        "Investigation": (
+            "user_profile.identity_type", "user_profile.job_title", "user_profile.tenure_months",
+            "current_access", "peer_baseline", "policy_violations", "activity_summary", "risk_signals",
+        ),
+    },
+    "authorization": {
+        "Risk": ("net_risk_score", "severity_level", "control_failures"),
+        "Context": ("policy_violations", "risk_signals"),
+    },
+    "report": {
+        "Investigation": (
+            "user_profile.job_title", "user_profile.department", "user_profile.identity_type",
+            "policy_violations", "activity_summary.recent_high_risk_actions", "risk_signals",
+        ),
+        "Decision": ("decision", "reasoning", "required_approvers", "expires_in_hours", "narrative"),
+    },
+}
+
+
+# ============================================================================
+# SECTION 1: SERIALIZATION
+# ============================================================================
+
+def prune(value: Any) -> Any:
+    """Recursively drop None, empty strings, empty lists and empty dicts."""
+    if isinstance(value, Mapping):
+        pruned = {}
+        for key, item in value.items():
+            item = prune(item)
+            if not _is_empty(item):
+                pruned[key] = item
+        return pruned
+    if isinstance(value, (list, tuple)):
+        return [item for item in (prune(v) for v in value) if not _is_empty(item)]
+    return value
+
+
+def _is_empty(value: Any) -> bool:
+    return value is None or (isinstance(value, (str, list, dict)) and not value)
+
+
+def compact_json(value: Any) -> str:
+    """Minimal-whitespace JSON (no pruning; tool payloads keep their shape)."""
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def estimate_tokens(text: str) -> int:
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def project(value: Any, paths: Sequence[str]) -> Dict[str, Any]:
+    """
+    Keep only the dotted field paths of a dict.
+
+    project({"a": {"b": 1, "c": 2}, "d": 3}, ["a.b"]) -> {"a": {"b": 1}}
+    """
+    if not isinstance(value, Mapping):
+        return value
+    projected: Dict[str, Any] = {}
+    for path in paths:
+        head, _, rest = path.partition(".")
+        if head not in value:
+            continue
+        if rest:
+            nested = project(value[head], [rest])
+            if isinstance(nested, dict):
+                projected.setdefault(head, {}).update(nested)
+        else:
+            projected[head] = value[head]
+    return projected
+
+
+def _truncate_lists(value: Any, limit: int) -> Tuple[Any, bool]:
+    if isinstance(value, Mapping):
+        changed = False
+        out = {}
+        for key, item in value.items():
+            out[key], cut = _truncate_lists(item, limit)
+            changed = changed or cut
+        return out, changed
+    if isinstance(value, list):
+        items = []
+        changed = len(value) > limit
+        for item in value[:limit]:
+            item, cut = _truncate_lists(item, limit)
+            items.append(item)
+            changed = changed or cut
+        if len(value) > limit:
+            items.append(f"... {len(value) - limit} more")
+        return items, changed
+    return value, False
+
+
+# ============================================================================
+# SECTION 2: PROMPT ASSEMBLY
+# ============================================================================
+
+@dataclass
+class BuiltPrompt:
+    """A rendered prompt plus its token accounting."""
+    text: str
+    tokens: int
+    baseline_tokens: int
+    budget: Optional[int]
+    truncated: bool = False
+    dropped: List[str] = field(default_factory=list)
+
+    @property
+    def saved_tokens(self) -> int:
+        return max(self.baseline_tokens - self.tokens, 0)
+
+    def stats(self) -> Dict[str, Any]:
+        """Summary for the execution trace."""
+        stats = {
+            "tokens": self.tokens,
+            "baseline_tokens": self.baseline_tokens,
+            "saved_tokens": self.saved_tokens,
+            "budget": self.budget,
+        }
+        if self.truncated:
+            stats["truncated_lists"] = True
+        if self.dropped:
+            stats["dropped_sections"] = self.dropped
+        return stats
+
+
+def _render(instruction: str, sections: List[Tuple[str, str]]) -> str:
+    lines = [instruction.strip(), ""]
+    lines.extend(f"{label}: {body}" for label, body in sections)
+    return "\n".join(lines)
+
+
+def build_prompt(
+    phase: str,
+    instruction: str,
+    sections: Sequence[Tuple[str, Any]],
+    budget: Optional[int] = None
+) -> BuiltPrompt:
+    """
+    Render a phase prompt.
+
+    Args:
+        phase: Pipeline phase name (keys PHASE_FIELDS / PHASE_TOKEN_BUDGETS)
+        instruction: Leading instruction text
+        sections: (label, value) pairs, highest priority first; the first
+            section is never dropped
+        budget: Token budget override (default PHASE_TOKEN_BUDGETS[phase])
+
+    Returns:
+        BuiltPrompt with the text and token accounting
+    """
+    budget = budget if budget is not None else PHASE_TOKEN_BUDGETS.get(phase)
+    fields = PHASE_FIELDS.get(phase, {})
+
+    baseline = _render(
+        instruction,
+        [(label, json.dumps(value, indent=2, default=str)) for label, value in sections]
+    )
+
+    values = []
+    for label, value in sections:
+        if label in fields:
+            value = project(value, fields[label])
+        values.append((label, prune(value)))
+
+    rendered = [(label, compact_json(value)) for label, value in values]
+    text = _render(instruction, rendered)
+    built = BuiltPrompt(text, estimate_tokens(text), estimate_tokens(baseline), budget)
+    if budget is None or built.tokens <= budget:
+        return built
+
+    # Over budget: first cut long lists, then shed sections from the back
+    truncated = []
+    for label, value in values:
+        value, cut = _truncate_lists(value, LIST_LIMIT)
+        built.truncated = built.truncated or cut
+        truncated.append((label, compact_json(value)))
+    rendered = truncated
+    text = _render(instruction, rendered)
+    while estimate_tokens(text) > budget and len(rendered) > 1:
+        label, _ = rendered.pop()
+        built.dropped.append(label)
+        text = _render(instruction, rendered)
+
+    built.text = text
+    built.tokens = estimate_tokens(text)
+    return built
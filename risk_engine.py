@@ -0,0 +1,545 @@
+"""
+AccessOps Intelligence - Deterministic Risk Rules
+Native implementations of the rules the agents' prompts describe, so the
+authoritative outcome never depends on a model call.
+"""
+
+from typing import Dict, Any, List, Optional
+
+SEVERITY_LEVELS = ("LOW", "MEDIUM", "HIGH", "CRITICAL")
+
+# Upper bound (inclusive) of each severity band on the 0-100 net risk scale
+SEVERITY_BANDS = ((30, "LOW"), (60, "MEDIUM"), (85, "HIGH"), (100, "CRITICAL"))
+
+
+def severity_for_score(score: float) -> str:
+    """Map a net risk score to LOW (0-30), MEDIUM (31-60), HIGH (61-85), CRITICAL (86-100)."""
+    for upper, level in SEVERITY_BANDS:
+        if score <= upper:
+            return level
+    return "CRITICAL"
+
+
+def normalize_severity(risk_score: Dict[str, Any]) -> Optional[str]:
+    """
+    Read the severity from a scoring payload.
+
+    Prefers an explicit severity_level (or severity_label), falling back to
+    banding net_risk_score. Returns None when neither is usable.
+    """
+    level = risk_score.get("severity_level") or risk_score.get("severity_label")
+    if isinstance(level, str) and level.strip().upper() in SEVERITY_LEVELS:
+        return level.strip().upper()
+    score = risk_score.get("net_risk_score")
+    if isinstance(score, (int, float)) and not isinstance(score, bool):
+        return severity_for_score(score)
+    return None
+
+
+def extract_policy_violations(investigation: Dict[str, Any]) -> List[Any]:
+    """
+    Policy violations from an investigation, accepting both the list shape
+    and the {"policy_violations": [...]} wrapper the LLM investigator emits.
+    """
+    violations = investigation.get("policy_violations") or []
+    if isinstance(violations, dict):
+        violations = violations.get("policy_violations") or []
+    if not isinstance(violations, list):
+        violations = [violations]
+    return violations
+
+
+def has_policy_violation(investigation: Dict[str, Any]) -> bool:
+    if extract_policy_violations(investigation):
+        return True
+    signals = investigation.get("risk_signals") or {}
+    return isinstance(signals, dict) and bool(signals.get("policy_violation_found"))
+
+
+
+# ============================================================================
+# SECTION 1: GATEKEEPER
+# ============================================================================
+
+def decide_authorization(
+    risk_score: Dict[str, Any],
+    investigation: Dict[str, Any]
+) -> Dict[str, Any]:
+    """
+    Apply the gatekeeper rules:
+
+        CRITICAL                    -> DENY + Require CISO
+        HIGH + policy violation     -> PENDING_HUMAN_REVIEW
+        HIGH + no violations        -> PENDING_MANAGER_REVIEW
+        MEDIUM / LOW                -> AUTO_APPROVE
+        unscored (no usable score)  -> PENDING_HUMAN_REVIEW (fail closed)
+
+    Args:
+        risk_score: Scoring payload (severity_level and/or net_risk_score)
+        investigation: Investigation payload (policy_violations, risk_signals)
+
+    Returns:
+        Dict with decision, reasoning, required_approvers, expires_in_hours
+        and the rule that fired
+    """
+    severity = normalize_severity(risk_score)
+    violation = has_policy_violation(investigation)
+    net = risk_score.get("net_risk_score", "N/A")
+
+    if severity == "CRITICAL":
+        return {
+            "decision": "DENY",
+            "reasoning": f"Net risk {net} is CRITICAL; access is denied and escalated to the CISO.",
+            "required_approvers": ["CISO"],
+            "expires_in_hours": None,
+            "rule": "CRITICAL -> DENY"
+        }
+    if severity == "HIGH" and violation:
+        return {
+            "decision": "PENDING_HUMAN_REVIEW",
+            "reasoning": f"Net risk {net} is HIGH and the request breaches policy; a security reviewer must approve.",
+            "required_approvers": ["Security Review", "Resource Owner"],
+            "expires_in_hours": 24,
+            "rule": "HIGH + Policy Violation -> PENDING_HUMAN_REVIEW"
+        }
+    if severity == "HIGH":
+        return {
+            "decision": "PENDING_MANAGER_REVIEW",
+            "reasoning": f"Net risk {net} is HIGH with no policy violations; the requester's manager must approve.",
+            "required_approvers": ["Manager"],
+            "expires_in_hours": 24,
+            "rule": "HIGH + No violations -> PENDING_MANAGER_REVIEW"
+        }
+    if severity in ("MEDIUM", "LOW"):
+        return {
+            "decision": "AUTO_APPROVE",
+            "reasoning": f"Net risk {net} is {severity}; within the auto-approval envelope.",
+            "required_approvers": None,
+            "expires_in_hours": None,
+            "rule": f"{severity} -> AUTO_APPROVE"
+        }
+    return {
+        "decision": "PENDING_HUMAN_REVIEW",
+        "reasoning": "No usable risk score was produced; failing closed to human review.",
+        "required_approvers": ["Security Review"],
+        "expires_in_hours": 24,
+        "rule": "UNSCORED -> PENDING_HUMAN_REVIEW"
+    }
+
+
+# ============================================================================
+# SECTION 2: NIST 800-53 RISK SCORER
+# ============================================================================
+
+# Inherent risk = access base + system criticality + data sensitivity,
+# then held inside the analyst's reference bands:
+#   Admin to Tier-1 = 90-100, Write to restricted = 70-90,
+#   Read to confidential = 40-60
+ACCESS_BASE = {"read": 40, "execute": 60, "write": 70, "read_write": 70, "admin": 90}
+ACCESS_ALIASES = {
+    "read_only": "read", "view": "read", "list": "read",
+    "rw": "read_write", "readwrite": "read_write", "delete": "write",
+    "owner": "admin", "root": "admin", "superuser": "admin",
+}
+UNKNOWN_ACCESS_BASE = 60
+
+CRITICALITY_ADJUSTMENT = {
+    "tier_1": 10, "prod": 5, "external": 5, "tier_2": 0,
+    "saas_internal": 0, "tier_3": -5, "non_prod": -10,
+}
+SENSITIVITY_ADJUSTMENT = {"restricted": 10, "confidential": 5, "internal": 0, "public": -10}
+
+# (access classes, criticality or sensitivity values, low, high)
+REFERENCE_BANDS = (
+    (("admin",), ("tier_1", "prod"), 90, 100),
+    (("write", "read_write"), ("restricted",), 70, 90),
+    (("read",), ("confidential",), 40, 60),
+)
+
+COMPENSATING_CONTROLS = (
+    ("mfa_enabled", "MFA enabled", 10),
+    ("time_bound", "Time-bound access", 15),
+    ("peer_certified", "Peer-certified", 10),
+)
+
+SIGNAL_CONTROL_FAILURES = (
+    ("privilege_escalation", "AC-6 (Least Privilege)"),
+    ("outside_peer_norms", "AC-2 (Account Management)"),
+    ("ai_agent_scope_mismatch", "AC-3 (Access Enforcement)"),
+)
+
+
+def normalize_access_type(access_type: str) -> str:
+    """'execute (key rotation)' -> 'execute', 'read_only' -> 'read', ..."""
+    token = _key(access_type).split(" ")[0]
+    return ACCESS_ALIASES.get(token, token)
+
+
+def _key(value: Any) -> str:
+    return str(value or "").strip().lower()
+
+
+def _inherent_risk(access: str, criticality: str, sensitivity: str) -> int:
+    score = (
+        ACCESS_BASE.get(access, UNKNOWN_ACCESS_BASE)
+        + CRITICALITY_ADJUSTMENT.get(criticality, 0)
+        + SENSITIVITY_ADJUSTMENT.get(sensitivity, 0)
+    )
+    for access_classes, contexts, low, high in REFERENCE_BANDS:
+        if access in access_classes and (criticality in contexts or sensitivity in contexts):
+            score = min(max(score, low), high)
+    return min(max(score, 0), 100)
+
+
+def _is_time_bound(request_context: Dict[str, Any]) -> bool:
+    return bool(
+        request_context.get("time_bound")
+        or request_context.get("duration_hours")
+        or request_context.get("expires_in_hours")
+    )
+
+
+def _compensating_factors(request_context: Dict[str, Any]) -> List[Dict[str, Any]]:
+    factors = []
+    for key, label, points in COMPENSATING_CONTROLS:
+        present = _is_time_bound(request_context) if key == "time_bound" else bool(request_context.get(key))
+        if present:
+            factors.append({"factor": label, "reduction": points})
+    return factors
+
+
+def _control_failures(investigation: Dict[str, Any]) -> List[str]:
+    failures: List[str] = []
+    for violation in extract_policy_violations(investigation):
+        if isinstance(violation, dict) and violation.get("nist_control"):
+            failures.append(violation["nist_control"])
+    signals = investigation.get("risk_signals") or {}
+    if isinstance(signals, dict):
+        for signal, control in SIGNAL_CONTROL_FAILURES:
+            if signals.get(signal):
+                failures.append(control)
+    activity = investigation.get("activity_summary") or {}
+    if isinstance(activity, dict) and activity.get("recent_high_risk_actions"):
+        failures.append("AU-6 (Audit Record Review, Analysis, and Reporting)")
+    return list(dict.fromkeys(failures))
+
+
+def _confidence(access: str, criticality: str, sensitivity: str) -> str:
+    known = (
+        access in ACCESS_BASE,
+        criticality in CRITICALITY_ADJUSTMENT,
+        sensitivity in SENSITIVITY_ADJUSTMENT,
+    )
+    return "HIGH" if all(known) else "MEDIUM"
+
+
+def score_request(
+    request_context: Dict[str, Any],
+    investigation: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Deterministic equivalent of the severity_analyst.
+
+    Args:
+        request_context: Access request (access_type, system_criticality,
+                         data_sensitivity, optional mfa_enabled /
+                         time_bound / peer_certified)
+        investigation: Investigation payload, used for control failures
+
+    Returns:
+        Dict with inherent_risk_score, compensating_factors,
+        control_failures, net_risk_score, severity_level, confidence
+    """
+    access = normalize_access_type(request_context.get("access_type", ""))
+    criticality = _key(request_context.get("system_criticality"))
+    sensitivity = _key(request_context.get("data_sensitivity"))
+
+    inherent = _inherent_risk(access, criticality, sensitivity)
+    factors = _compensating_factors(request_context)
+    net = max(inherent - sum(f["reduction"] for f in factors), 0)
+
+    return {
+        "inherent_risk_score": inherent,
+        "compensating_factors": factors,
+        "control_failures": _control_failures(investigation or {}),
+        "net_risk_score": net,
+        "severity_level": severity_for_score(net),
+        "confidence": _confidence(access, criticality, sensitivity)
+    }
+
+
+def score_requests_batch(
+    requests: List[Dict[str, Any]],
+    investigations: Optional[List[Optional[Dict[str, Any]]]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Score many requests at once; identical output to score_request().
+
+    Each request field is read into a column in one pass and every distinct
+    raw value is normalized once. Inherent risk is a single gather from a
+    precomputed table; reductions, net scores and severity bands are NumPy
+    array operations. Compensating factors and control failures are built
+    from per-batch templates rather than re-derived per request. Falls back
+    to a per-request loop when NumPy is not installed.
+    """
+    if investigations is None:
+        investigations = [None] * len(requests)
+    if len(investigations) != len(requests):
+        raise ValueError("requests and investigations must be the same length")
+    try:
+        import numpy as np
+    except ImportError:
+        return [score_request(r, i) for r, i in zip(requests, investigations)]
+
+    n = len(requests)
+    if n == 0:
+        return []
+
+    table, access_codes, criticality_codes, sensitivity_codes = _inherent_table()
+
+    def column(field: str, encode) -> "np.ndarray":
+        return np.fromiter(_encoded((r.get(field) for r in requests), encode), dtype=np.intp, count=n)
+
+    # Code 0 is "unknown" on every axis
+    access_idx = column("access_type", lambda v: access_codes.get(normalize_access_type(v), 0))
+    criticality_idx = column("system_criticality", lambda v: criticality_codes.get(_key(v), 0))
+    sensitivity_idx = column("data_sensitivity", lambda v: sensitivity_codes.get(_key(v), 0))
+
+    # Bit i of a request's control mask is set when COMPENSATING_CONTROLS[i] applies
+    control_masks = np.fromiter(
+        (
+            bool(r.get("mfa_enabled")) | _is_time_bound(r) << 1 | bool(r.get("peer_certified")) << 2
+            for r in requests
+        ),
+        dtype=np.intp, count=n
+    )
+    templates = [
+        [(label, points) for bit, (_, label, points) in enumerate(COMPENSATING_CONTROLS) if mask >> bit & 1]
+        for mask in range(1 << len(COMPENSATING_CONTROLS))
+    ]
+    reductions = np.array([sum(points for _, points in template) for template in templates])[control_masks]
+
+    inherent = table[access_idx, criticality_idx, sensitivity_idx]
+    net = np.maximum(inherent - reductions, 0)
+    uppers = np.array([upper for upper, _ in SEVERITY_BANDS[:-1]])
+    severity_idx = np.searchsorted(uppers, net, side="left")
+    known = (
+        (access_idx > 0)
+        & (criticality_idx > 0) & (criticality_idx <= len(CRITICALITY_ADJUSTMENT))
+        & (sensitivity_idx > 0) & (sensitivity_idx <= len(SENSITIVITY_ADJUSTMENT))
+    )
+
+    # Batches usually share one investigation object (or None) across many requests
+    failures_memo: Dict[int, List[str]] = {}
+
+    def control_failures(investigation: Optional[Dict[str, Any]]) -> List[str]:
+        cached = failures_memo.get(id(investigation))
+        if cached is None:
+            cached = failures_memo[id(investigation)] = _control_failures(investigation or {})
+        return list(cached)
+
+    levels = [level for _, level in SEVERITY_BANDS]
+    return [
+        {
+            "inherent_risk_score": inh,
+            "compensating_factors": [{"factor": label, "reduction": points} for label, points in templates[mask]],
+            "control_failures": control_failures(inv),
+            "net_risk_score": nt,
+            "severity_level": levels[sev],
+            "confidence": "HIGH" if kn else "MEDIUM"
+        }
+        for inh, mask, inv, nt, sev, kn in zip(
+            inherent.tolist(), control_masks.tolist(), investigations,
+            net.tolist(), severity_idx.tolist(), known.tolist()
+        )
+    ]
+
+
+def _encoded(values, encode):
+    """encode() each value, computing it once per distinct string."""
+    memo: Dict[str, int] = {}
+    for value in values:
+        if type(value) is str:
+            code = memo.get(value)
+            if code is None:
+                code = memo[value] = encode(value)
+            yield code
+        else:
+            yield encode(value)
+
+
+
+_INHERENT_TABLE = None
+
+
+def _inherent_table():
+    """
+    Precompute inherent risk for every (access, criticality, sensitivity)
+    combination as a 3-D array so a batch is scored with one gather.
+    Index 0 on each axis is the unknown value; the known values follow,
+    then any reference-band context the axis does not know (a band matches
+    on either axis, so "prod" as a sensitivity still counts).
+    """
+    global _INHERENT_TABLE
+    if _INHERENT_TABLE is None:
+        import numpy as np
+        contexts = [c for _, band_contexts, _, _ in REFERENCE_BANDS for c in band_contexts]
+        accesses = [""] + list(ACCESS_BASE)
+        criticalities = list(dict.fromkeys([""] + list(CRITICALITY_ADJUSTMENT) + contexts))
+        sensitivities = list(dict.fromkeys([""] + list(SENSITIVITY_ADJUSTMENT) + contexts))
+        table = np.empty((len(accesses), len(criticalities), len(sensitivities)), dtype=np.int16)
+        for a, access in enumerate(accesses):
+            for c, criticality in enumerate(criticalities):
+                for s, sensitivity in enumerate(sensitivities):
+                    table[a, c, s] = _inherent_risk(access, criticality, sensitivity)
+        _INHERENT_TABLE = (
+            table,
+            {v: i for i, v in enumerate(accesses) if v},
+            {v: i for i, v in enumerate(criticalities) if v},
+            {v: i for i, v in enumerate(sensitivities) if v},
+        )
+    return _INHERENT_TABLE
+
+
+# ============================================================================
+# SECTION 3: FAST-PATH TRIAGE
+# ============================================================================
+
+# Clear-cut approvals: plain reads of low-stakes systems and data
+FAST_APPROVE_CRITICALITY = {"non_prod"}
+FAST_APPROVE_SENSITIVITY = {"public", "internal"}
+
+
+def triage_request(
+    request_context: Dict[str, Any],
+    investigation: Dict[str, Any],
+    risk_score: Dict[str, Any]
+) -> Dict[str, str]:
+    """
+    Route a request before any LLM work.
+
+    auto_deny:    a CRITICAL-severity policy violation was found
+    auto_approve: read access to a non_prod system with internal/public
+                  data, no policy violations, no raised risk signals and
+                  a LOW/MEDIUM native score
+    full_review:  everything else
+
+    Returns:
+        Dict with route and a human-readable reason
+    """
+    critical = [
+        v for v in extract_policy_violations(investigation)
+        if isinstance(v, dict) and str(v.get("severity", "")).upper() == "CRITICAL"
+    ]
+    if critical:
+        ids = ", ".join(str(v.get("policy_id", "UNKNOWN")) for v in critical)
+        return {"route": "auto_deny", "reason": f"CRITICAL policy violation ({ids})"}
+
+    access = normalize_access_type(request_context.get("access_type", ""))
+    criticality = _key(request_context.get("system_criticality"))
+    sensitivity = _key(request_context.get("data_sensitivity"))
+    signals = investigation.get("risk_signals") or {}
+    raised = [k for k, v in signals.items() if v] if isinstance(signals, dict) else ["unparsed"]
+
+    if (
+        access == "read"
+        and criticality in FAST_APPROVE_CRITICALITY
+        and sensitivity in FAST_APPROVE_SENSITIVITY
+        and not has_policy_violation(investigation)
+        and not raised
+        and normalize_severity(risk_score) in ("LOW", "MEDIUM")
+    ):
+        return {
+            "route": "auto_approve",
+            "reason": f"Read access to {criticality} {sensitivity} data with no violations or risk signals"
+        }
+
+    return {"route": "full_review", "reason": "Outside fast-path envelope; running full agent review"}
+
+
+def fast_path_decision(triage: Dict[str, str], risk_score: Dict[str, Any]) -> Dict[str, Any]:
+    """Gatekeeper-shaped decision for a request settled by triage."""
+    if triage["route"] == "auto_deny":
+        return {
+            "decision": "DENY",
+            "reasoning": f"Fast-path deny: {triage['reason']}; escalated to the CISO.",
+            "required_approvers": ["CISO"],
+            "expires_in_hours": None,
+            "rule": "FAST_PATH: CRITICAL Policy Violation -> DENY"
+        }
+    return {
+        "decision": "AUTO_APPROVE",
+        "reasoning": f"Fast-path approve: {triage['reason']} (net risk {risk_score.get('net_risk_score')}).",
+        "required_approvers": None,
+        "expires_in_hours": None,
+        "rule": "FAST_PATH: Low-risk read -> AUTO_APPROVE"
+    }
+
+
+# ============================================================================
+# SECTION 4: DETERMINISTIC BOARD REPORT
+# ============================================================================
+
+STATUS_EMOJI = {"LOW": "🟢", "MEDIUM": "🟡", "HIGH": "🔴", "CRITICAL": "🔴"}
+
+
+def render_board_report(
+    request_context: Dict[str, Any],
+    investigation: Dict[str, Any],
+    risk_score: Dict[str, Any],
+    decision: Dict[str, Any]
+) -> str:
+    """Board report in the narrator's markdown structure, built without an LLM."""
+    severity = normalize_severity(risk_score) or "UNKNOWN"
+    decision_type = decision.get("decision", "PENDING_HUMAN_REVIEW")
+    approved = decision_type == "AUTO_APPROVE"
+
+    factors = risk_score.get("compensating_factors") or []
+    factor_text = ", ".join(
+        f.get("factor", str(f)) if isinstance(f, dict) else str(f) for f in factors
+    ) or "No compensating controls"
+    failures = risk_score.get("control_failures") or []
+    failure_text = ", ".join(str(f) for f in failures) or "None identified"
+    violations = extract_policy_violations(investigation)
+
+    who = request_context.get("user_id", "unknown identity")
+    what = request_context.get("requested_resource_name") or request_context.get("requested_resource_id", "resource")
+    access = request_context.get("access_type", "access")
+
+    if approved:
+        summary = (
+            f"{who} requested {access} access to {what}; the request sits within the "
+            f"{severity} risk envelope and was approved without escalation."
+        )
+        action = "No further action required. Access is logged for periodic certification review."
+    else:
+        summary = (
+            f"{who} requested {access} access to {what}; the request was assessed {severity} "
+            f"and routed to {decision_type}."
+        )
+        approvers = decision.get("required_approvers") or ["Security Review"]
+        steps = [f"1. Hold provisioning until {', '.join(approvers)} sign off."]
+        if violations:
+            steps.append("2. Remediate the policy conflicts: " + "; ".join(
+                str(v.get("policy_id", v)) if isinstance(v, dict) else str(v) for v in violations
+            ) + ".")
+        steps.append(f"{len(steps) + 1}. Re-submit with compensating controls (MFA, time-bound access) if still required.")
+        action = "\n".join(steps)
+
+    return "\n".join([
+        "### 🛡️ Executive Audit Summary",
+        summary,
+        "",
+        "### 🚦 Risk Factor Analysis (NIST/COBIT)",
+        "| Status | Risk Component | Audit Note |",
+        "| :---: | :--- | :--- |",
+        f"| {STATUS_EMOJI.get(severity_for_score(risk_score.get('inherent_risk_score') or 0), '🟡')} "
+        f"| **Inherent Risk** | Score: {risk_score.get('inherent_risk_score', 'N/A')} |",
+        f"| {'🟢' if factors else '🟡'} | **Control Effectiveness** | {factor_text} |",
+        f"| {'🔴' if failures else '🟢'} | **Compliance Gaps** | {failure_text} |",
+        f"| {'✅' if approved else '🛑'} | **Net Risk Score** | **{severity}** ({risk_score.get('net_risk_score', 'N/A')}) |",
+        "",
+        "### 📋 Recommended Management Action",
+        action,
+        ""
+    ])
@@ -0,0 +1,111 @@
+"""
+AccessOps Intelligence - Agent Output Schemas
+Typed outputs for every JSON-producing agent. They are handed to LlmAgent as
+output_schema (so Gemini runs in response-schema mode) and used to validate
+the reply with pydantic's compiled validator before it goes downstream.
+
+The narrator writes free-form Markdown and has no schema.
+"""
+
+from typing import Dict, List, Literal, Optional, Type
+
+from pydantic import BaseModel, ConfigDict, Field, ValidationError
+
+Severity = Literal["LOW", "MEDIUM", "HIGH", "CRITICAL"]
+
+
+class _Output(BaseModel):
+    # Extra keys from the model are tolerated and dropped, not fatal
+    model_config = ConfigDict(extra="ignore")
+
+
+# ============================================================================
+# SECTION 1: INVESTIGATOR
+# ============================================================================
+
+class UserProfile(_Output):
+    job_title: str = "Unknown"
+    department: str = "Unknown"
+    tenure_months: Optional[int] = None
+    identity_type: Optional[str] = None
+
+
+class PeerBaseline(_Output):
+    typical_access: List[str] = Field(default_factory=list)
+    write_access_rate: float = 0.0
+
+
+class PolicyViolation(_Output):
+    policy_id: str
+    description: str = ""
+    severity: Severity = "MEDIUM"
+    nist_control: str = ""
+    finding: str = ""
+
+
+class ActivitySummary(_Output):
+    lookback_days: int = 30
+    recent_high_risk_actions: List[str] = Field(default_factory=list)
+
+
+class RiskSignals(_Output):
+    privilege_escalation: bool = False
+    outside_peer_norms: bool = False
+    policy_violation_found: bool = False
+    ai_agent_scope_mismatch: bool = False
+
+
+class InvestigationOutput(_Output):
+    user_profile: UserProfile
+    current_access: List[str] = Field(default_factory=list)
+    peer_baseline: PeerBaseline = Field(default_factory=PeerBaseline)
+    policy_violations: List[PolicyViolation] = Field(default_factory=list)
+    activity_summary: ActivitySummary = Field(default_factory=ActivitySummary)
+    risk_signals: RiskSignals = Field(default_factory=RiskSignals)
+
+
+# ============================================================================
+# SECTION 2: ANALYST / CRITIC / GATEKEEPER
+# ============================================================================
+
+class CompensatingFactor(_Output):
+    factor: str
+    reduction: int
+
+
+class RiskScoreOutput(_Output):
+    inherent_risk_score: int = Field(ge=0, le=100)
+    compensating_factors: List[CompensatingFactor] = Field(default_factory=list)
+    control_failures: List[str] = Field(default_factory=list)
+    net_risk_score: int = Field(ge=0, le=100)
+    severity_level: Severity
+    confidence: str = "MEDIUM"
+
+
+class CritiqueOutput(_Output):
+    critique_valid: bool
+    critique_reasoning: str = ""
+    suggested_adjustment: str = ""
+
+
+class GatekeeperExplanation(_Output):
+    reasoning: str
+
+
+AGENT_OUTPUT_SCHEMAS: Dict[str, Type[BaseModel]] = {
+    "investigator": InvestigationOutput,
+    "analyst": RiskScoreOutput,
+    "critic": CritiqueOutput,
+    "gatekeeper": GatekeeperExplanation,
+}
+
+
+def describe_errors(error: ValidationError, limit: int = 5) -> str:
+    """Short, model-readable summary of what failed validation."""
+    lines = []
+    for item in error.errors()[:limit]:
+        location = ".".join(str(part) for part in item["loc"]) or "<root>"
+        lines.append(f"- {location}: {item['msg']}")
+    if error.error_count() > limit:
+        lines.append(f"- ... {error.error_count() - limit} more")
+    return "\n".join(lines)
@@ -0,0 +1,378 @@
+"""
+AccessOps Intelligence - HTTP Service
+Machine-to-machine API over run_pipeline for provisioning systems.
+
+    POST /v1/adjudicate         {"request": {...}, "config": {...}, "deadline_ms": 30000}
+    POST /v1/adjudicate:batch   {"requests": [{...}, ...], "config": {...}, "deadline_ms": 60000}
+    GET  /healthz, /readyz, /metrics
+
+Admission control: at most ACCESSOPS_MAX_IN_FLIGHT pipelines run at once
+and ACCESSOPS_MAX_QUEUE more may wait for a slot; anything beyond that is
+rejected immediately with 429 and a Retry-After header instead of piling up
+latency. Every request has a deadline (queue wait included) and gets 504
+when it expires. On SIGTERM (or Ctrl-C) `python service.py` keeps listening
+but answers 503 (and /readyz 503) while in-flight pipelines finish for up
+to ACCESSOPS_DRAIN_SECONDS, then closes the listener and exits; a second
+signal skips the drain. Under a bare `uvicorn service:app` the listener
+closes at once and the drain happens behind it.
+
+Usage:
+    python service.py                      # listens on $PORT (default 8080)
+    uvicorn service:app --port 8080
+"""
+
+import asyncio
+import contextlib
+import os
+import time
+from typing import Dict, Any, Awaitable, Callable, List, Optional
+
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import JSONResponse, PlainTextResponse
+from pydantic import BaseModel, ConfigDict, Field
+
+import metrics
+from batch_runner import result_record
+
+DEFAULT_PORT = 8080
+DEFAULT_MAX_IN_FLIGHT = 16
+DEFAULT_MAX_QUEUE = 64
+DEFAULT_DEADLINE_MS = 120_000
+DEFAULT_DRAIN_SECONDS = 30.0
+DEFAULT_MAX_BATCH = 100
+RETRY_AFTER_SECONDS = 1
+
+
+def _env_number(name: str, default: float) -> float:
+    value = os.environ.get(name)
+    return type(default)(value) if value else default
+
+
+# ============================================================================
+# SECTION 1: ADMISSION CONTROL
+# ============================================================================
+
+class AdmissionController:
+    """
+    Bounded in-flight window plus a bounded wait queue.
+
+    admit() is a non-blocking capacity check at the door; slot() is the
+    concurrency gate admitted work waits on.
+    """
+
+    def __init__(self, max_in_flight: int = DEFAULT_MAX_IN_FLIGHT, max_queue: int = DEFAULT_MAX_QUEUE):
+        if max_in_flight < 1 or max_queue < 0:
+            raise ValueError("max_in_flight must be >= 1 and max_queue >= 0")
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.admitted = 0
+        self.running = 0
+        self.draining = False
+        self._slots = asyncio.Semaphore(max_in_flight)
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    @property
+    def capacity(self) -> int:
+        return self.max_in_flight + self.max_queue
+
+    def admit(self, count: int = 1) -> bool:
+        """Reserve capacity for `count` pipelines; False when full or draining."""
+        if self.draining or self.admitted + count > self.capacity:
+            return False
+        self.admitted += count
+        self._idle.clear()
+        return True
+
+    def release(self, count: int = 1) -> None:
+        self.admitted -= count
+        if self.admitted <= 0:
+            self.admitted = 0
+            self._idle.set()
+
+    @contextlib.asynccontextmanager
+    async def slot(self):
+        async with self._slots:
+            self.running += 1
+            try:
+                yield
+            finally:
+                self.running -= 1
+
+    async def drain(self, timeout: float) -> bool:
+        """Stop admitting and wait for admitted work; False if it timed out."""
+        self.draining = True
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "queued": self.admitted - self.running,
+            "max_in_flight": self.max_in_flight,
+            "max_queue": self.max_queue,
+            "draining": self.draining,
+        }
+
+
+# ============================================================================
+# SECTION 2: API MODELS
+# ============================================================================
+
+class AccessRequest(BaseModel):
+    """
+    One access request as run_pipeline reads it. The four identifying
+    fields are required; any further context keys are passed through.
+    """
+    model_config = ConfigDict(extra="allow")
+
+    request_id: str = Field(min_length=1)
+    user_id: str = Field(min_length=1)
+    requested_resource_id: str = Field(min_length=1)
+    access_type: str = Field(min_length=1)
+    identity_type: Optional[str] = None
+    job_title: Optional[str] = None
+    department: Optional[str] = None
+    requested_resource_name: Optional[str] = None
+    system_criticality: Optional[str] = None
+    data_sensitivity: Optional[str] = None
+    justification: Optional[str] = None
+
+    def context(self) -> Dict[str, Any]:
+        return self.model_dump(exclude_none=True)
+
+
+class AdjudicateRequest(BaseModel):
+    request: AccessRequest
+    config: Dict[str, Any] = Field(default_factory=dict)
+    deadline_ms: Optional[int] = Field(default=None, gt=0)
+
+
+class BatchAdjudicateRequest(BaseModel):
+    requests: List[AccessRequest] = Field(min_length=1)
+    config: Dict[str, Any] = Field(default_factory=dict)
+    deadline_ms: Optional[int] = Field(default=None, gt=0)
+
+
+def _pipeline_config(overrides: Dict[str, Any]):
+    from accessops_engine import PipelineConfig
+
+    # Whether decisions are audited is the operator's call, not the caller's
+    if "audit_mode" in overrides:
+        raise HTTPException(status_code=422, detail="Invalid config: audit_mode is set by the server")
+    try:
+        return PipelineConfig(**overrides)
+    except (TypeError, ValueError) as e:
+        raise HTTPException(status_code=422, detail=f"Invalid config: {e}")
+
+
+def _overloaded(reason: str) -> HTTPException:
+    return HTTPException(
+        status_code=503 if reason == "draining" else 429,
+        detail="Server is shutting down" if reason == "draining" else "Too many requests in flight",
+        headers={"Retry-After": str(RETRY_AFTER_SECONDS)}
+    )
+
+
+# ============================================================================
+# SECTION 3: APPLICATION
+# ============================================================================
+
+def create_app(
+    pipeline: Optional[Callable[..., Awaitable[Any]]] = None,
+    max_in_flight: Optional[int] = None,
+    max_queue: Optional[int] = None,
+    default_deadline_ms: Optional[int] = None,
+    drain_seconds: Optional[float] = None,
+    max_batch: Optional[int] = None,
+    warm_engine: Optional[bool] = None
+) -> FastAPI:
+    """
+    Build the service. Unset limits come from ACCESSOPS_* environment variables.
+
+    Args:
+        pipeline: Coroutine function (request_context, config) -> PipelineResult;
+            defaults to accessops_engine.run_pipeline
+        max_in_flight: Pipelines running concurrently
+        max_queue: Admitted requests allowed to wait for a slot
+        default_deadline_ms: Deadline when the request does not set one
+        drain_seconds: Shutdown grace period for in-flight pipelines
+        max_batch: Largest accepted batch
+        warm_engine: Build the agents at startup instead of on the first
+            full review (ACCESSOPS_WARM_ENGINE=1); off by default so
+            triage-only traffic never imports ADK
+    """
+    max_in_flight = max_in_flight or _env_number("ACCESSOPS_MAX_IN_FLIGHT", DEFAULT_MAX_IN_FLIGHT)
+    max_queue = max_queue if max_queue is not None else _env_number("ACCESSOPS_MAX_QUEUE", DEFAULT_MAX_QUEUE)
+    default_deadline_ms = default_deadline_ms or _env_number("ACCESSOPS_DEADLINE_MS", DEFAULT_DEADLINE_MS)
+    drain_seconds = drain_seconds if drain_seconds is not None else _env_number(
+        "ACCESSOPS_DRAIN_SECONDS", DEFAULT_DRAIN_SECONDS
+    )
+    max_batch = max_batch or _env_number("ACCESSOPS_MAX_BATCH", DEFAULT_MAX_BATCH)
+    if warm_engine is None:
+        warm_engine = bool(_env_number("ACCESSOPS_WARM_ENGINE", 0))
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app: FastAPI):
+        nonlocal pipeline
+        if pipeline is None:
+            from accessops_engine import get_engine, run_pipeline
+
+            if warm_engine:
+                await asyncio.to_thread(get_engine)
+            pipeline = run_pipeline
+        app.state.admission = AdmissionController(max_in_flight, max_queue)
+        yield
+        drained = await app.state.admission.drain(drain_seconds)
+        if not drained:
+            print(f"⚠️ Shutdown: {app.state.admission.admitted} request(s) still in flight after {drain_seconds}s")
+
+    app = FastAPI(title="AccessOps Intelligence", lifespan=lifespan)
+
+    async def adjudicate_one(
+        admission: AdmissionController,
+        request_context: Dict[str, Any],
+        config: Any,
+        deadline: float
+    ) -> Dict[str, Any]:
+        # Runs on an already-admitted reservation; the deadline covers queue wait
+        async def run() -> Dict[str, Any]:
+            async with admission.slot():
+                start = time.perf_counter()
+                result = await pipeline(request_context, config)
+                return result_record(result, (time.perf_counter() - start) * 1000)
+
+        return await asyncio.wait_for(run(), timeout=max(deadline - time.monotonic(), 0))
+
+    @app.post("/v1/adjudicate")
+    async def adjudicate(body: AdjudicateRequest):
+        admission: AdmissionController = app.state.admission
+        config = _pipeline_config(body.config)
+        if not admission.admit():
+            metrics.SERVICE_REQUESTS.inc(endpoint="adjudicate", status="rejected")
+            raise _overloaded("draining" if admission.draining else "full")
+        deadline = time.monotonic() + (body.deadline_ms or default_deadline_ms) / 1000
+        try:
+            record = await adjudicate_one(admission, body.request.context(), config, deadline)
+        except asyncio.TimeoutError:
+            metrics.SERVICE_REQUESTS.inc(endpoint="adjudicate", status="timeout")
+            raise HTTPException(status_code=504, detail="Deadline exceeded")
+        except Exception as e:
+            metrics.SERVICE_REQUESTS.inc(endpoint="adjudicate", status="error")
+            raise HTTPException(status_code=500, detail=f"{type(e).__name__}: {e}")
+        finally:
+            admission.release()
+        metrics.SERVICE_REQUESTS.inc(endpoint="adjudicate", status="ok")
+        return record
+
+    @app.post("/v1/adjudicate:batch")
+    async def adjudicate_batch(body: BatchAdjudicateRequest):
+        admission: AdmissionController = app.state.admission
+        if len(body.requests) > max_batch:
+            raise HTTPException(status_code=413, detail=f"Batch larger than {max_batch} requests")
+        config = _pipeline_config(body.config)
+        # All-or-nothing admission: a half-admitted batch would hold slots
+        # while the caller retries the whole thing anyway
+        if not admission.admit(len(body.requests)):
+            metrics.SERVICE_REQUESTS.inc(endpoint="adjudicate_batch", status="rejected")
+            raise _overloaded("draining" if admission.draining else "full")
+        deadline = time.monotonic() + (body.deadline_ms or default_deadline_ms) / 1000
+
+        async def item(request: AccessRequest) -> Dict[str, Any]:
+            request_context = request.context()
+            try:
+                record = await adjudicate_one(admission, request_context, config, deadline)
+                return {"status": "ok", **record}
+            except asyncio.TimeoutError:
+                return {"status": "timeout", "request_id": request.request_id}
+            except Exception as e:
+                return {
+                    "status": "error",
+                    "request_id": request.request_id,
+                    "error": f"{type(e).__name__}: {e}"
+                }
+            finally:
+                admission.release()
+
+        results = await asyncio.gather(*(item(r) for r in body.requests))
+        statuses = [r["status"] for r in results]
+        metrics.SERVICE_REQUESTS.inc(endpoint="adjudicate_batch", status="ok" if set(statuses) == {"ok"} else "partial")
+        return {
+            "results": results,
+            "succeeded": statuses.count("ok"),
+            "failed": len(statuses) - statuses.count("ok"),
+        }
+
+    @app.get("/healthz")
+    async def healthz():
+        return {"status": "ok"}
+
+    @app.get("/readyz")
+    async def readyz():
+        admission: AdmissionController = app.state.admission
+        status = 503 if admission.draining else 200
+        return JSONResponse(admission.stats(), status_code=status)
+
+    @app.get("/metrics")
+    async def prometheus_metrics():
+        return PlainTextResponse(metrics.REGISTRY.render_prometheus(), media_type=metrics.PROMETHEUS_CONTENT_TYPE)
+
+    return app
+
+
+app = create_app()
+
+
+# ============================================================================
+# SECTION 4: ENTRY POINT
+# ============================================================================
+
+def serve(service: FastAPI, host: str, port: int, drain_seconds: float) -> None:
+    """
+    Run `service` under uvicorn, draining before the listener closes.
+
+    uvicorn closes its sockets as soon as a shutdown signal arrives, so a
+    drain that starts in the lifespan shutdown can never answer anyone. Here
+    the first SIGTERM/SIGINT only flips admission to draining: new requests
+    and /readyz get 503 while admitted pipelines finish (up to
+    drain_seconds), and only then does uvicorn's own shutdown begin. A
+    second signal goes straight to uvicorn.
+    """
+    import uvicorn
+
+    class DrainingServer(uvicorn.Server):
+        async def serve(self, sockets=None) -> None:
+            self._drain_loop = asyncio.get_running_loop()
+            await super().serve(sockets)
+
+        def handle_exit(self, sig, frame) -> None:
+            admission: Optional[AdmissionController] = getattr(service.state, "admission", None)
+            if admission is None or admission.draining or self.should_exit:
+                super().handle_exit(sig, frame)
+                return
+            admission.draining = True
+            self._drain_loop.call_soon_threadsafe(asyncio.ensure_future, self._drain_then_exit(admission, sig))
+
+        async def _drain_then_exit(self, admission: AdmissionController, sig) -> None:
+            if not await admission.drain(drain_seconds):
+                print(f"⚠️ Shutdown: {admission.admitted} request(s) still in flight after {drain_seconds}s")
+            super().handle_exit(sig, None)
+
+    config = uvicorn.Config(service, host=host, port=port, timeout_graceful_shutdown=int(drain_seconds))
+    DrainingServer(config).run()
+
+
+def main() -> None:
+    serve(
+        app,
+        host=os.environ.get("HOST", "0.0.0.0"),
+        port=int(os.environ.get("PORT", DEFAULT_PORT)),
+        drain_seconds=_env_number("ACCESSOPS_DRAIN_SECONDS", DEFAULT_DRAIN_SECONDS)
+    )
+
+
+if __name__ == "__main__":
+    main()
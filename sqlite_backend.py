@@ -0,0 +1,371 @@
+"""
+AccessOps Intelligence - SQLite Identity Backend
+Indexed SQLite storage for users, entitlements, peer baselines, policies and
+activity summaries, with a per-thread connection pool and a batched bulk
+importer for CSV/JSONL extracts.
+
+Usage:
+    python sqlite_backend.py import identities.db snapshot.jsonl
+    python sqlite_backend.py import identities.db entitlements.csv --kind entitlements
+"""
+
+import argparse
+import csv
+import json
+import sqlite3
+import threading
+import time
+from itertools import islice
+from typing import Dict, Any, List, Iterator, Mapping, Optional, Tuple
+
+from identity_store import (
+    DEFAULT_ACTIVITY,
+    DEFAULT_PEER_BASELINE,
+    IdentityBackend,
+    iter_jsonl,
+    peer_key,
+)
+
+# ============================================================================
+# SECTION 1: SCHEMA & STATEMENTS
+# ============================================================================
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    user_id       TEXT PRIMARY KEY,
+    job_title     TEXT,
+    department    TEXT,
+    identity_type TEXT,
+    profile       TEXT NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_users_peer ON users (job_title, department);
+
+CREATE TABLE IF NOT EXISTS entitlements (
+    user_id     TEXT NOT NULL,
+    resource_id TEXT NOT NULL,
+    PRIMARY KEY (user_id, resource_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_entitlements_resource ON entitlements (resource_id, user_id);
+
+CREATE TABLE IF NOT EXISTS peer_baselines (
+    peer_key          TEXT PRIMARY KEY,
+    typical_access    TEXT NOT NULL,
+    write_access_rate REAL NOT NULL
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS policies (
+    policy_id TEXT PRIMARY KEY,
+    body      TEXT NOT NULL
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS activity (
+    user_id TEXT PRIMARY KEY,
+    body    TEXT NOT NULL
+) WITHOUT ROWID;
+"""
+
+# Statements are module constants so sqlite3's per-connection statement cache
+# reuses the compiled (prepared) form on every call.
+SQL_GET_USER = "SELECT profile FROM users WHERE user_id = ?"
+SQL_GET_ENTITLEMENTS = "SELECT resource_id FROM entitlements WHERE user_id = ?"
+SQL_GET_PEER_BASELINE = "SELECT typical_access, write_access_rate FROM peer_baselines WHERE peer_key = ?"
+SQL_GET_POLICIES = "SELECT policy_id, body FROM policies"
+SQL_GET_ACTIVITY = "SELECT body FROM activity WHERE user_id = ?"
+SQL_GET_HOLDERS = "SELECT user_id FROM entitlements WHERE resource_id = ?"
+
+SQL_UPSERT_USER = (
+    "INSERT OR REPLACE INTO users (user_id, job_title, department, identity_type, profile) "
+    "VALUES (?, ?, ?, ?, ?)"
+)
+SQL_UPSERT_ENTITLEMENT = "INSERT OR IGNORE INTO entitlements (user_id, resource_id) VALUES (?, ?)"
+SQL_UPSERT_PEER_BASELINE = (
+    "INSERT OR REPLACE INTO peer_baselines (peer_key, typical_access, write_access_rate) VALUES (?, ?, ?)"
+)
+SQL_UPSERT_POLICY = "INSERT OR REPLACE INTO policies (policy_id, body) VALUES (?, ?)"
+SQL_UPSERT_ACTIVITY = "INSERT OR REPLACE INTO activity (user_id, body) VALUES (?, ?)"
+
+STATEMENT_CACHE_SIZE = 128
+
+
+def _connect(db_path: str, read_only: bool = False) -> sqlite3.Connection:
+    if read_only:
+        conn = sqlite3.connect(
+            f"file:{db_path}?mode=ro", uri=True, cached_statements=STATEMENT_CACHE_SIZE
+        )
+    else:
+        conn = sqlite3.connect(db_path, cached_statements=STATEMENT_CACHE_SIZE)
+        conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA mmap_size=268435456")
+    return conn
+
+
+def init_schema(db_path: str) -> None:
+    """Create tables and indexes if they do not exist yet."""
+    conn = _connect(db_path)
+    try:
+        conn.executescript(SCHEMA)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+# ============================================================================
+# SECTION 2: CONNECTION POOL
+# ============================================================================
+
+class ConnectionPool:
+    """
+    One connection per thread, created lazily and reused for the thread's
+    lifetime. Async callers reach the backend through asyncio.to_thread, so
+    each executor worker ends up with its own pooled connection.
+    """
+
+    def __init__(self, db_path: str, read_only: bool = True):
+        self.db_path = db_path
+        self.read_only = read_only
+        self._local = threading.local()
+        self._all: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+
+    def get(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = _connect(self.db_path, read_only=self.read_only)
+            self._local.conn = conn
+            with self._lock:
+                self._all.append(conn)
+        return conn
+
+    def close(self) -> None:
+        """Close every connection handed out by the pool."""
+        with self._lock:
+            conns, self._all = self._all, []
+        for conn in conns:
+            try:
+                conn.close()
+            except sqlite3.ProgrammingError:
+                # Connection owned by another (still live) thread
+                pass
+        self._local = threading.local()
+
+
+# ============================================================================
+# SECTION 3: BACKEND
+# ============================================================================
+
+class SQLiteIdentityBackend(IdentityBackend):
+    """IdentityBackend over a SQLite database built with bulk_import()."""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.pool = ConnectionPool(db_path, read_only=True)
+        self._policies: Optional[Dict[str, Mapping[str, Any]]] = None
+        self._policies_lock = threading.Lock()
+
+    def _one(self, sql: str, params: Tuple[Any, ...]) -> Optional[Tuple[Any, ...]]:
+        return self.pool.get().execute(sql, params).fetchone()
+
+    def get_user(self, user_id: str) -> Optional[Mapping[str, Any]]:
+        row = self._one(SQL_GET_USER, (user_id,))
+        return json.loads(row[0]) if row else None
+
+    def get_entitlements(self, user_id: str) -> Tuple[str, ...]:
+        rows = self.pool.get().execute(SQL_GET_ENTITLEMENTS, (user_id,)).fetchall()
+        return tuple(r[0] for r in rows)
+
+    def get_peer_baseline(self, job_title: str, department: str) -> Mapping[str, Any]:
+        row = self._one(SQL_GET_PEER_BASELINE, (peer_key(job_title, department),))
+        if row is None:
+            return DEFAULT_PEER_BASELINE
+        return {"typical_access": json.loads(row[0]), "write_access_rate": row[1]}
+
+    def get_policies(self) -> Mapping[str, Mapping[str, Any]]:
+        # Policies change rarely and are read on every request: load once and
+        # keep them until reload_policies() is called.
+        if self._policies is None:
+            with self._policies_lock:
+                if self._policies is None:
+                    rows = self.pool.get().execute(SQL_GET_POLICIES).fetchall()
+                    self._policies = {pid: json.loads(body) for pid, body in rows}
+        return self._policies
+
+    def reload_policies(self) -> None:
+        with self._policies_lock:
+            self._policies = None
+
+    def get_activity(self, user_id: str) -> Mapping[str, Any]:
+        row = self._one(SQL_GET_ACTIVITY, (user_id,))
+        return json.loads(row[0]) if row else DEFAULT_ACTIVITY
+
+    def get_resource_holders(self, resource_id: str) -> Tuple[str, ...]:
+        rows = self.pool.get().execute(SQL_GET_HOLDERS, (resource_id,)).fetchall()
+        return tuple(r[0] for r in rows)
+
+    def close(self) -> None:
+        self.pool.close()
+
+
+# ============================================================================
+# SECTION 4: BULK IMPORTER
+# ============================================================================
+
+IMPORT_KINDS = ("snapshot", "users", "entitlements", "peer_baselines", "policies", "activity")
+
+# Snapshot record "type" -> the import kind whose rows it produces
+SNAPSHOT_RECORD_KINDS = {"user": "users", "peer_baseline": "peer_baselines", "policy": "policies"}
+
+
+def _split_list(value: Any) -> List[str]:
+    """CSV cells hold lists as `a;b;c`; JSON sources already hold lists."""
+    if isinstance(value, list):
+        return value
+    if not value:
+        return []
+    return [v.strip() for v in str(value).split(";") if v.strip()]
+
+
+def _user_row(record: Dict[str, Any]) -> Tuple[Any, ...]:
+    profile = {k: v for k, v in record.items() if v not in (None, "")}
+    if "tenure_months" in profile:
+        profile["tenure_months"] = int(profile["tenure_months"])
+    return (
+        profile["user_id"],
+        profile.get("job_title"),
+        profile.get("department"),
+        profile.get("identity_type"),
+        json.dumps(profile, separators=(",", ":")),
+    )
+
+
+def _rows_for(kind: str, record: Dict[str, Any]) -> Iterator[Tuple[str, Tuple[Any, ...]]]:
+    """Map one source record to (statement, params) pairs."""
+    if kind == "snapshot":
+        record = dict(record)
+        record_type = record.pop("type", "user")
+        kind = SNAPSHOT_RECORD_KINDS.get(record_type)
+        if kind is None:
+            raise ValueError(
+                f"Unknown snapshot record type: {record_type!r}; expected one of {sorted(SNAPSHOT_RECORD_KINDS)}"
+            )
+        if kind == "users":
+            resources = record.pop("entitlements", None) or []
+            activity = record.pop("activity", None)
+            yield SQL_UPSERT_USER, _user_row(record)
+            for resource in resources:
+                yield SQL_UPSERT_ENTITLEMENT, (record["user_id"], resource)
+            if activity is not None:
+                yield SQL_UPSERT_ACTIVITY, (record["user_id"], json.dumps(activity, separators=(",", ":")))
+            return
+
+    if kind == "users":
+        yield SQL_UPSERT_USER, _user_row(record)
+    elif kind == "entitlements":
+        for resource in _split_list(record.get("resource_id") or record.get("entitlements")):
+            yield SQL_UPSERT_ENTITLEMENT, (record["user_id"], resource)
+    elif kind == "peer_baselines":
+        yield SQL_UPSERT_PEER_BASELINE, (
+            peer_key(record["job_title"], record["department"]),
+            json.dumps(_split_list(record.get("typical_access"))),
+            float(record.get("write_access_rate") or 0.0),
+        )
+    elif kind == "policies":
+        policy = {k: v for k, v in record.items() if k not in ("type", "policy_id")}
+        for list_field in ("allowed_roles", "access_types", "identity_types"):
+            if list_field in policy:
+                policy[list_field] = _split_list(policy[list_field])
+        yield SQL_UPSERT_POLICY, (record["policy_id"], json.dumps(policy, separators=(",", ":")))
+    elif kind == "activity":
+        body = {k: v for k, v in record.items() if k != "user_id"}
+        if "recent_high_risk_actions" in body:
+            body["recent_high_risk_actions"] = _split_list(body["recent_high_risk_actions"])
+        yield SQL_UPSERT_ACTIVITY, (record["user_id"], json.dumps(body, separators=(",", ":")))
+    else:
+        raise ValueError(f"Unknown import kind {kind!r}; expected one of {IMPORT_KINDS}")
+
+
+def iter_source(path: str) -> Iterator[Dict[str, Any]]:
+    """Stream records from a .csv or .jsonl/.ndjson file."""
+    if path.endswith(".csv"):
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            yield from csv.DictReader(f)
+    else:
+        yield from iter_jsonl(path)
+
+
+def bulk_import(
+    db_path: str,
+    source_path: str,
+    kind: str = "snapshot",
+    batch_size: int = 50_000
+) -> Dict[str, Any]:
+    """
+    Load a CSV/JSONL extract in batched transactions.
+
+    Backends already open on the database see new users, entitlements and
+    activity at once; imported policies take effect after
+    accessops_engine.reload_policies(), which also empties the decision cache.
+
+    Args:
+        db_path: SQLite database (created if missing)
+        source_path: .csv or .jsonl file
+        kind: snapshot (typed JSONL records), users, entitlements,
+              peer_baselines, policies or activity
+        batch_size: Source records per transaction
+
+    Returns:
+        Dict with records, rows and elapsed_s
+    """
+    init_schema(db_path)
+    conn = _connect(db_path)
+    # WAL with synchronous=NORMAL (from _connect): readers stay consistent,
+    # a process crash loses only the in-flight batch, and a power loss can
+    # roll back the last committed batches but never corrupts the file.
+    conn.execute("PRAGMA cache_size=-262144")
+
+    records = iter_source(source_path)
+    total_records = 0
+    total_rows = 0
+    start = time.perf_counter()
+    try:
+        while True:
+            batch = list(islice(records, batch_size))
+            if not batch:
+                break
+            grouped: Dict[str, List[Tuple[Any, ...]]] = {}
+            for record in batch:
+                for sql, params in _rows_for(kind, record):
+                    grouped.setdefault(sql, []).append(params)
+            with conn:
+                for sql, rows in grouped.items():
+                    conn.executemany(sql, rows)
+                    total_rows += len(rows)
+            total_records += len(batch)
+        conn.execute("PRAGMA optimize")
+    finally:
+        conn.close()
+
+    return {
+        "records": total_records,
+        "rows": total_rows,
+        "elapsed_s": round(time.perf_counter() - start, 3)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AccessOps SQLite identity backend")
+    sub = parser.add_subparsers(dest="command", required=True)
+    imp = sub.add_parser("import", help="Bulk-load a CSV/JSONL extract")
+    imp.add_argument("db_path")
+    imp.add_argument("source_path")
+    imp.add_argument("--kind", choices=IMPORT_KINDS, default="snapshot")
+    imp.add_argument("--batch-size", type=int, default=50_000)
+    args = parser.parse_args()
+
+    stats = bulk_import(args.db_path, args.source_path, args.kind, args.batch_size)
+    print(json.dumps(stats))
+
+
+if __name__ == "__main__":
+    main()
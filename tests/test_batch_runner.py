@@ -0,0 +1,23 @@
+"""Batch runner exit codes."""
+
+import json
+
+from batch_runner import main
+
+REQUEST = {
+    "request_id": "REQ-BATCH-001",
+    "user_id": "dev_user_01",
+    "requested_resource_id": "dev_logs_read",
+    "access_type": "read",
+}
+
+
+def test_invalid_lines_fail_the_run(tmp_path):
+    backlog = tmp_path / "backlog.jsonl"
+    backlog.write_text(json.dumps(REQUEST) + "\n{not json\n", encoding="utf-8")
+    args = [str(backlog), "--score-only", "--quiet", "--out", str(tmp_path / "scores.jsonl")]
+
+    assert main(args) == 1
+
+    backlog.write_text(json.dumps(REQUEST) + "\n", encoding="utf-8")
+    assert main(args) == 0
@@ -0,0 +1,26 @@
+"""Board pack input handling: failed batch records and malformed lines."""
+
+import json
+import zipfile
+
+from board_pack import build_board_pack
+
+
+def test_failed_records_and_bad_lines_are_skipped(tmp_path):
+    results = tmp_path / "results.jsonl"
+    results.write_text("\n".join([
+        json.dumps({"request_id": "REQ-OK", "decision": "AUTO_APPROVE", "board_report": "# Report"}),
+        json.dumps({"request_id": "REQ-FAILED", "error": "TimeoutError: "}),
+        "{not json",
+        "",
+    ]), encoding="utf-8")
+    output = tmp_path / "pack.zip"
+
+    summary = build_board_pack(str(results), str(output), workers=1)
+
+    assert summary.reports == 1
+    assert summary.failed == [{"request_id": "REQ-FAILED", "error": "TimeoutError: "}]
+    assert summary.invalid == 1
+    with zipfile.ZipFile(output) as archive:
+        assert "Board_Report_REQ-OK.pdf" in archive.namelist()
+        assert "REQ-FAILED" not in archive.read("index.csv").decode()
@@ -0,0 +1,32 @@
+"""Native gatekeeper against the recorded UnitTest decisions."""
+
+import pytest
+
+from replay_model import AuditLogLibrary
+from risk_engine import decide_authorization
+
+RECORDINGS = AuditLogLibrary().records
+
+# Recorded HIGH with no policy violation, yet the LLM gatekeeper chose
+# human review; the rules call for manager review
+RULE_INCONSISTENT = {"REQ-TC24"}
+
+
+@pytest.mark.parametrize(
+    "request_id",
+    [
+        pytest.param(
+            request_id,
+            marks=pytest.mark.xfail(
+                request_id in RULE_INCONSISTENT, reason="recording breaks the gatekeeper rules", strict=True
+            )
+        )
+        for request_id in sorted(RECORDINGS)
+    ]
+)
+def test_gatekeeper_reproduces_recorded_decision(request_id):
+    record = RECORDINGS[request_id]
+
+    decision = decide_authorization(record["risk_score"], record["investigation"])
+
+    assert decision["decision"] == record["decision"]["decision"], decision["rule"]
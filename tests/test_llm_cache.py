@@ -0,0 +1,32 @@
+"""LLM response cache keying."""
+
+from google.adk.models.llm_request import LlmRequest
+from google.genai import types
+
+from llm_cache import request_key
+
+
+def tool_turn(call_id, user_id):
+    return LlmRequest(contents=[
+        types.Content(role="model", parts=[types.Part(function_call=types.FunctionCall(
+            id=call_id, name="get_user_profile", args={"id": user_id}
+        ))]),
+        types.Content(role="user", parts=[types.Part(function_response=types.FunctionResponse(
+            id=call_id, name="get_user_profile", response={"id": user_id}
+        ))]),
+    ])
+
+
+def test_adk_call_ids_are_ignored_but_argument_ids_are_not():
+    first, _ = request_key(tool_turn("adk-1", "dev_user_01"), "gemini")
+    rerun, _ = request_key(tool_turn("adk-2", "dev_user_01"), "gemini")
+    other_user, _ = request_key(tool_turn("adk-1", "svc_finops_auto_bot"), "gemini")
+
+    assert first == rerun
+    assert first != other_user
+
+
+def test_streamed_and_unary_calls_are_keyed_apart():
+    request = tool_turn("adk-1", "dev_user_01")
+
+    assert request_key(request, "gemini", stream=True)[0] != request_key(request, "gemini")[0]
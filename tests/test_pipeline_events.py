@@ -0,0 +1,106 @@
+"""Progress events replayed for results that were not built live, and decision cache behaviour."""
+
+import asyncio
+
+import pytest
+
+import accessops_engine
+from accessops_engine import PipelineConfig, PipelineResult, run_pipeline
+from decision_cache import DecisionCache
+
+TOXIC_REQUEST = {
+    "request_id": "REQ-TOXIC-001",
+    "user_id": "svc_finops_auto_bot",
+    "identity_type": "ai_agent",
+    "job_title": "Automated Financial Ops",
+    "department": "Finance Automation",
+    "requested_resource_id": "prod_general_ledger_rw",
+    "requested_resource_name": "Production General Ledger",
+    "access_type": "write",
+    "system_criticality": "tier_1",
+    "data_sensitivity": "restricted",
+    "justification": "AI detected anomaly. Requesting write access.",
+}
+
+
+@pytest.fixture(autouse=True)
+def fresh_decision_cache():
+    accessops_engine.set_decision_cache(DecisionCache())
+    yield
+    accessops_engine.set_decision_cache(None)
+
+
+def run_with_events(request):
+    events = []
+    result = asyncio.run(run_pipeline(dict(request), PipelineConfig(audit_mode="off"), on_event=events.append))
+    return result, {e["phase"]: e for e in events if e["type"] == "phase"}
+
+
+def test_fast_path_emits_triage_route():
+    result, events = run_with_events(TOXIC_REQUEST)
+    assert result.decision == "DENY"
+    assert events["triage"]["output"]["route"] == "auto_deny"
+    assert events["report"]["output"] == result.board_report
+
+
+def test_cache_hit_replays_fast_path_phases_with_payloads():
+    first, _ = run_with_events(TOXIC_REQUEST)
+    second, events = run_with_events(dict(TOXIC_REQUEST, request_id="REQ-TOXIC-002"))
+
+    assert second.cache_hit and second.decision == first.decision
+    assert events["cache"]["output"] == {
+        "source_request_id": "REQ-TOXIC-001",
+        "age_s": second.execution_trace[0]["age_s"],
+    }
+    assert events["triage"]["output"] == {
+        "route": "auto_deny",
+        "reason": first.execution_trace[0]["reason"],
+    }
+    for phase in ("investigation", "scoring", "authorization", "report"):
+        assert events[phase]["output"] is not None, phase
+
+
+def test_cache_hits_do_not_share_state_with_the_entry():
+    first, _ = run_with_events(TOXIC_REQUEST)
+    first.risk_score["net_risk_score"] = -1
+    first.investigation["policy_violations"].clear()
+
+    second, _ = run_with_events(dict(TOXIC_REQUEST, request_id="REQ-TOXIC-002"))
+    second.risk_score["severity_level"] = "LOW"
+    third, _ = run_with_events(dict(TOXIC_REQUEST, request_id="REQ-TOXIC-003"))
+
+    assert second.cache_hit and third.cache_hit
+    assert third.risk_score["net_risk_score"] != -1
+    assert third.risk_score["severity_level"] == "CRITICAL"
+    assert third.investigation["policy_violations"]
+
+
+@pytest.mark.parametrize("trace, board_report", [
+    ({"phase": "critique", "agent": "critic", "error": "TimeoutError: "}, "# Report"),
+    ({"phase": "report", "agent": "narrator", "error": "empty_board_report"}, ""),
+])
+def test_failed_phases_are_not_cached(monkeypatch, trace, board_report):
+    calls = []
+
+    async def failing_pipeline(request_context, config, engine, on_event=None):
+        calls.append(request_context["request_id"])
+        return PipelineResult(
+            request_id=request_context["request_id"], decision="PENDING_MANAGER_APPROVAL",
+            risk_score={}, investigation={}, board_report=board_report, execution_trace=[dict(trace)]
+        )
+
+    monkeypatch.setattr(accessops_engine, "_execute_pipeline", failing_pipeline)
+    first, _ = run_with_events(TOXIC_REQUEST)
+    second, _ = run_with_events(dict(TOXIC_REQUEST, request_id="REQ-TOXIC-002"))
+
+    assert not second.cache_hit
+    assert calls == ["REQ-TOXIC-001", "REQ-TOXIC-002"]
+
+
+def test_swapping_the_identity_backend_empties_the_cache():
+    run_with_events(TOXIC_REQUEST)
+    assert len(accessops_engine.get_decision_cache()) == 1
+
+    accessops_engine.set_identity_backend(None)
+
+    assert len(accessops_engine.get_decision_cache()) == 0
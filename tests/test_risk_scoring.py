@@ -0,0 +1,48 @@
+"""Batch scorer parity with score_request()."""
+
+import random
+
+from risk_engine import score_request, score_requests_batch
+
+VALUES = [
+    None, "", 0, 42, True, "read", " READ ", "execute (key rotation)", "admin", "rw", "write",
+    "prod", "tier_1", "non_prod", "restricted", "confidential", "public",
+    "service_account", "ai_agent", " Human ", "unknown",
+]
+FIELDS = [
+    "access_type", "system_criticality", "data_sensitivity", "identity_type",
+    "mfa_enabled", "time_bound", "duration_hours", "peer_certified",
+]
+INVESTIGATIONS = [
+    None,
+    {},
+    {"user_profile": {"identity_type": "ai_agent"}, "risk_signals": {"privilege_escalation": True}},
+    {"policy_violations": [{"policy_id": "SOD-001", "nist_control": "AC-5 (Separation of Duties)"}]},
+]
+
+
+def test_batch_matches_per_request_scoring_on_messy_input():
+    rng = random.Random(7)
+    requests = [
+        {
+            "user_id": rng.choice(["svc_etl", "report_bot", "alice", None]),
+            **{field: rng.choice(VALUES) for field in FIELDS if rng.random() < 0.8},
+        }
+        for _ in range(3000)
+    ]
+    investigations = [rng.choice(INVESTIGATIONS) for _ in requests]
+
+    expected = [score_request(r, i) for r, i in zip(requests, investigations)]
+
+    assert score_requests_batch(requests, investigations) == expected
+
+
+def test_batch_results_do_not_share_lists():
+    request = {"access_type": "write", "mfa_enabled": True, "user_id": "svc_etl"}
+    first, second = score_requests_batch([request, request], [INVESTIGATIONS[3]] * 2)
+
+    first["compensating_factors"].append("x")
+    first["control_failures"].append("x")
+
+    assert "x" not in second["compensating_factors"]
+    assert "x" not in second["control_failures"]
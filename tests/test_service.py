@@ -0,0 +1,68 @@
+"""HTTP service request validation and draining."""
+
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from service import create_app
+
+REQUEST = {
+    "request_id": "REQ-SVC-001",
+    "user_id": "dev_user_01",
+    "requested_resource_id": "dev_logs_read",
+    "access_type": "read",
+    "ticket": "CHG-1",
+}
+
+
+async def echo_pipeline(request_context, config):
+    return SimpleNamespace(
+        request_id=request_context["request_id"], decision="AUTO_APPROVE",
+        risk_score={"seen": sorted(request_context)}, investigation={}, board_report="", execution_trace=[]
+    )
+
+
+def call(method, path, **kwargs):
+    app = create_app(pipeline=echo_pipeline)
+
+    async def run():
+        async with app.router.lifespan_context(app):
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                return await client.request(method, path, **kwargs), app
+
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize("missing", ["request_id", "user_id", "requested_resource_id", "access_type"])
+def test_missing_required_field_is_422_not_500(missing):
+    request = {k: v for k, v in REQUEST.items() if k != missing}
+    single, _ = call("POST", "/v1/adjudicate", json={"request": request})
+    batch, _ = call("POST", "/v1/adjudicate:batch", json={"requests": [REQUEST, request]})
+
+    assert single.status_code == 422
+    assert batch.status_code == 422
+
+
+def test_extra_context_reaches_the_pipeline():
+    response, _ = call("POST", "/v1/adjudicate", json={"request": REQUEST})
+
+    assert response.status_code == 200
+    assert "ticket" in response.json()["risk_score"]["seen"]
+
+
+def test_startup_does_not_build_the_engine_unless_asked(monkeypatch):
+    import accessops_engine
+    built = []
+    monkeypatch.setattr(accessops_engine, "get_engine", lambda: built.append(True))
+
+    async def start(app):
+        async with app.router.lifespan_context(app):
+            pass
+
+    asyncio.run(start(create_app()))
+    assert built == []
+
+    asyncio.run(start(create_app(warm_engine=True)))
+    assert built == [True]
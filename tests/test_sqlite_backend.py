@@ -0,0 +1,32 @@
+"""SQLite bulk import of snapshot records."""
+
+import json
+
+import pytest
+
+from sqlite_backend import SQLiteIdentityBackend, bulk_import
+
+
+def write_jsonl(path, records):
+    path.write_text("".join(json.dumps(record) + "\n" for record in records), encoding="utf-8")
+
+
+def test_snapshot_import_loads_typed_records(tmp_path):
+    source = tmp_path / "snapshot.jsonl"
+    write_jsonl(source, [
+        {"user_id": "alice", "job_title": "Engineer", "department": "Platform", "entitlements": ["logs_read"]},
+        {"type": "peer_baseline", "job_title": "Engineer", "department": "Platform", "typical_access": ["logs_read"]},
+    ])
+
+    stats = bulk_import(str(tmp_path / "identity.db"), str(source))
+
+    assert stats["records"] == 2
+    assert SQLiteIdentityBackend(str(tmp_path / "identity.db")).get_user("alice")["job_title"] == "Engineer"
+
+
+def test_unknown_snapshot_record_type_is_a_value_error(tmp_path):
+    source = tmp_path / "snapshot.jsonl"
+    write_jsonl(source, [{"type": "group", "name": "admins"}])
+
+    with pytest.raises(ValueError, match="Unknown snapshot record type: 'group'"):
+        bulk_import(str(tmp_path / "identity.db"), str(source))